@@ -0,0 +1,251 @@
+from array import array
+from collections import Counter
+import csv
+import itertools
+from operator import itemgetter
+import struct
+from GradeSystem import GradeSystem, GradingScale, Student, pausedGarbageCollection
+from GradeSnapshot import _littleEndian
+
+CSV_HEADER = ['sID', 'name', 'lab1', 'lab2', 'lab3', 'midterm', 'final', 'averageScore', 'letterGrade', 'rank']
+
+# Columnar file layout, all numbers little-endian:
+#   header      magic, the five weights, the length of the text that follows
+#   text        UTF-8: the grading scale, then the tab separated letter table
+#   row groups  each: the number of rows n (0 ends the file), then the columns of the n rows one after another:
+#               sID and name as a length-prefixed block of newline separated UTF-8 strings,
+#               lab1, lab2, lab3, midterm, final and averageScore as n doubles each,
+#               the letter grade as n bytes indexing the letter table, the rank as n unsigned 32-bit integers
+COLUMNAR_MAGIC = b'GRADECL1'
+COLUMNAR_HEADER = struct.Struct('<8s5dI')
+COUNT = struct.Struct('<I')
+
+
+def _ranks(gradeSystem):
+    # The rank of every student, in studentList order
+    gradeSystem.settle()
+    ranks = array('I', bytes(4 * len(gradeSystem.studentList)))
+    sequenceOf = gradeSystem.rankIndex.sequenceOf
+    for rank, student in enumerate(gradeSystem.rankIndex, start=1):
+        ranks[sequenceOf[student.sID]] = rank
+    return ranks
+
+
+def _chunks(gradeSystem, chunkSize):
+    # Yields the students in studentList order chunkSize at a time, with their ranks
+    ranks = _ranks(gradeSystem)
+    students = gradeSystem.studentList
+    for start in range(0, len(students), chunkSize):
+        yield students[start:start + chunkSize], ranks[start:start + chunkSize]
+
+
+def csvRows(gradeSystem, chunkSize=65536):
+    """
+    Yields the header and one row per student with his/her scores, average score, letter grade and rank.
+
+    The students are in the order they were added; rows are produced as they are consumed.
+
+    :param gradeSystem: The grade system to export.
+    :type gradeSystem: GradeSystem
+    :param chunkSize: The number of students prepared at a time.
+    :type chunkSize: int
+    :return: A generator of rows, each a list of values.
+    :rtype: generator
+
+    Running Example:
+        for row in csvRows(grade_system):
+            print(row)
+    """
+    yield CSV_HEADER
+    for students, ranks in _chunks(gradeSystem, chunkSize):
+        for student, rank in zip(students, ranks):
+            yield [student.sID, student.name, *student.scores, student.averageScore, student.letterGrade, rank]
+
+
+def exportCSV(gradeSystem, path, chunkSize=65536):
+    """
+    Writes every student with his/her computed grades to a CSV file, chunkSize rows per write.
+
+    :param gradeSystem: The grade system to export.
+    :type gradeSystem: GradeSystem
+    :param path: The CSV file to write.
+    :type path: str
+    :param chunkSize: The number of rows written at once.
+    :type chunkSize: int
+    :return: The number of students written.
+    :rtype: int
+
+    Running Example:
+        exportCSV(grade_system, 'grades.csv')
+    """
+    rows = csvRows(gradeSystem, chunkSize)
+    with open(path, 'w', encoding='utf-8', newline='', buffering=1 << 20) as fh:
+        writer = csv.writer(fh)
+        while True:
+            block = list(itertools.islice(rows, chunkSize))
+            if not block:
+                break
+            writer.writerows(block)
+    return len(gradeSystem.studentList)
+
+
+def importCSV(path, weightList=None, gradingScale=None):
+    """
+    Creates a grade system from a CSV file with sID, name, lab1, lab2, lab3, midterm and final columns.
+
+    The scores are regraded with the given weights and scale, so the file may come from anywhere; other columns,
+    such as the computed ones written by exportCSV, are ignored. A bad row is reported with its line number and skipped.
+
+    :param path: The CSV file to read.
+    :type path: str
+    :param weightList: A list of weights for lab assignments, midterm, and final exam, the default weights if None.
+    :type weightList: list
+    :param gradingScale: The grading scale of the course, the default scale if None.
+    :type gradingScale: GradingScale
+    :return: The grade system holding the students of the file.
+    :rtype: GradeSystem
+
+    Running Example:
+        grade_system = importCSV('grades.csv')
+    """
+    gradeSystem = GradeSystem(None, gradingScale)
+    if weightList is not None:
+        gradeSystem.weightList = [float(weight) for weight in weightList]
+    weightList, gradingScale = gradeSystem.weightList, gradeSystem.gradingScale
+    students = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8', newline='', buffering=1 << 20) as fh, pausedGarbageCollection():
+        reader = csv.reader(fh)
+        header = next(reader, [])
+        missing = [column for column in CSV_HEADER[:7] if column not in header]
+        if missing:
+            raise ValueError(f"'{path}' has no {', '.join(missing)} column")
+        values = itemgetter(*[header.index(column) for column in CSV_HEADER[:7]])
+        for lineNumber, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            try:
+                sID, *fields = values(row)
+                assert sID not in seen, "Student with ID '{}' already exists.".format(sID)
+                student = Student(sID, *fields, weightList, gradingScale)
+            except Exception as e:
+                print(f"Error occurred while reading line {lineNumber}:", e)
+                continue
+            seen.add(student.sID)
+            students.append(student)
+        gradeSystem._appendStudents(students)
+    return gradeSystem
+
+
+def _writeStrings(fh, strings):
+    data = '\n'.join(strings).encode('utf-8')
+    fh.write(COUNT.pack(len(data)))
+    fh.write(data)
+
+
+def _readStrings(fh, count):
+    lengthBytes = fh.read(COUNT.size)
+    if len(lengthBytes) < COUNT.size:
+        raise ValueError("Columnar file is truncated")
+    data = fh.read(COUNT.unpack(lengthBytes)[0]).decode('utf-8')
+    return data.split('\n') if count else []
+
+
+def _readArray(fh, typecode, count):
+    values = array(typecode)
+    values.frombytes(fh.read(count * values.itemsize))
+    if len(values) != count:
+        raise ValueError("Columnar file is truncated")
+    return _littleEndian(values)
+
+
+def exportColumnar(gradeSystem, path, chunkSize=65536):
+    """
+    Writes every student with his/her computed grades to a columnar binary file, in row groups of chunkSize students.
+
+    Each row group stores its students column by column, so a reader can load a column without parsing text,
+    and only one row group is held in memory while writing.
+
+    :param gradeSystem: The grade system to export.
+    :type gradeSystem: GradeSystem
+    :param path: The file to write.
+    :type path: str
+    :param chunkSize: The number of students in each row group.
+    :type chunkSize: int
+    :return: The number of students written.
+    :rtype: int
+
+    Running Example:
+        exportColumnar(grade_system, 'grades.col')
+    """
+    letters = list(gradeSystem.gradeDistribution)
+    codes = {letter: i for i, letter in enumerate(letters)}
+    text = (str(gradeSystem.gradingScale) + '\n' + '\t'.join(letters)).encode('utf-8')
+    with open(path, 'wb', buffering=1 << 20) as fh:
+        fh.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, *[float(weight) for weight in gradeSystem.weightList], len(text)))
+        fh.write(text)
+        for students, ranks in _chunks(gradeSystem, chunkSize):
+            fh.write(COUNT.pack(len(students)))
+            _writeStrings(fh, [student.sID for student in students])
+            _writeStrings(fh, [student.name for student in students])
+            scores = [student._scores for student in students]
+            for column in range(5):
+                _littleEndian(array('d', [row[column] for row in scores])).tofile(fh)
+            _littleEndian(array('d', [student.averageScore for student in students])).tofile(fh)
+            fh.write(bytes([codes[student.letterGrade] for student in students]))
+            _littleEndian(ranks).tofile(fh)
+        fh.write(COUNT.pack(0))
+    return len(gradeSystem.studentList)
+
+
+def importColumnar(path):
+    """
+    Creates a grade system from a columnar file written by exportColumnar, without recalculating any grade.
+
+    :param path: The file to read.
+    :type path: str
+    :return: The grade system holding the students, weights and grading scale of the file.
+    :rtype: GradeSystem
+
+    Running Example:
+        grade_system = importColumnar('grades.col')
+    """
+    students = []
+    ranks = array('I')
+    codeCounts = Counter()
+    with open(path, 'rb', buffering=1 << 20) as fh, pausedGarbageCollection():
+        header = fh.read(COLUMNAR_HEADER.size)
+        if len(header) < COLUMNAR_HEADER.size or header[:len(COLUMNAR_MAGIC)] != COLUMNAR_MAGIC:
+            raise ValueError(f"'{path}' is not a columnar grade file")
+        _, *weights, textLength = COLUMNAR_HEADER.unpack(header)
+        scale, letterTable = fh.read(textLength).decode('utf-8').split('\n')
+        letters = letterTable.split('\t')
+        fromValues = Student.fromValues
+        while True:
+            countBytes = fh.read(COUNT.size)
+            if len(countBytes) < COUNT.size:
+                raise ValueError("Columnar file is truncated")
+            count = COUNT.unpack(countBytes)[0]
+            if count == 0:
+                break
+            sIDs = _readStrings(fh, count)
+            names = _readStrings(fh, count)
+            columns = [_readArray(fh, 'd', count) for _ in range(6)]
+            letterCodes = fh.read(count)
+            groupRanks = _readArray(fh, 'I', count)
+            if len(sIDs) != count or len(names) != count or len(letterCodes) != count:
+                raise ValueError("Columnar file is truncated")
+            students.extend(fromValues(sID, name, array('d', scores), average, letters[code])
+                            for sID, name, *scores, average, code
+                            in zip(sIDs, names, *columns[:5], columns[5], letterCodes))
+            codeCounts.update(letterCodes)
+            ranks.extend(groupRanks)
+        # The rank of each student gives his/her place in the rank order
+        order = [0] * len(students)
+        for position, rank in enumerate(ranks):
+            order[rank - 1] = position
+        gradeSystem = GradeSystem(None, GradingScale.parse(scale))
+        gradeSystem.weightList = weights
+        gradeSystem.gradeDistribution = dict.fromkeys(letters, 0)
+        gradeSystem._appendStudents(students, order, {letters[code]: n for code, n in codeCounts.items()})
+    return gradeSystem
@@ -0,0 +1,113 @@
+import csv
+import pytest
+from GradeSystem import GradeSystem
+from GradeExport import csvRows, exportCSV, importCSV, exportColumnar, importColumnar
+
+@pytest.fixture
+def grade_system():
+    return GradeSystem()
+
+def test_export_csv(grade_system, tmp_path):
+    """
+    Test Function: csvRows(gradeSystem), exportCSV(gradeSystem, path), importCSV(path)
+    Test Description:
+        -Step 1: Add a student and update a score of grade_system, then export it in chunks of 7 rows
+            Expected result : the file has the header and one row per student with his/her scores, average score,
+                              letter grade and rank, the same rows as csvRows
+        -Step 2: Importing the file
+            Expected result : students, scores, averages, letter grades and ranks all match
+    """
+    grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+    grade_system.updateScore("985002509 final 10")
+    exported = tmp_path / "grades.csv"
+    assert exportCSV(grade_system, str(exported), chunkSize=7) == len(grade_system.studentList)
+
+    with open(exported, newline='', encoding='utf-8') as fh:
+        rows = list(csv.reader(fh))
+    assert rows == [[str(value) for value in row] for row in csvRows(grade_system)]
+    assert rows[0] == ['sID', 'name', 'lab1', 'lab2', 'lab3', 'midterm', 'final', 'averageScore', 'letterGrade', 'rank']
+    assert len(rows) == len(grade_system.studentList) + 1
+    for row, student in zip(rows[1:], grade_system.studentList):
+        assert row[:2] == [student.sID, student.name]
+        assert float(row[7]) == student.averageScore
+        assert row[8] == student.letterGrade
+        assert int(row[9]) == grade_system.getRank(student.sID)
+
+    imported = importCSV(str(exported))
+    assert imported.gradeDistribution == grade_system.gradeDistribution
+    for original, student in zip(grade_system.studentList, imported.studentList):
+        assert (student.sID, student.name, student.scores, student.averageScore, student.letterGrade) == \
+               (original.sID, original.name, original.scores, original.averageScore, original.letterGrade)
+        assert imported.getRank(student.sID) == grade_system.getRank(original.sID)
+
+def test_import_csv_weights_and_errors(tmp_path, capsys):
+    """
+    Test Function: importCSV(path, weightList)
+    Test Description:
+        -Step 1: Importing a CSV file with columns in another order, a bad score and a duplicated ID, using other weights
+            Expected result : the bad rows are reported with their line numbers and skipped,
+                              the other students are graded with the given weights
+    """
+    source = tmp_path / "grades.csv"
+    source.write_text("name,sID,final,midterm,lab3,lab2,lab1\n"
+                      "Bill,110006213,100,80,60,60,60\n"
+                      "Anna,110006214,100,x,60,60,60\n"
+                      "Carl,110006213,50,50,50,50,50\n", encoding='utf-8')
+    imported = importCSV(str(source), weightList=[0, 0, 0, 0.5, 0.5])
+    output = capsys.readouterr().out
+    assert "line 3" in output
+    assert "line 4" in output
+    assert [student.sID for student in imported.studentList] == ['110006213']
+    assert imported.getScore('110006213') == [60, 60, 60, 80, 100]
+    assert imported.getAverage('110006213') == 90
+    assert imported.weightList == [0, 0, 0, 0.5, 0.5]
+
+def test_export_columnar(grade_system, tmp_path):
+    """
+    Test Function: exportColumnar(gradeSystem, path), importColumnar(path)
+    Test Description:
+        -Step 1: Add a student, update a score, the weights and the grading scale of grade_system,
+                 then export it in row groups of 7 students
+        -Step 2: Importing the file
+            Expected result : students, scores, averages, letter grades, weights, scale, distribution and ranks all match
+    """
+    grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+    grade_system.updateScore("985002509 final 10")
+    grade_system.updateWeight("lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8")
+    grade_system.updateGradingScale("F 60 D 70 C 80 B 90 A")
+    exported = tmp_path / "grades.col"
+    assert exportColumnar(grade_system, str(exported), chunkSize=7) == len(grade_system.studentList)
+    imported = importColumnar(str(exported))
+
+    assert imported.weightList == grade_system.weightList
+    assert imported.gradingScale == grade_system.gradingScale
+    assert imported.gradeDistribution == grade_system.gradeDistribution
+    assert len(imported.studentList) == len(grade_system.studentList)
+    for original, student in zip(grade_system.studentList, imported.studentList):
+        assert (student.sID, student.name, student.scores, student.averageScore, student.letterGrade) == \
+               (original.sID, original.name, original.scores, original.averageScore, original.letterGrade)
+        assert imported.getRank(student.sID) == grade_system.getRank(original.sID)
+
+def test_columnar_invalid(tmp_path):
+    """
+    Test Function: importColumnar(path)
+    Test Description:
+        -Step 1: Importing a file which is not a columnar file
+            Expected result : ValueError is raised
+        -Step 2: Importing a columnar file cut in the middle of a row group
+            Expected result : ValueError is raised
+        -Step 3: Exporting an empty grade system and importing it back
+            Expected result : the imported grade system has no students
+    """
+    not_columnar = tmp_path / "input.txt"
+    not_columnar.write_text("110006213 Bill 90 85 95 88 92\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        importColumnar(str(not_columnar))
+    exported = tmp_path / "grades.col"
+    exportColumnar(GradeSystem(), str(exported))
+    truncated = tmp_path / "truncated.col"
+    truncated.write_bytes(exported.read_bytes()[:-200])
+    with pytest.raises(ValueError):
+        importColumnar(str(truncated))
+    exportColumnar(GradeSystem(None), str(exported))
+    assert importColumnar(str(exported)).studentList == []
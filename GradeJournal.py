@@ -0,0 +1,191 @@
+import os
+from GradeSystem import GradeSystem
+from GradeSnapshot import saveSnapshot, loadSnapshot
+
+# Each record is one line: the operation, then its arguments, separated by tabs.
+#   add     sID name lab1 lab2 lab3 mid final
+#   score   sID score_name new_score ...
+#   scores  one 'sID score_name new_score ...' argument per line of the batch
+#   weight  weight_name new_weight ...
+#   scale   letter cutoff letter ... letter maximum
+OPERATIONS = {
+    'add': lambda gradeSystem, args: gradeSystem.addStudent(args[0]),
+    'score': lambda gradeSystem, args: gradeSystem.updateScore(args[0]),
+    'scores': lambda gradeSystem, args: gradeSystem.updateScores(args),
+    'weight': lambda gradeSystem, args: gradeSystem.updateWeight(args[0]),
+    'scale': lambda gradeSystem, args: gradeSystem.updateGradingScale(args[0]),
+}
+
+
+def _dropTornRecord(path):
+    # Cuts off a last record left incomplete by a crash, so new records do not get appended to it
+    if not os.path.exists(path):
+        return
+    with open(path, 'r+b') as fh:
+        size = fh.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        fh.seek(size - 1)
+        if fh.read(1) != b'\n':
+            fh.seek(0)
+            fh.truncate(fh.read().rfind(b'\n') + 1)
+
+
+class GradeJournal:
+    """
+    A class representing an append-only journal of the changes made to a grade system.
+
+    Records are appended as the changes succeed and are flushed to disk in groups: the file is fsynced
+    once every groupCommit records, or when commit() is called, so each change costs one sequential append.
+
+    Attributes:
+        path (str): The journal file.
+        groupCommit (int): The number of records written between two fsyncs.
+        pending (int): The number of records written since the last fsync.
+
+    """
+    def __init__(self, path, groupCommit=64):
+        """
+        Opens a journal for appending, creating the file if needed.
+
+        :param path: The journal file.
+        :type path: str
+        :param groupCommit: The number of records written between two fsyncs.
+        :type groupCommit: int
+
+        Running Example:
+            journal = GradeJournal('roster.journal')
+        """
+        self.path = path
+        self.groupCommit = groupCommit
+        self.pending = 0
+        _dropTornRecord(path)
+        self.fh = open(path, 'a', encoding='utf-8')
+
+    def append(self, operation, *args):
+        """
+        Appends one record to the journal.
+
+        :param operation: The operation name ('add', 'score', 'scores', 'weight' or 'scale').
+        :type operation: str
+        :param args: The input strings given to the operation.
+        :type args: str
+
+        Running Example:
+            journal.append('score', '123 lab1 88 lab3 89')
+        """
+        # Whitespace inside an argument only separates fields, so it is normalized to single spaces
+        self.fh.write('\t'.join([operation] + [' '.join(arg.split()) for arg in args]) + '\n')
+        self.pending += 1
+        if self.pending >= self.groupCommit:
+            self.commit()
+
+    def commit(self):
+        """
+        Flushes the records written so far and waits until they are on disk.
+
+        Running Example:
+            journal.commit()
+        """
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
+        self.pending = 0
+
+    def close(self):
+        """
+        Commits the pending records and closes the journal.
+
+        Running Example:
+            journal.close()
+        """
+        if not self.fh.closed:
+            self.commit()
+            self.fh.close()
+
+    def replay(self, gradeSystem):
+        """
+        Applies every complete record of the journal to a grade system, without journaling them again.
+
+        A last line cut short by a crash is ignored. A record the grade system rejects is reported with its
+        line number and skipped, the other records are still applied.
+
+        :param gradeSystem: The grade system to apply the records to.
+        :type gradeSystem: GradeSystem
+        :return: The number of records applied and the failures as (line number, record) pairs.
+        :rtype: dict
+
+        Running Example:
+            journal.replay(grade_system)
+        """
+        self.fh.flush()
+        journal, gradeSystem.journal = gradeSystem.journal, None
+        applied = 0
+        failures = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                for lineNumber, line in enumerate(fh, start=1):
+                    if not line.endswith('\n'):
+                        break
+                    record = line.rstrip('\n')
+                    operation, *args = record.split('\t')
+                    if operation in OPERATIONS and OPERATIONS[operation](gradeSystem, args):
+                        applied += 1
+                    else:
+                        print(f"Error replaying line {lineNumber} of the journal:", record)
+                        failures.append((lineNumber, record))
+        finally:
+            gradeSystem.journal = journal
+        return {'applied': applied, 'failures': failures}
+
+    def compact(self, gradeSystem, snapshotPath):
+        """
+        Saves a grade system to a snapshot and empties the journal, whose records the snapshot now contains.
+
+        The snapshot is written to a temporary file and renamed into place. A crash before the journal is emptied
+        leaves the new snapshot with the full journal, which is still safe to replay: every record sets absolute
+        values, and adding a student who already exists is rejected.
+
+        :param gradeSystem: The grade system holding every change in the journal.
+        :type gradeSystem: GradeSystem
+        :param snapshotPath: The snapshot file to write.
+        :type snapshotPath: str
+
+        Running Example:
+            journal.compact(grade_system, 'roster.snap')
+        """
+        self.commit()
+        saveSnapshot(gradeSystem, snapshotPath + '.tmp')
+        with open(snapshotPath + '.tmp', 'rb') as fh:
+            os.fsync(fh.fileno())
+        os.replace(snapshotPath + '.tmp', snapshotPath)
+        self.fh.close()
+        self.fh = open(self.path, 'w', encoding='utf-8')
+        self.commit()
+
+
+def openJournaled(journalPath, snapshotPath=None, rosterPath='input.txt', groupCommit=64):
+    """
+    Restores a grade system from its last snapshot (or roster file) and journal, and keeps journaling its changes.
+
+    :param journalPath: The journal file.
+    :type journalPath: str
+    :param snapshotPath: The snapshot file, used instead of rosterPath once it exists.
+    :type snapshotPath: str
+    :param rosterPath: The roster file to start from when there is no snapshot.
+    :type rosterPath: str
+    :param groupCommit: The number of records written between two fsyncs.
+    :type groupCommit: int
+    :return: The restored grade system, with its journal attribute set.
+    :rtype: GradeSystem
+
+    Running Example:
+        grade_system = openJournaled('roster.journal', 'roster.snap')
+    """
+    if snapshotPath is not None and os.path.exists(snapshotPath):
+        gradeSystem = loadSnapshot(snapshotPath)
+    else:
+        gradeSystem = GradeSystem(rosterPath)
+    journal = GradeJournal(journalPath, groupCommit)
+    journal.replay(gradeSystem)
+    gradeSystem.journal = journal
+    return gradeSystem
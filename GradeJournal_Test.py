@@ -0,0 +1,101 @@
+from GradeJournal import GradeJournal, openJournaled
+
+def snapshot_of(grade_system):
+    return ([(student.sID, student.scores, student.averageScore, student.letterGrade)
+             for student in grade_system.studentList],
+            grade_system.weightList, grade_system.gradeDistribution)
+
+def test_journal_replay(tmp_path):
+    """
+    Test Function: GradeJournal.append(operation, *args), openJournaled(journalPath)
+    Test Description:
+        -Step 1: Opening a journaled grade system and changing it with valid and invalid changes
+        -Step 2: Closing the journal and opening the grade system again from input.txt and the journal
+            Expected result : the restored grade system matches the changed one, invalid changes and empty batches
+                              are not recorded
+    """
+    journal_path = str(tmp_path / "roster.journal")
+    grade_system = openJournaled(journal_path)
+    grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+    grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+    grade_system.updateScore("110006213 lab1 10 lab2 10 lab3 10 midterm 10 final 90")
+    grade_system.updateScore("110006213 lab5 10")
+    grade_system.updateScores(["985002509 final 10", "110006213 final 80"])
+    grade_system.updateScores(["", "   "])
+    grade_system.updateWeight("lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8")
+    grade_system.journal.close()
+    with open(journal_path, encoding='utf-8') as fh:
+        assert len(fh.readlines()) == 4
+
+    restored = openJournaled(journal_path)
+    assert snapshot_of(restored) == snapshot_of(grade_system)
+    restored.journal.close()
+
+def test_journal_torn_record_and_compaction(tmp_path):
+    """
+    Test Function: GradeJournal.replay(gradeSystem), GradeJournal.compact(gradeSystem, snapshotPath)
+    Test Description:
+        -Step 1: Writing a journal whose last record is cut short
+            Expected result : the cut record is ignored and dropped when the journal is opened
+        -Step 2: Compacting the journal into a snapshot and changing the grade system again
+            Expected result : the journal only holds the new change, and snapshot plus journal restore the grade system
+    """
+    journal_path = tmp_path / "roster.journal"
+    journal_path.write_text("add\t110006213 Bill 99 95 95 98 92\nscore\t110006213 lab1 1", encoding='utf-8')
+    snapshot_path = str(tmp_path / "roster.snap")
+    grade_system = openJournaled(str(journal_path), snapshot_path)
+    assert grade_system.studentIndex["110006213"].scores == [99, 95, 95, 98, 92]
+
+    grade_system.journal.compact(grade_system, snapshot_path)
+    grade_system.updateScore("110006213 final 50")
+    grade_system.journal.close()
+    assert journal_path.read_text(encoding='utf-8') == "score\t110006213 final 50\n"
+
+    restored = openJournaled(str(journal_path), snapshot_path)
+    assert snapshot_of(restored) == snapshot_of(grade_system)
+    restored.journal.close()
+
+def test_journal_group_commit(tmp_path):
+    """
+    Test Function: GradeJournal.commit()
+    Test Description:
+        -Step 1: Appending fewer records than groupCommit
+            Expected result : the records are pending
+        -Step 2: Appending the groupCommit-th record
+            Expected result : the records are committed
+    """
+    journal = GradeJournal(str(tmp_path / "roster.journal"), groupCommit=3)
+    journal.append('score', '110006213 lab1 10')
+    journal.append('score', '110006213 lab1 20')
+    assert journal.pending == 2
+    journal.append('score', '110006213 lab1 30')
+    assert journal.pending == 0
+    journal.close()
+
+def test_journal_replay_failures(tmp_path, capsys):
+    """
+    Test Function: GradeJournal.replay(gradeSystem)
+    Test Description:
+        -Step 1: Replaying a journal whose records update an unknown student, add an existing student,
+                 set weights summing over 1 and use an unknown operation, around one valid record
+            Expected result : only the valid record is counted, every other record is returned and reported
+                              with its line number
+    """
+    grade_system = openJournaled(str(tmp_path / "empty.journal"))
+    journal_path = tmp_path / "roster.journal"
+    journal_path.write_text("score\t110006221 lab1 10\n"
+                            "add\t985002509 Bill 99 95 95 98 92\n"
+                            "score\t985002509 final 10\n"
+                            "weight\tlab1 0.9\n"
+                            "rename\t985002509 Bill\n", encoding='utf-8')
+    capsys.readouterr()
+    journal = GradeJournal(str(journal_path))
+    result = journal.replay(grade_system)
+    journal.close()
+    assert result['applied'] == 1
+    assert [line for line, _ in result['failures']] == [1, 2, 4, 5]
+    assert result['failures'][3] == (5, "rename\t985002509 Bill")
+    output = capsys.readouterr().out
+    assert "not found" in output and "already exists" in output and "line 4 of the journal" in output
+    assert grade_system.getScore('985002509')[4] == 10
+    grade_system.journal.close()
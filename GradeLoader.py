@@ -0,0 +1,138 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import os
+import time
+from GradeSystem import DEFAULT_SCALE, GradeSystem, Student, parseRoster, pausedGarbageCollection
+
+
+def splitRanges(path, parts):
+    """
+    Splits a file into at most the given number of byte ranges, each starting at the beginning of a line.
+
+    :param path: The file to split.
+    :type path: str
+    :param parts: The number of ranges wanted.
+    :type parts: int
+    :return: The (start, end) byte offsets of each range.
+    :rtype: list
+
+    Running Example:
+        ranges = splitRanges('input.txt', 4)
+    """
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as fh:
+        for i in range(1, parts):
+            fh.seek(max(size * i // parts, bounds[-1]))
+            fh.readline()
+            boundary = fh.tell()
+            if boundary >= size:
+                break
+            if boundary > bounds[-1]:
+                bounds.append(boundary)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def parseRange(path, start, end, weightList, gradingScale=DEFAULT_SCALE):
+    """
+    Parses and grades the students in one byte range of a roster file with parseRoster.
+
+    The results are returned column by column, which is much cheaper to send between processes than
+    Student objects.
+
+    :param path: The roster file.
+    :type path: str
+    :param start: The offset of the first byte of the range, at the beginning of a line.
+    :type start: int
+    :param end: The offset just past the range, at the beginning of a line or the end of the file.
+    :type end: int
+    :param weightList: A list of weights for lab assignments, midterm, and final exam.
+    :type weightList: list
+    :param gradingScale: The grading scale converting average scores to letter grades.
+    :type gradingScale: GradingScale
+    :return: The ids, names, scores, averages, letter grades and line numbers (within the range) of the students,
+             the errors as (line number, message) pairs, the number of lines and the letter grade counts.
+    :rtype: dict
+
+    Running Example:
+        result = parseRange('input.txt', 0, 1024, [0.1, 0.1, 0.1, 0.3, 0.4])
+    """
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+    with pausedGarbageCollection():
+        result = parseRoster(data.decode('utf-8').split('\n'), weightList, gradingScale)
+    result['lines'] = data.count(b'\n') + (not data.endswith(b'\n'))
+    return result
+
+
+def parallelLoad(path, workers=None, chunks=None, weightList=None, gradingScale=None):
+    """
+    Loads a roster file like GradeSystem.load, parsing and grading byte ranges of the file in parallel processes.
+
+    A student whose ID appears again later in the file is reported on that later line and skipped, also when
+    the two lines are in different ranges.
+
+    :param path: The roster file to load.
+    :type path: str
+    :param workers: The number of processes, the number of CPUs by default; 1 parses in this process.
+    :type workers: int
+    :param chunks: The number of byte ranges, four per worker by default.
+    :type chunks: int
+    :param weightList: A list of weights for lab assignments, midterm, and final exam, the default weights if None.
+    :type weightList: list
+    :param gradingScale: The grading scale of the course, the default scale if None.
+    :type gradingScale: GradingScale
+    :return: The loaded grade system, with loadStats set.
+    :rtype: GradeSystem
+
+    Running Example:
+        grade_system = parallelLoad('input.txt', workers=4)
+    """
+    start = time.perf_counter()
+    gradeSystem = GradeSystem(None, gradingScale)
+    if weightList is not None:
+        gradeSystem.weightList = [float(weight) for weight in weightList]
+    workers = workers or os.cpu_count() or 1
+    errors = []
+    students = []
+    try:
+        ranges = splitRanges(path, chunks or workers * 4)
+    except FileNotFoundError:
+        print(f"Error: File '{path}' not found.")
+        ranges = []
+    arguments = ([path] * len(ranges), [first for first, _ in ranges], [last for _, last in ranges],
+                 [gradeSystem.weightList] * len(ranges), [gradeSystem.gradingScale] * len(ranges))
+    distribution = Counter()
+    seen = set()
+    lineOffset = 0
+    fromValues = Student.fromValues
+    with contextlib.ExitStack() as stack:
+        if workers == 1:
+            results = map(parseRange, *arguments)
+        else:
+            results = stack.enter_context(ProcessPoolExecutor(workers)).map(parseRange, *arguments)
+        stack.enter_context(pausedGarbageCollection())
+        for result in results:
+            scores, averages, letters = result['scores'], result['averages'], result['letters']
+            for i, (sID, name) in enumerate(zip(result['ids'], result['names'])):
+                if sID in seen:
+                    errors.append((lineOffset + result['lineNumbers'][i],
+                                   "Student with ID '{}' already exists.".format(sID)))
+                    distribution[letters[i]] -= 1
+                    continue
+                seen.add(sID)
+                students.append(fromValues(sID, name, scores[i * 5:i * 5 + 5], averages[i], letters[i]))
+            errors.extend((lineOffset + lineNumber, message) for lineNumber, message in result['errors'])
+            distribution.update(result['distribution'])
+            lineOffset += result['lines']
+        errors.sort()
+        for lineNumber, message in errors:
+            print(f"Error occurred while reading line {lineNumber}:", message)
+        gradeSystem._appendStudents(students, distribution=distribution)
+    seconds = time.perf_counter() - start
+    gradeSystem.loadStats = {'path': path, 'rows': len(students), 'errors': errors, 'seconds': seconds,
+                             'rowsPerSecond': len(students) / seconds if seconds > 0 else 0.0}
+    return gradeSystem
@@ -0,0 +1,46 @@
+import pytest
+from GradeSystem import GradeSystem
+from GradeLoader import splitRanges, parallelLoad
+
+@pytest.fixture
+def roster(tmp_path):
+    lines = open('input.txt', encoding='utf-8').read().splitlines()
+    lines.insert(5, "110006214 Anna 90 85 95 88")
+    lines.insert(20, "")
+    lines.insert(30, lines[2])
+    lines.append(lines[40])
+    path = tmp_path / "roster.txt"
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return str(path)
+
+def test_split_ranges(roster):
+    """
+    Test Function: splitRanges(path, parts)
+    Test Description:
+        -Step 1: Splitting the roster file into 7 ranges
+            Expected result : the ranges cover the whole file and every range starts at the beginning of a line
+    """
+    data = open(roster, 'rb').read()
+    ranges = splitRanges(roster, 7)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[start - 1:start] == b'\n'
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_load(roster, workers):
+    """
+    Test Function: parallelLoad(path, workers, chunks)
+    Test Description:
+        -Step 1: Loading the roster file with GradeSystem and with parallelLoad split into 9 ranges
+            Expected result : the same students, distribution, ranks and errors (with line numbers) are found,
+                              including students repeated in another range
+    """
+    serial = GradeSystem(roster)
+    parallel = parallelLoad(roster, workers=workers, chunks=9)
+    assert [(s.sID, s.name, s.scores, s.averageScore, s.letterGrade) for s in parallel.studentList] == \
+           [(s.sID, s.name, s.scores, s.averageScore, s.letterGrade) for s in serial.studentList]
+    assert parallel.gradeDistribution == serial.gradeDistribution
+    assert parallel.loadStats['errors'] == serial.loadStats['errors']
+    assert [line for line, _ in parallel.loadStats['errors']] == [6, 31, 67]
+    for student in parallel.studentList:
+        assert parallel.rankIndex.rank(student) == serial.rankIndex.rank(serial.studentIndex[student.sID])
@@ -0,0 +1,227 @@
+from collections import Counter, OrderedDict
+import os
+import tempfile
+from GradeSystem import GradeSystem
+from GradeSnapshot import saveSnapshot, loadSnapshot
+
+# Memory held by one loaded student, measured with tracemalloc on a 100k roster (about 570 bytes,
+# 680 with the numpy score matrix), used to keep the loaded courses under the budget
+BYTES_PER_STUDENT = 700
+
+
+class InternTable:
+    """
+    A class keeping one copy of each student ID and name string shared by all the loaded courses.
+
+    Every string counts how many students of the loaded courses use it, so the strings of an evicted course
+    are dropped once no other course uses them.
+
+    Attributes:
+        strings (dict): A dictionary mapping each string to its shared copy.
+        uses (Counter): The number of students using each string.
+
+    """
+    def __init__(self):
+        """
+        Initializes an empty InternTable object.
+
+        Running Example:
+            table = InternTable()
+        """
+        self.strings = {}
+        self.uses = Counter()
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, text):
+        """
+        Gets the shared copy of a string, adding it to the table if needed, and counts one more use.
+
+        :param text: The string.
+        :type text: str
+        :return: The shared string equal to text.
+        :rtype: str
+
+        Running Example:
+            sID = table.intern('985002509')
+        """
+        shared = self.strings.setdefault(text, text)
+        self.uses[shared] += 1
+        return shared
+
+    def release(self, text):
+        """
+        Counts one use less of a string, dropping it from the table once it is no longer used.
+
+        :param text: The string.
+        :type text: str
+
+        Running Example:
+            table.release('985002509')
+        """
+        self.uses[text] -= 1
+        if self.uses[text] <= 0:
+            del self.uses[text]
+            self.strings.pop(text, None)
+
+
+class CourseManager:
+    """
+    A class holding the rosters of many courses at once.
+
+    A course is loaded on first access, from its snapshot if there is one or else from its roster file.
+    When the loaded courses need more than the budget, the least recently used ones are evicted;
+    a course changed since it was loaded is saved to a snapshot first and loaded from it next time.
+
+    Attributes:
+        budget (int): The memory in bytes the loaded courses may use, estimated from their number of students.
+        internTable (InternTable): The student ID and name strings shared by the loaded courses.
+        spillDirectory (str): The directory of the snapshots of changed courses without a snapshot path.
+        sources (dict): A dictionary mapping each course name to its roster path, snapshot path and grading scale.
+        loaded (OrderedDict): The loaded courses, from the least to the most recently used.
+        loadedVersions (dict): The version of each loaded course when it was loaded or last saved.
+        internedCounts (dict): The number of students of each loaded course whose strings were interned on loading;
+                               students added later keep their own strings.
+
+    """
+    def __init__(self, budget=256 * 1024 * 1024, spillDirectory=None):
+        """
+        Initializes a CourseManager object without courses.
+
+        :param budget: The memory in bytes the loaded courses may use.
+        :type budget: int
+        :param spillDirectory: The directory for the snapshots of changed courses, a temporary one if None.
+        :type spillDirectory: str
+
+        Running Example:
+            manager = CourseManager(budget=64 * 1024 * 1024)
+        """
+        self.budget = budget
+        self.internTable = InternTable()
+        self.spillDirectory = spillDirectory
+        self.sources = {}
+        self.loaded = OrderedDict()
+        self.loadedVersions = {}
+        self.internedCounts = {}
+
+    def __contains__(self, name):
+        return name in self.sources
+
+    def __len__(self):
+        return len(self.sources)
+
+    def addCourse(self, name, rosterPath=None, snapshotPath=None, gradingScale=None):
+        """
+        Registers a course; nothing is read until the course is used.
+
+        :param name: The name of the course.
+        :type name: str
+        :param rosterPath: The roster file of the course, None for a course without students.
+        :type rosterPath: str
+        :param snapshotPath: The snapshot of the course, read instead of the roster file once it exists,
+                             and written when the course is evicted after a change.
+        :type snapshotPath: str
+        :param gradingScale: The grading scale of the course, the default scale if None.
+        :type gradingScale: GradingScale
+
+        Running Example:
+            manager.addCourse('CS101-A', 'cs101a.txt')
+        """
+        if name in self.sources:
+            raise AssertionError(f"Course '{name}' already exists.")
+        self.sources[name] = {'rosterPath': rosterPath, 'snapshotPath': snapshotPath, 'gradingScale': gradingScale}
+
+    def course(self, name):
+        """
+        Gets the grade system of a course, loading it if needed and evicting cold courses to stay in the budget.
+
+        :param name: The name of the course.
+        :type name: str
+        :return: The grade system of the course.
+        :rtype: GradeSystem
+
+        Running Example:
+            manager.course('CS101-A').showRank('985002509')
+        """
+        gradeSystem = self.loaded.get(name)
+        if gradeSystem is not None:
+            self.loaded.move_to_end(name)
+            return gradeSystem
+        if name not in self.sources:
+            raise LookupError(f"Course '{name}' not found.")
+        gradeSystem = self._load(name)
+        gradeSystem.internStrings(self.internTable.intern)
+        self.loaded[name] = gradeSystem
+        self.loadedVersions[name] = gradeSystem.version
+        self.internedCounts[name] = len(gradeSystem.studentList)
+        self._evictOver(keep=name)
+        return gradeSystem
+
+    def _load(self, name):
+        source = self.sources[name]
+        snapshotPath = source['snapshotPath']
+        if snapshotPath is not None and os.path.exists(snapshotPath):
+            return loadSnapshot(snapshotPath)
+        return GradeSystem(source['rosterPath'], source['gradingScale'])
+
+    def usedBytes(self):
+        """
+        Estimates the memory used by the loaded courses.
+
+        :return: The estimated number of bytes.
+        :rtype: int
+
+        Running Example:
+            print(manager.usedBytes())
+        """
+        return sum(len(gradeSystem.studentList) for gradeSystem in self.loaded.values()) * BYTES_PER_STUDENT
+
+    def _evictOver(self, keep):
+        # Evicts the least recently used courses other than keep until the loaded courses fit in the budget
+        for name in list(self.loaded):
+            if self.usedBytes() <= self.budget:
+                break
+            if name != keep:
+                self.evict(name)
+
+    def evict(self, name):
+        """
+        Unloads a course, saving it to a snapshot first if it changed since it was loaded.
+
+        :param name: The name of the course.
+        :type name: str
+
+        Running Example:
+            manager.evict('CS101-A')
+        """
+        gradeSystem = self.loaded.pop(name, None)
+        if gradeSystem is None:
+            return
+        if gradeSystem.version != self.loadedVersions.pop(name):
+            self._spill(name, gradeSystem)
+        release = self.internTable.release
+        for student in gradeSystem.studentList[:self.internedCounts.pop(name)]:
+            release(student.sID)
+            release(student.name)
+
+    def _spill(self, name, gradeSystem):
+        source = self.sources[name]
+        if source['snapshotPath'] is None:
+            if self.spillDirectory is None:
+                self.spillDirectory = tempfile.mkdtemp(prefix='courses-')
+            source['snapshotPath'] = os.path.join(self.spillDirectory, f"course{list(self.sources).index(name)}.snap")
+        saveSnapshot(gradeSystem, source['snapshotPath'] + '.tmp')
+        os.replace(source['snapshotPath'] + '.tmp', source['snapshotPath'])
+
+    def save(self):
+        """
+        Saves every loaded course changed since it was loaded to its snapshot.
+
+        Running Example:
+            manager.save()
+        """
+        for name, gradeSystem in self.loaded.items():
+            if gradeSystem.version != self.loadedVersions[name]:
+                self._spill(name, gradeSystem)
+                self.loadedVersions[name] = gradeSystem.version
@@ -0,0 +1,57 @@
+import pytest
+from GradeManager import CourseManager, BYTES_PER_STUDENT
+
+@pytest.fixture
+def rosters(tmp_path):
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("110006213 Bill 90 85 95 88 92\n110006214 Anna 60 60 60 60 60\n", encoding='utf-8')
+    second.write_text("110006213 Bill 70 75 80 85 90\n110006215 Cody 50 55 60 65 70\n", encoding='utf-8')
+    return str(first), str(second)
+
+def test_shared_strings(rosters):
+    """
+    Test Function: CourseManager.course(name)
+    Test Description:
+        -Step 1: Registering two courses sharing student "110006213" and using both
+            Expected result : the courses are loaded on first use and the shared student's ID and name are one string
+        -Step 2: Using an unknown course
+            Expected result : LookupError is raised
+    """
+    manager = CourseManager()
+    manager.addCourse('first', rosters[0])
+    manager.addCourse('second', rosters[1])
+    assert len(manager.loaded) == 0
+    first = manager.course('first').studentIndex['110006213']
+    second = manager.course('second').studentIndex['110006213']
+    assert first is not second and first.averageScore != second.averageScore
+    assert first.sID is second.sID and first.name is second.name
+    assert len(manager.internTable) == 6
+    with pytest.raises(LookupError):
+        manager.course('third')
+
+def test_eviction_and_spill(rosters, tmp_path):
+    """
+    Test Function: CourseManager.course(name), CourseManager.evict(name)
+    Test Description:
+        -Step 1: Using two courses with a budget that fits one course
+            Expected result : the least recently used course is evicted
+        -Step 2: Updating a score of the first course, then using the second course
+            Expected result : the first course is saved to a snapshot when evicted, and keeps the change when reloaded
+        -Step 3: Evicting every course
+            Expected result : the shared string table is empty
+    """
+    manager = CourseManager(budget=2 * BYTES_PER_STUDENT, spillDirectory=str(tmp_path))
+    manager.addCourse('first', rosters[0])
+    manager.addCourse('second', rosters[1])
+    manager.course('first')
+    manager.course('second')
+    assert list(manager.loaded) == ['second']
+    assert manager.course('first').updateScore("110006214 final 100")
+    manager.course('second')
+    assert list(manager.loaded) == ['second']
+    assert manager.sources['first']['snapshotPath'] is not None
+    assert manager.course('first').getScore("110006214") == [60, 60, 60, 60, 100]
+    for name in list(manager.loaded):
+        manager.evict(name)
+    assert len(manager.internTable) == 0 and manager.usedBytes() == 0
@@ -0,0 +1,368 @@
+import sqlite3
+import time
+from GradeSystem import GradeSystem, GradingScale, Student, DEFAULT_SCALE
+
+# Students keep the order they were added in seq, which also breaks ties in the ranking like in GradeSystem.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    seq INTEGER PRIMARY KEY,
+    sID TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    lab1 REAL NOT NULL, lab2 REAL NOT NULL, lab3 REAL NOT NULL, midterm REAL NOT NULL, final REAL NOT NULL,
+    averageScore REAL NOT NULL,
+    letterGrade TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS students_rank ON students (averageScore DESC, seq);
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+INSERT_STUDENT = ("INSERT INTO students (sID, name, lab1, lab2, lab3, midterm, final, averageScore, letterGrade) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+SELECT_STUDENT = ("SELECT seq, sID, name, lab1, lab2, lab3, midterm, final, averageScore, letterGrade "
+                  "FROM students WHERE sID = ?")
+# The weighted sum is written left to right, the same order Student.average sums in, so the averages are identical
+WEIGHTED_AVERAGE = "lab1 * :w0 + lab2 * :w1 + lab3 * :w2 + midterm * :w3 + final * :w4"
+UPDATE_WEIGHTS = (f"UPDATE students SET averageScore = {WEIGHTED_AVERAGE}, "
+                  f"letterGrade = letterGrade({WEIGHTED_AVERAGE})")
+UPDATE_SCALE = "UPDATE students SET letterGrade = letterGrade(averageScore)"
+COUNT_ABOVE = ("SELECT (SELECT COUNT(*) FROM students WHERE averageScore > :average) + "
+               "(SELECT COUNT(*) FROM students WHERE averageScore = :average AND seq < :seq)")
+SELECT_ABOVE = ("SELECT sID, name, lab1, lab2, lab3, midterm, final, averageScore, letterGrade FROM students "
+                "WHERE averageScore > ? ORDER BY averageScore DESC, seq")
+SELECT_TOP = ("SELECT sID, name, lab1, lab2, lab3, midterm, final, averageScore, letterGrade FROM students "
+              "ORDER BY averageScore DESC, seq LIMIT ?")
+COUNT_LETTERS = "SELECT letterGrade, COUNT(*) FROM students GROUP BY letterGrade"
+
+
+def _student(row):
+    # Creates a Student from a (sID, name, five scores, averageScore, letterGrade) row
+    return Student.fromValues(row[0], row[1], list(row[2:7]), row[7], row[8])
+
+
+class SQLiteGradeSystem:
+    """
+    A class representing a grading system stored in a SQLite database instead of in memory.
+
+    It offers the same methods as GradeSystem. The roster can be larger than memory and is kept between runs
+    when the database is a file. Students are looked up through the unique index on sID and ranked through the
+    index on averageScore; the averages are calculated exactly as in GradeSystem.
+
+    Attributes:
+        connection (sqlite3.Connection): The connection to the database.
+        weightList (list): A list of weights for each grade.
+        gradingScale (GradingScale): The cut-offs used to convert average scores to letter grades.
+        loadStats (dict): Statistics of the last roster file loaded, or None.
+
+    """
+    batchSize = 10000
+
+    def __init__(self, path='input.txt', database=':memory:', gradingScale=None):
+        """
+        Opens or creates the database, then loads a roster file into it.
+
+        :param path: The roster file to load students from, or None to use the students already in the database.
+        :type path: str
+        :param database: The database file, ':memory:' for a temporary database.
+        :type database: str
+        :param gradingScale: The grading scale of the course; if None, the one stored in the database or the default.
+                             The students already in the database are regraded when it differs from the stored one.
+        :type gradingScale: GradingScale
+
+        Running Example:
+            grade_system = SQLiteGradeSystem('input.txt', 'roster.db')
+            grade_system = SQLiteGradeSystem(None, 'roster.db')
+        """
+        self.connection = sqlite3.connect(database)
+        if database != ':memory:':
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        settings = dict(self.connection.execute("SELECT key, value FROM settings"))
+        self.weightList = [float(weight) for weight in settings['weights'].split()] if 'weights' in settings \
+            else [0.1, 0.1, 0.1, 0.3, 0.4]
+        if gradingScale is None:
+            gradingScale = GradingScale.parse(settings['scale']) if 'scale' in settings else DEFAULT_SCALE
+        self.gradingScale = gradingScale
+        self.connection.create_function('letterGrade', 1, lambda average: self.gradingScale.letter(average),
+                                        deterministic=True)
+        with self.connection:
+            if 'scale' in settings and GradingScale.parse(settings['scale']) != gradingScale:
+                self.connection.execute(UPDATE_SCALE)
+            self._saveSettings()
+        self.loadStats = None
+        if path is not None:
+            self.load(path)
+
+    def _saveSettings(self):
+        self.connection.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                    [('weights', ' '.join(repr(weight) for weight in self.weightList)),
+                                     ('scale', str(self.gradingScale))])
+
+    def close(self):
+        """
+        Closes the database.
+
+        Running Example:
+            grade_system.close()
+        """
+        self.connection.close()
+
+    def load(self, path):
+        """
+        Loads students from a roster file with one student per line (sID name lab1 lab2 lab3 mid final).
+
+        The students are graded in Python and inserted in batches with executemany, in one transaction.
+        A malformed line is reported with its line number and skipped, the rest of the file is still loaded.
+
+        :param path: The roster file to load.
+        :type path: str
+        :return: The load statistics, also kept in loadStats: rows loaded, errors as (line number, message)
+                 pairs, seconds taken and rows per second.
+        :rtype: dict
+
+        Running Example:
+            stats = grade_system.load('input.txt')
+        """
+        start = time.perf_counter()
+        rows = 0
+        errors = []
+        seen = set()
+        checkExisting = self.connection.execute("SELECT 1 FROM students LIMIT 1").fetchone() is not None
+        batch = []
+        try:
+            with open(path, 'r', encoding='utf-8') as fh, self.connection:
+                for lineNumber, line in enumerate(fh, start=1):
+                    tmp = line.split()
+                    if not tmp:
+                        continue
+                    try:
+                        assert len(tmp) == 7, "Invalid data format in input file"
+                        assert tmp[0] not in seen and not (checkExisting and self._exists(tmp[0])), \
+                            "Student with ID '{}' already exists.".format(tmp[0])
+                        student = Student(*tmp, self.weightList, self.gradingScale)
+                    except Exception as e:
+                        print(f"Error occurred while reading line {lineNumber}:", e)
+                        errors.append((lineNumber, str(e)))
+                        continue
+                    seen.add(student.sID)
+                    batch.append((student.sID, student.name, *student.scores, student.averageScore,
+                                  student.letterGrade))
+                    if len(batch) >= self.batchSize:
+                        self.connection.executemany(INSERT_STUDENT, batch)
+                        rows += len(batch)
+                        batch = []
+                self.connection.executemany(INSERT_STUDENT, batch)
+                rows += len(batch)
+        except FileNotFoundError:
+            print(f"Error: File '{path}' not found.")
+        except Exception as e:
+            print("Error occurred while reading file:", e)
+        seconds = time.perf_counter() - start
+        self.loadStats = {'path': path, 'rows': rows, 'errors': errors, 'seconds': seconds,
+                          'rowsPerSecond': rows / seconds if seconds > 0 else 0.0}
+        return self.loadStats
+
+    def _exists(self, sID):
+        return self.connection.execute("SELECT 1 FROM students WHERE sID = ?", (sID,)).fetchone() is not None
+
+    def addStudent(self, info):
+        """
+        Adding a new student to the database, as well as all his/her grades.
+
+        :param info: A string containing information about the new student in the format (sID name lab1 lab2 lab3 mid final).
+        :type info: str
+        :return: True if the student was added.
+        :rtype: bool
+
+        Running Example:
+            grade_system.addStudent('123 John 90 85 75 85 90')
+        """
+        try:
+            newInfo = info.split()
+            if newInfo and self._exists(newInfo[0]):
+                raise AssertionError("Student with ID '{}' already exists.".format(newInfo[0]))
+            if len(newInfo) != 7:
+                raise ValueError("Invalid data format: Expected 7 elements")
+            student = Student(*newInfo, self.weightList, self.gradingScale)
+            with self.connection:
+                self.connection.execute(INSERT_STUDENT, (student.sID, student.name, *student.scores,
+                                                         student.averageScore, student.letterGrade))
+            print('Student added successfully.')
+            return True
+        except Exception as e:
+            print("Error adding student:", e)
+        return False
+
+    def updateScore(self, info):
+        """
+        Updating one or more score of a certain student.
+
+        :param info: A string containing the updated scores and the score names for a student in the format 'sID score_name new_score ...'.
+        :type info: str
+        :return: True if the scores were updated.
+        :rtype: bool
+
+        Running Example:
+            grade_system.updateScore('123 lab1 88 lab3 89')
+        """
+        try:
+            newInfo = info.split()
+            row = self.connection.execute(SELECT_STUDENT, (newInfo[0],)).fetchone()
+            if row is None:
+                raise AssertionError(f"Student with ID {newInfo[0]} not found.")
+            tmpScores = list(row[3:8])
+            for column, score in self._stageChanges(newInfo[1:], 'score'):
+                tmpScores[column] = score
+            student = Student.fromValues(row[1], row[2], tmpScores, 0.0, '')
+            student.recalculate(self.weightList, self.gradingScale)
+            with self.connection:
+                self.connection.execute("UPDATE students SET lab1 = ?, lab2 = ?, lab3 = ?, midterm = ?, final = ?, "
+                                        "averageScore = ?, letterGrade = ? WHERE seq = ?",
+                                        (*tmpScores, student.averageScore, student.letterGrade, row[0]))
+            return True
+        except Exception as e:
+            print("Error updating score:", e)
+        return False
+
+    # Scores and weights are validated exactly as in GradeSystem
+    _stageChanges = staticmethod(GradeSystem._stageChanges)
+    _checkWeight = staticmethod(GradeSystem._checkWeight)
+    _stageWeights = GradeSystem._stageWeights
+
+    def updateWeight(self, info):
+        """
+        Updates the weights of lab assignments, midterm, and final exam, regrading every student in one statement.
+
+        :param info: A string containing the new weights for lab assignments, midterm, and final exam in the format 'weight_name new_weight ...'.
+        :type info: str
+        :return: True if the weights were updated.
+        :rtype: bool
+
+        Running Example:
+            grade_system.updateWeight('lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.3 final 0.4')
+        """
+        try:
+            weightList = self._stageWeights(info)
+            with self.connection:
+                self.connection.execute(UPDATE_WEIGHTS, {f"w{i}": weight for i, weight in enumerate(weightList)})
+                self.weightList = weightList
+                self._saveSettings()
+            return True
+        except Exception as e:
+            print("Error updating weight:", e)
+        return False
+
+    def getScore(self, sID):
+        """
+        Gets the scores of a student, using his/her student id.
+
+        :param sID: The ID of the student.
+        :type sID: str
+        :return: The scores (lab1, lab2, lab3, midterm, final), or None if the student is not found.
+        :rtype: list
+
+        Running Example:
+            scores = grade_system.getScore('123')
+        """
+        row = self.connection.execute(SELECT_STUDENT, (sID,)).fetchone()
+        return list(row[3:8]) if row is not None else None
+
+    def getLetterGrade(self, sID):
+        """
+        Gets the letter grade of a student by his/her student id.
+
+        :param sID: The ID of the student.
+        :type sID: str
+        :return: The letter grade, or None if the student is not found.
+        :rtype: str
+
+        Running Example:
+            letter_grade = grade_system.getLetterGrade('123')
+        """
+        row = self.connection.execute("SELECT letterGrade FROM students WHERE sID = ?", (sID,)).fetchone()
+        return row[0] if row is not None else None
+
+    def getAverage(self, sID):
+        """
+        Gets the average score of a student by his/her student id.
+
+        :param sID: The ID of the student.
+        :type sID: str
+        :return: The average score, or None if the student is not found.
+        :rtype: float
+
+        Running Example:
+            average_score = grade_system.getAverage('123')
+        """
+        row = self.connection.execute("SELECT averageScore FROM students WHERE sID = ?", (sID,)).fetchone()
+        return row[0] if row is not None else None
+
+    def getRank(self, sID):
+        """
+        Gets the rank of a student identified by his/her student id.
+
+        The students ranked above are counted on the averageScore index, so the cost grows with the rank.
+
+        :param sID: The ID of the student.
+        :type sID: str
+        :return: The rank, starting from 1 for the highest average score, or None if the student is not found.
+        :rtype: int
+
+        Running Example:
+            rank = grade_system.getRank('123')
+        """
+        row = self.connection.execute("SELECT averageScore, seq FROM students WHERE sID = ?", (sID,)).fetchone()
+        if row is None:
+            return None
+        return self.connection.execute(COUNT_ABOVE, {'average': row[0], 'seq': row[1]}).fetchone()[0] + 1
+
+    def getGradeDistribution(self):
+        """
+        Gets the distribution of letter grades from all students.
+
+        :return: The number of students with each letter grade.
+        :rtype: dict
+
+        Running Example:
+            distribution = grade_system.getGradeDistribution()
+        """
+        distribution = self.gradingScale.emptyDistribution()
+        for letter, count in self.connection.execute(COUNT_LETTERS):
+            distribution[letter] = count
+        return distribution
+
+    def getFilter(self, Thres):
+        """
+        Iterates over all the students which the score is above the threshold, best first, with their rank.
+
+        :param Thres: The threshold score.
+        :type Thres: float
+        :return: An iterator of (rank, Student) pairs.
+        :rtype: iterator
+
+        Running Example:
+            for rank, student in grade_system.getFilter(85):
+                print(rank, student.name)
+        """
+        return enumerate(map(_student, self.connection.execute(SELECT_ABOVE, (float(Thres),))), start=1)
+
+    def topK(self, k):
+        """
+        Gets the k students with the highest average scores, best first.
+
+        :param k: The number of students wanted.
+        :type k: int
+        :return: The students, at most k of them.
+        :rtype: list
+
+        Running Example:
+            best = grade_system.topK(50)
+        """
+        return [_student(row) for row in self.connection.execute(SELECT_TOP, (max(k, 0),))]
+
+    # The text output is the same as GradeSystem's, built from the get methods above
+    showScore = GradeSystem.showScore
+    showLetterGrade = GradeSystem.showLetterGrade
+    showAverage = GradeSystem.showAverage
+    showRank = GradeSystem.showRank
+    showGradeDistribution = GradeSystem.showGradeDistribution
+    showFilter = GradeSystem.showFilter
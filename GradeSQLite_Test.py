@@ -0,0 +1,82 @@
+import pytest
+from GradeSystem import GradeSystem, GradingScale
+from GradeSQLite import SQLiteGradeSystem
+
+@pytest.fixture
+def grade_systems():
+    return GradeSystem(), SQLiteGradeSystem()
+
+def test_same_results(grade_systems, capsys):
+    """
+    Test Function: SQLiteGradeSystem.addStudent(info), updateScore(info), updateWeight(info) and the get methods
+    Test Description:
+        -Step 1: Applying the same changes, valid and invalid, to a GradeSystem and a SQLiteGradeSystem
+            Expected result : both return and print the same
+        -Step 2: Getting the scores, letter grade, average and ranking of every student, the distribution and the filter
+            Expected result : both give the same results
+    """
+    memory, database = grade_systems
+    for method, info in [('addStudent', "110006213 Bill 99 95 95 98 92"), ('addStudent', "110006213 Bill 99 95 95 98 92"),
+                         ('addStudent', "110006214 Anna 90 90 90"), ('updateScore', "985002509 final 10"),
+                         ('updateScore', "985002509 exam 1"), ('updateWeight', "lab1 0.9"),
+                         ('updateWeight', "lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8")]:
+        expected = getattr(memory, method)(info), capsys.readouterr().out
+        assert (getattr(database, method)(info), capsys.readouterr().out) == expected
+    for student in memory.studentList:
+        for getter in ('getScore', 'getLetterGrade', 'getAverage', 'getRank'):
+            assert getattr(memory, getter)(student.sID) == getattr(database, getter)(student.sID)
+    assert database.getRank("110006221") is None
+    assert memory.getGradeDistribution() == database.getGradeDistribution()
+    assert [(rank, student.sID) for rank, student in memory.getFilter(85)] == \
+           [(rank, student.sID) for rank, student in database.getFilter(85)]
+    memory.showFilter(70)
+    expected = capsys.readouterr().out
+    database.showFilter(70)
+    assert capsys.readouterr().out == expected
+
+def test_persistence(tmp_path):
+    """
+    Test Function: SQLiteGradeSystem(path, database)
+    Test Description:
+        -Step 1: Loading input.txt into a database file, then updating a score and the weights
+        -Step 2: Reopening the database file without a roster
+            Expected result : the students, the score and the weights are still there
+        -Step 3: Loading input.txt again into the same database
+            Expected result : every line is reported as an existing student and nothing is added
+    """
+    database = str(tmp_path / "roster.db")
+    grade_system = SQLiteGradeSystem('input.txt', database)
+    assert grade_system.loadStats['rows'] == 63
+    grade_system.updateScore("985002509 final 10")
+    grade_system.updateWeight("lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2")
+    grade_system.close()
+    reopened = SQLiteGradeSystem(None, database)
+    assert reopened.weightList == [0.2, 0.2, 0.2, 0.2, 0.2]
+    assert reopened.getScore("985002509") == [84, 92, 98, 94, 10]
+    assert len(reopened.load('input.txt')['errors']) == 63
+    assert sum(reopened.getGradeDistribution().values()) == 63
+    reopened.close()
+
+def test_reopen_with_scale(tmp_path):
+    """
+    Test Function: SQLiteGradeSystem(path, database, gradingScale)
+    Test Description:
+        -Step 1: Loading input.txt into a database file with the default scale
+        -Step 2: Reopening the database file with another grading scale
+            Expected result : every student is regraded with the new scale, like a GradeSystem using it
+        -Step 3: Reopening the database file without a grading scale
+            Expected result : the new scale was stored and the letter grades are unchanged
+    """
+    database = str(tmp_path / "roster.db")
+    SQLiteGradeSystem('input.txt', database).close()
+    scale = GradingScale.parse('F 60 D 70 C 80 B 90 A')
+    expected = GradeSystem(gradingScale=scale)
+    reopened = SQLiteGradeSystem(None, database, scale)
+    assert reopened.getGradeDistribution() == expected.getGradeDistribution()
+    for student in expected.studentList:
+        assert reopened.getLetterGrade(student.sID) == student.letterGrade
+    reopened.close()
+    reopened = SQLiteGradeSystem(None, database)
+    assert reopened.gradingScale == scale
+    assert reopened.getGradeDistribution() == expected.getGradeDistribution()
+    reopened.close()
@@ -0,0 +1,186 @@
+import asyncio
+import contextlib
+import io
+import sys
+from GradeSystem import GradeSystem
+
+# Line protocol: the client sends one command per line; the server answers either
+#   'OK <n>' followed by n lines of data, or 'ERR <message>'.
+#   SCORE sID                    lab1 lab2 lab3 midterm final
+#   LETTER sID                   letter grade
+#   AVERAGE sID                  average score
+#   RANK sID                     rank
+#   FILTER threshold             'rank name sID letter average' for every student above the threshold
+#   DISTRIBUTION                 'letter count' for every letter grade
+#   ADD sID name lab1 lab2 lab3 mid final
+#   UPDATE sID score_name new_score ...
+#   WEIGHT weight_name new_weight ...
+#   QUIT
+
+
+class GradeServer:
+    """
+    A class serving one in-memory grade system to many clients over a line protocol.
+
+    Queries and small changes run directly on the event loop, so each one sees the roster either before or
+    after any change. A weight update regrades a copy of the roster in a worker thread while queries keep
+    being answered from the current roster, then the copy replaces it. Changes are serialized by a lock.
+
+    Attributes:
+        gradeSystem (GradeSystem): The grade system being served.
+
+    """
+    def __init__(self, gradeSystem):
+        """
+        Initializes the GradeServer object.
+
+        :param gradeSystem: The grade system to serve.
+        :type gradeSystem: GradeSystem
+
+        Running Example:
+            server = GradeServer(GradeSystem())
+        """
+        self.gradeSystem = gradeSystem
+        self.writeLock = None
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """
+        Starts listening for clients.
+
+        :param host: The address to listen on.
+        :type host: str
+        :param port: The port to listen on, 0 for any free port.
+        :type port: int
+        :return: The listening server.
+        :rtype: asyncio.Server
+
+        Running Example:
+            server = await GradeServer(GradeSystem()).start(port=8765)
+        """
+        self.writeLock = asyncio.Lock()
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def handle(self, reader, writer):
+        """
+        Answers the commands of one client until it sends QUIT or disconnects.
+
+        :param reader: The stream the client's commands are read from.
+        :type reader: asyncio.StreamReader
+        :param writer: The stream the answers are written to.
+        :type writer: asyncio.StreamWriter
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode('utf-8').strip().partition(' ')
+                command = command.upper()
+                if command == 'QUIT':
+                    break
+                try:
+                    if command in ('ADD', 'UPDATE', 'WEIGHT'):
+                        rows = await self.write(command, argument)
+                    else:
+                        rows = self.query(command, argument)
+                    response = [f"OK {len(rows)}"] + rows
+                except Exception as e:
+                    response = ["ERR " + ' '.join(str(e).split())]
+                writer.write(('\n'.join(response) + '\n').encode('utf-8'))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def query(self, command, argument):
+        """
+        Answers a query command.
+
+        :param command: The command name.
+        :type command: str
+        :param argument: The rest of the command line.
+        :type argument: str
+        :return: The lines of the answer.
+        :rtype: list
+        """
+        gradeSystem = self.gradeSystem
+        if command == 'DISTRIBUTION':
+            return [f"{grade} {count}" for grade, count in gradeSystem.getGradeDistribution().items()]
+        if command == 'FILTER':
+            return [f"{i} {student.name} {student.sID} {student.letterGrade} {student.averageScore:.2f}"
+                    for i, student in gradeSystem.getFilter(float(argument))]
+        getters = {'SCORE': gradeSystem.getScore, 'LETTER': gradeSystem.getLetterGrade,
+                   'AVERAGE': gradeSystem.getAverage, 'RANK': gradeSystem.getRank}
+        if command not in getters:
+            raise ValueError(f"Unknown command: {command}")
+        value = getters[command](argument)
+        if value is None:
+            raise LookupError(f"Student with ID {argument} not found.")
+        if command == 'SCORE':
+            return [' '.join(str(score) for score in value)]
+        if command == 'AVERAGE':
+            return [f"{value:.2f}"]
+        return [str(value)]
+
+    async def write(self, command, argument):
+        """
+        Applies a change command, one at a time.
+
+        :param command: The command name.
+        :type command: str
+        :param argument: The rest of the command line.
+        :type argument: str
+        :return: The lines of the answer, empty on success.
+        :rtype: list
+        """
+        async with self.writeLock:
+            if command == 'WEIGHT':
+                gradeSystem = self.gradeSystem
+                # Raises on invalid weights before any work is done
+                weightList = gradeSystem._stageWeights(argument)
+                regraded = await asyncio.get_running_loop().run_in_executor(None, self._regrade, weightList)
+                regraded.journal = gradeSystem.journal
+                if regraded.journal is not None:
+                    regraded.journal.append('weight', argument)
+                self.gradeSystem = regraded
+                return []
+            method = self.gradeSystem.addStudent if command == 'ADD' else self.gradeSystem.updateScore
+            # Nothing else runs on the loop meanwhile, so capturing the printed messages is safe
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                succeeded = method(argument)
+            if not succeeded:
+                raise ValueError(output.getvalue())
+            return []
+
+    def _regrade(self, weightList):
+        # Runs in a worker thread: regrades a copy, leaving the served roster untouched
+        regraded = self.gradeSystem.clone()
+        regraded._applyWeights(weightList)
+        # A lazy copy is settled here too, so no query has to regrade it on the event loop
+        regraded.settle()
+        return regraded
+
+
+async def serve(gradeSystem, host='127.0.0.1', port=8765):
+    """
+    Serves a grade system until cancelled.
+
+    :param gradeSystem: The grade system to serve.
+    :type gradeSystem: GradeSystem
+    :param host: The address to listen on.
+    :type host: str
+    :param port: The port to listen on.
+    :type port: int
+
+    Running Example:
+        asyncio.run(serve(GradeSystem()))
+    """
+    server = await GradeServer(gradeSystem).start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    # Usage: python GradeServer.py [roster file] [port]
+    roster = sys.argv[1] if len(sys.argv) > 1 else 'input.txt'
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    asyncio.run(serve(GradeSystem(roster), port=port))
@@ -0,0 +1,100 @@
+import asyncio
+from GradeSystem import GradeSystem
+from GradeServer import GradeServer
+
+async def request(reader, writer, line):
+    writer.write((line + '\n').encode('utf-8'))
+    status = (await reader.readline()).decode('utf-8').strip()
+    if status.startswith('ERR'):
+        return status, []
+    rows = [(await reader.readline()).decode('utf-8').rstrip('\n') for _ in range(int(status.split()[1]))]
+    return 'OK', rows
+
+def run_with_server(scenario, grade_system=None):
+    async def main():
+        grade_server = GradeServer(grade_system if grade_system is not None else GradeSystem())
+        server = await grade_server.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            result = await scenario(grade_server, port, reader, writer)
+            writer.write(b'QUIT\n')
+            assert await reader.read() == b''
+            writer.close()
+        return result
+    return asyncio.run(main())
+
+def test_server_queries():
+    """
+    Test Function: GradeServer.query(command, argument)
+    Test Description:
+        -Step 1: Sending SCORE, LETTER, AVERAGE, RANK, FILTER and DISTRIBUTION for the default data
+            Expected result : the answers match the default data
+        -Step 2: Sending a query for a missing student and an unknown command
+            Expected result : ERR is answered
+    """
+    async def scenario(grade_server, port, reader, writer):
+        assert await request(reader, writer, 'SCORE 985002509') == ('OK', ['84.0 92.0 98.0 94.0 99.0'])
+        assert await request(reader, writer, 'LETTER 985002509') == ('OK', ['A+'])
+        assert await request(reader, writer, 'AVERAGE 985002509') == ('OK', ['95.20'])
+        assert await request(reader, writer, 'RANK 985002509') == ('OK', ['1'])
+        _, rows = await request(reader, writer, 'FILTER 93')
+        assert rows[0] == '1 蔡宗衛 985002509 A+ 95.20' and len(rows) == 8
+        _, rows = await request(reader, writer, 'DISTRIBUTION')
+        assert rows[:3] == ['A+ 27', 'A 33', 'A- 3']
+        assert (await request(reader, writer, 'RANK 110006221'))[0] == 'ERR Student with ID 110006221 not found.'
+        assert (await request(reader, writer, 'HELLO'))[0].startswith('ERR')
+    run_with_server(scenario)
+
+def test_server_changes():
+    """
+    Test Function: GradeServer.write(command, argument)
+    Test Description:
+        -Step 1: Sending ADD, UPDATE and WEIGHT
+            Expected result : the served grade system is changed
+        -Step 2: Sending invalid ADD, UPDATE and WEIGHT
+            Expected result : ERR is answered and nothing is changed
+        -Step 3: Sending queries from a second client while a WEIGHT is being applied
+            Expected result : the queries are answered
+    """
+    async def scenario(grade_server, port, reader, writer):
+        assert await request(reader, writer, 'ADD 110006213 Bill 99 95 95 98 92') == ('OK', [])
+        assert await request(reader, writer, 'UPDATE 110006213 lab1 10 lab2 10 lab3 10 midterm 10 final 90') == ('OK', [])
+        assert await request(reader, writer, 'LETTER 110006213') == ('OK', ['E'])
+        assert (await request(reader, writer, 'ADD 110006213 Bill 99 95 95 98 92'))[0].startswith('ERR')
+        assert (await request(reader, writer, 'UPDATE 110006213 lab5 10'))[0].startswith('ERR')
+        assert (await request(reader, writer, 'WEIGHT lab1 0.5 final 0.9'))[0].startswith('ERR')
+
+        other_reader, other_writer = await asyncio.open_connection('127.0.0.1', port)
+        weight = asyncio.ensure_future(request(reader, writer, 'WEIGHT lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8'))
+        for _ in range(5):
+            assert (await request(other_reader, other_writer, 'RANK 985002509'))[0] == 'OK'
+        assert await weight == ('OK', [])
+        other_writer.write(b'QUIT\n')
+        await other_reader.read()
+        other_writer.close()
+        assert await request(reader, writer, 'AVERAGE 110006213') == ('OK', ['74.00'])
+        assert grade_server.gradeSystem.weightList == [0.05, 0.05, 0.05, 0.05, 0.8]
+    run_with_server(scenario)
+
+def test_server_lazy_weights():
+    """
+    Test Function: GradeServer.write(command, argument) with GradeSystem(lazy=True)
+    Test Description:
+        -Step 1: Sending WEIGHT to a server of a lazy grade system
+            Expected result : the served grade system is replaced by a regraded copy that is not stale
+        -Step 2: Sending RANK and DISTRIBUTION
+            Expected result : the answers follow the new weights
+    """
+    grade_system = GradeSystem(lazy=True)
+
+    async def scenario(grade_server, port, reader, writer):
+        assert await request(reader, writer, 'WEIGHT lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8') == ('OK', [])
+        assert grade_server.gradeSystem is not grade_system and not grade_server.gradeSystem.stale
+        assert grade_server.gradeSystem.weightList == [0.05, 0.05, 0.05, 0.05, 0.8]
+        expected = GradeSystem()
+        expected.updateWeight('lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8')
+        assert await request(reader, writer, 'RANK 985002509') == ('OK', [str(expected.getRank('985002509'))])
+        _, rows = await request(reader, writer, 'DISTRIBUTION')
+        assert rows == [f"{grade} {count}" for grade, count in expected.getGradeDistribution().items()]
+    run_with_server(scenario, grade_system)
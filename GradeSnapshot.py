@@ -0,0 +1,102 @@
+from array import array
+import struct
+import sys
+from GradeSystem import GradeSystem, GradingScale, Student, pausedGarbageCollection
+
+# File layout, all numbers little-endian:
+#   header        magic, number of students N, the five weights
+#   scores        N x 5 doubles, one row per student in studentList order
+#   averages      N doubles
+#   rank order    N unsigned 32-bit positions into studentList, best average first
+#   letter codes  N bytes indexing the letter table
+#   text          UTF-8 lines: the tab separated letter table, the grading scale, then 'sID<TAB>name' for every student
+MAGIC = b'GRADESN1'
+HEADER = struct.Struct('<8sQ5d')
+
+
+def _littleEndian(values):
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _readArray(fh, typecode, count):
+    # Reads count items straight into a new array, without an intermediate bytes object
+    values = array(typecode, [0]) * count
+    if fh.readinto(values) != len(values) * values.itemsize:
+        raise ValueError("Snapshot is truncated")
+    return _littleEndian(values)
+
+
+def saveSnapshot(gradeSystem, path):
+    """
+    Saves the students, their computed grades and the current weights of a grade system to a binary snapshot.
+
+    :param gradeSystem: The grade system to save.
+    :type gradeSystem: GradeSystem
+    :param path: The snapshot file to write.
+    :type path: str
+
+    Running Example:
+        saveSnapshot(grade_system, 'roster.snap')
+    """
+    gradeSystem.settle()
+    students = gradeSystem.studentList
+    letters = list(gradeSystem.gradeDistribution)
+    codes = {letter: i for i, letter in enumerate(letters)}
+    scores = array('d')
+    for student in students:
+        scores.extend(student.scores)
+    averages = array('d', [student.averageScore for student in students])
+    sequenceOf = gradeSystem.rankIndex.sequenceOf
+    order = array('I', [sequenceOf[student.sID] for student in gradeSystem.rankIndex])
+    assert order.itemsize == 4, "unsigned int must be 32 bits"
+    letterCodes = bytes([codes[student.letterGrade] for student in students])
+    with open(path, 'wb') as fh:
+        fh.write(HEADER.pack(MAGIC, len(students), *[float(weight) for weight in gradeSystem.weightList]))
+        _littleEndian(scores).tofile(fh)
+        _littleEndian(averages).tofile(fh)
+        _littleEndian(order).tofile(fh)
+        fh.write(letterCodes)
+        fh.write('\t'.join(letters).encode('utf-8') + b'\n')
+        fh.write(str(gradeSystem.gradingScale).encode('utf-8') + b'\n')
+        for start in range(0, len(students), 65536):
+            fh.write(''.join(f"{student.sID}\t{student.name}\n"
+                             for student in students[start:start + 65536]).encode('utf-8'))
+
+
+def loadSnapshot(path):
+    """
+    Creates a grade system from a binary snapshot written by saveSnapshot, without recalculating any grade.
+
+    :param path: The snapshot file to read.
+    :type path: str
+    :return: The restored grade system.
+    :rtype: GradeSystem
+
+    Running Example:
+        grade_system = loadSnapshot('roster.snap')
+    """
+    with open(path, 'rb', buffering=1 << 20) as fh:
+        header = fh.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path}' is not a grade system snapshot")
+        _, count, *weights = HEADER.unpack(header)
+        scores = _readArray(fh, 'd', count * 5)
+        averages = _readArray(fh, 'd', count)
+        order = _readArray(fh, 'I', count)
+        letterCodes = fh.read(count)
+        lines = fh.read().decode('utf-8').split('\n')
+    if len(letterCodes) < count or len(lines) < count + 2:
+        raise ValueError(f"'{path}' is truncated")
+    letters = lines[0].split('\t')
+
+    gradeSystem = GradeSystem(None, GradingScale.parse(lines[1]))
+    gradeSystem.weightList = weights
+    gradeSystem.gradeDistribution = dict.fromkeys(letters, 0)
+    fromValues = Student.fromValues
+    with pausedGarbageCollection():
+        students = [fromValues(*line.split('\t'), scores[i * 5:i * 5 + 5], averages[i], letters[letterCodes[i]])
+                    for i, line in enumerate(lines[2:count + 2])]
+        gradeSystem._appendStudents(students, order.tolist())
+    return gradeSystem
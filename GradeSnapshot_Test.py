@@ -0,0 +1,58 @@
+import pytest
+from GradeSystem import GradeSystem
+from GradeSnapshot import HEADER, saveSnapshot, loadSnapshot
+
+@pytest.fixture
+def grade_system():
+    return GradeSystem()
+
+def test_snapshot_round_trip(grade_system, tmp_path):
+    """
+    Test Function: saveSnapshot(gradeSystem, path), loadSnapshot(path)
+    Test Description:
+        -Step 1: Add a student, update a score, the weights and the grading scale of grade_system
+        -Step 2: Saving grade_system to a snapshot and loading it back
+            Expected result : students, scores, averages, letter grades, weights, scale, distribution and ranks all match
+    """
+    grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+    grade_system.updateScore("985002509 final 10")
+    grade_system.updateWeight("lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8")
+    grade_system.updateGradingScale("F 60 D 70 C 80 B 90 A")
+    snapshot = tmp_path / "roster.snap"
+    saveSnapshot(grade_system, str(snapshot))
+    restored = loadSnapshot(str(snapshot))
+
+    assert restored.weightList == grade_system.weightList
+    assert restored.gradingScale == grade_system.gradingScale
+    assert restored.gradeDistribution == grade_system.gradeDistribution
+    assert len(restored.studentList) == len(grade_system.studentList)
+    for original, student in zip(grade_system.studentList, restored.studentList):
+        assert (student.sID, student.name, student.scores, student.averageScore, student.letterGrade) == \
+               (original.sID, original.name, original.scores, original.averageScore, original.letterGrade)
+        assert restored.rankIndex.rank(student) == grade_system.rankIndex.rank(original)
+
+def test_snapshot_invalid(tmp_path):
+    """
+    Test Function: loadSnapshot(path)
+    Test Description:
+        -Step 1: Loading a file which is not a snapshot
+            Expected result : ValueError is raised
+        -Step 2: Saving an empty grade system and loading it back
+            Expected result : the restored grade system has no students
+        -Step 3: Loading a snapshot cut short inside its scores, its letter codes and its names
+            Expected result : ValueError is raised
+    """
+    not_snapshot = tmp_path / "input.txt"
+    not_snapshot.write_text("110006213 Bill 90 85 95 88 92\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        loadSnapshot(str(not_snapshot))
+    snapshot = tmp_path / "empty.snap"
+    saveSnapshot(GradeSystem(None), str(snapshot))
+    assert loadSnapshot(str(snapshot)).studentList == []
+    saveSnapshot(GradeSystem(), str(snapshot))
+    data = snapshot.read_bytes()
+    count = len(GradeSystem().studentList)
+    for size in (HEADER.size + 100, HEADER.size + count * 17 + count // 2, len(data) - 100):
+        snapshot.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            loadSnapshot(str(snapshot))
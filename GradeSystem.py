@@ -1,4 +1,66 @@
-import copy
+from array import array
+from collections import Counter
+import bisect
+import contextlib
+import cProfile
+import functools
+import gc
+import itertools
+import math
+from operator import attrgetter
+import os
+import pstats
+import sys
+import threading
+import time
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Lower bounds of the letter grades of the default grading scale, ascending, and the letter for each band (E is below 50).
+GRADE_CUTOFFS = [50, 60, 63, 67, 70, 73, 77, 80, 85, 90]
+GRADE_LETTERS = ['E', 'D', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+']
+# Position of each score in Student.scores
+SCORE_COLUMNS = {'lab1': 0, 'lab2': 1, 'lab3': 2, 'midterm': 3, 'final': 4}
+# Setting this environment variable to a non-empty value other than 0 instruments every new GradeSystem
+INSTRUMENT_VARIABLE = 'GRADESYSTEM_INSTRUMENT'
+# The roster file is read and parsed about this many bytes of lines at a time
+LOAD_CHUNK_BYTES = 1 << 20
+# The methods timed when a GradeSystem is instrumented, on the grade system, its rank index and its score matrix
+INSTRUMENTED_METHODS = ('load', 'addStudent', 'updateScore', 'updateScores', 'updateWeight', 'updateGradingScale',
+                        'simulateWeights', 'settle', 'recalculateDistribution', 'recalculateColumnar', '_recalculateStudents',
+                        'getScore', 'getLetterGrade', 'getAverage', 'getRank', 'getFilter', 'topK', 'percentile',
+                        'histogram')
+INSTRUMENTED_RANK_INDEX = ('rebuild', 'insert', 'update', 'rank')
+# The methods run under the read lock and under the write lock when a GradeSystem is thread-safe
+LOCKED_READS = ('getScore', 'getLetterGrade', 'getAverage', 'getRank', 'getGradeDistribution', 'getFilter', 'topK',
+                'percentile', 'histogram', 'showScore', 'showLetterGrade', 'showAverage', 'showRank',
+                'showGradeDistribution', 'showFilter', 'simulateWeights', 'checkDistribution', 'clone')
+LOCKED_WRITES = ('load', 'addStudent', 'updateScore', 'updateScores', 'updateWeight', 'updateGradingScale',
+                 'recalculateDistribution', 'recalculateColumnar', 'internStrings')
+INSTRUMENTED_SCORE_MATRIX = ('rebuild', 'append', 'update', 'averages')
+
+@contextlib.contextmanager
+def pausedGarbageCollection():
+    """
+    Pauses the cyclic garbage collector while many objects are created at once.
+
+    Students never form reference cycles, so collecting during a bulk load only rescans the roster
+    over and over.
+
+    Running Example:
+        with pausedGarbageCollection():
+            students = [Student(*row, weightList) for row in rows]
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
 class GradeSystem:
     """
     A class representing a grading system.
@@ -8,36 +70,213 @@ class GradeSystem:
 
     Attributes:
         studentList (list): A list of Student objects for students.
+        studentIndex (dict): A dictionary mapping each student id to its Student object.
+        rankIndex (RankIndex): The students kept sorted by average score, used for ranking and filtering.
+        scoreMatrix (ScoreMatrix): The scores of all students as an N x 5 array, or None when numpy is not installed.
         weightList (list): A list of weights for each grade.
         gradeDistribution (dict): A dictionary of distribution of letter grades of all the students.
+        gradingScale (GradingScale): The cut-offs used to convert average scores to letter grades.
+        loadStats (dict): Statistics of the last roster file loaded, or None.
+        journal (GradeJournal): The journal every successful change is recorded in, or None.
+        version (int): The roster version, increased by every change to the students or the weights.
+        queryCache (QueryCache): The results of rank and filter queries for the current version.
+        instrumentation (Instrumentation): The call counts and latencies of the main operations, or None.
+        lazy (bool): Whether a weight update only records the new weights, regrading the roster when needed.
+        stale (bool): Whether the averages, letter grades, distribution and rank index are out of date (lazy mode).
+        lazyGrades (dict): The average and letter grade computed on demand for each student queried while stale.
+        lock (ReadWriteLock): The lock held by queries and changes when the grade system is thread-safe, or None;
+                              hold it to read the attributes directly or to make several changes at once.
 
     """
-    def __init__(self):
+    def __init__(self, path='input.txt', gradingScale=None, instrument=None, lazy=False, threadSafe=False):
         """
         Initializes the GradeSystem object.
 
+        :param path: The roster file to load students from, or None to start with no students.
+        :type path: str
+        :param gradingScale: The grading scale of the course, the default scale (A+ from 90, E below 50) if None.
+        :type gradingScale: GradingScale
+        :param instrument: Whether to time the main operations; if None, whether the GRADESYSTEM_INSTRUMENT
+                           environment variable is set. Nothing is timed, at no cost, when disabled.
+        :type instrument: bool
+        :param lazy: Whether weight updates are applied lazily: the averages, letter grades, distribution and
+                     ranking are only recomputed when one of them is queried, so successive updates cost O(1).
+                     The get methods and settle() bring them up to date; attributes read directly may be stale.
+        :type lazy: bool
+        :param threadSafe: Whether the grade system is shared by threads: queries then run under the read lock,
+                           many at a time, and changes under the write lock, one at a time and with no query running.
+                           In lazy mode, the grades are brought up to date whenever the write lock is given back,
+                           also after a with lock.writing() block, so queries never see stale grades and weight
+                           updates are not O(1).
+        :type threadSafe: bool
+
         Running Example:
             grade_system = GradeSystem()
+            grade_system = GradeSystem('fall_roster.txt', GradingScale.parse('F 60 D 70 C 80 B 90 A'))
+            grade_system = GradeSystem(instrument=True)
+            grade_system = GradeSystem(lazy=True)
+            grade_system = GradeSystem(threadSafe=True)
         """
         self.studentList = []
+        self.studentIndex = {}
+        self.rankIndex = RankIndex()
+        self.scoreMatrix = ScoreMatrix() if np is not None else None
         self.weightList = [0.1,0.1,0.1,0.3,0.4]
-        self.gradeDistribution = {'A+': 0, 'A': 0, 'A-': 0, 'B+': 0, 'B': 0, 'B-': 0, 
-                                  'C+': 0, 'C': 0, 'C-': 0, 'D': 0, 'E': 0}
+        self.gradingScale = gradingScale if gradingScale is not None else DEFAULT_SCALE
+        self.gradeDistribution = self.gradingScale.emptyDistribution()
+        self.loadStats = None
+        self.journal = None
+        self.version = 0
+        self.queryCache = QueryCache()
+        self.lazy = lazy
+        self.stale = False
+        self.lazyGrades = {}
+        self.instrumentation = None
+        if instrument is None:
+            instrument = os.environ.get(INSTRUMENT_VARIABLE, '') not in ('', '0')
+        if instrument:
+            self.instrumentation = Instrumentation()
+            self.instrumentation.wrap(self, INSTRUMENTED_METHODS)
+            self.instrumentation.wrap(self.rankIndex, INSTRUMENTED_RANK_INDEX, 'RankIndex.')
+            if self.scoreMatrix is not None:
+                self.instrumentation.wrap(self.scoreMatrix, INSTRUMENTED_SCORE_MATRIX, 'ScoreMatrix.')
+        self.lock = None
+        if threadSafe:
+            self._makeThreadSafe()
+        if path is not None:
+            self.load(path)
+
+    def _makeThreadSafe(self):
+        # Replaces the queries and changes of this object with versions holding the lock, like Instrumentation.wrap
+        self.lock = lock = ReadWriteLock()
+
+        def reading(method):
+            @functools.wraps(method)
+            def locked(*args, **kwargs):
+                lock.acquireRead()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    lock.releaseRead()
+            return locked
+
+        def writing(method):
+            @functools.wraps(method)
+            def locked(*args, **kwargs):
+                lock.acquireWrite()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    lock.releaseWrite()
+            return locked
+
+        # Whoever took the write lock, a wrapped change or a with lock.writing() block, settles before the last
+        # release, so a reader never finds the roster stale
+        lock.beforeRelease = self.settle
+        for name in LOCKED_READS:
+            setattr(self, name, reading(getattr(self, name)))
+        for name in LOCKED_WRITES:
+            setattr(self, name, writing(getattr(self, name)))
+
+    def load(self, path):
+        """
+        Loads students from a roster file with one student per line (sID name lab1 lab2 lab3 mid final).
+
+        The file is read and parsed in blocks of lines with parseRoster. A malformed line is reported with its
+        line number and skipped, the rest of the file is still loaded.
+
+        :param path: The roster file to load.
+        :type path: str
+        :return: The load statistics, also kept in loadStats: rows loaded, errors as (line number, message)
+                 pairs, seconds taken and rows per second.
+        :rtype: dict
+
+        Running Example:
+            stats = grade_system.load('input.txt')
+        """
+        start = time.perf_counter()
+        rows = 0
+        errors = []
+        fromValues = Student.fromValues
         try:
             # Open file and read data
-            with open('input.txt', 'r', encoding='utf-8') as fh:
-                
-                for line in fh.readlines():
-                    tmp = line.split()
-                    assert len(tmp) == 7, "Invalid data format in input file"
-                    # Create a new Student object and append to studentList
-                    tmpStudent = Student(tmp[0], tmp[1], tmp[2], tmp[3], tmp[4], tmp[5], tmp[6], self.weightList)
-                    self.studentList.append(tmpStudent)
-                    self.gradeDistribution[tmpStudent.letterGrade] += 1
+            with open(path, 'r', encoding='utf-8') as fh, pausedGarbageCollection():
+                firstLine = 1
+                while True:
+                    lines = fh.readlines(LOAD_CHUNK_BYTES)
+                    if not lines:
+                        break
+                    parsed = parseRoster(lines, self.weightList, self.gradingScale, firstLine)
+                    firstLine += len(lines)
+                    scores, blockErrors = parsed['scores'], parsed['errors']
+                    # Create the new Student objects
+                    students = [fromValues(sID, name, scores[i:i + 5], average, letter)
+                                for sID, name, i, average, letter in zip(parsed['ids'], parsed['names'],
+                                                                         range(0, len(scores), 5),
+                                                                         parsed['averages'], parsed['letters'])]
+                    studentIndex = self.studentIndex
+                    distribution = parsed['distribution']
+                    loaded = len(studentIndex)
+                    if studentIndex.keys().isdisjoint(parsed['ids']):
+                        studentIndex.update(zip(parsed['ids'], students))
+                        if len(studentIndex) != loaded + len(students):
+                            # An ID repeats within the block: undo and add the students one at a time below
+                            for sID in parsed['ids']:
+                                studentIndex.pop(sID, None)
+                    if len(studentIndex) != loaded + len(students):
+                        # Keep only the first line of each ID not loaded yet
+                        kept = []
+                        for lineNumber, student in zip(parsed['lineNumbers'], students):
+                            if student.sID in studentIndex:
+                                blockErrors.append((lineNumber, "Student with ID '{}' already exists.".format(student.sID)))
+                                continue
+                            kept.append(student)
+                            studentIndex[student.sID] = student
+                        blockErrors.sort()
+                        students = kept
+                        distribution = Counter(map(attrgetter('letterGrade'), students))
+                    for lineNumber, message in blockErrors:
+                        print(f"Error occurred while reading line {lineNumber}:", message)
+                    errors.extend(blockErrors)
+                    self.studentList.extend(students)
+                    for letter, count in distribution.items():
+                        self.gradeDistribution[letter] += count
+                    rows += len(students)
         except FileNotFoundError:
-            print("Error: File 'studentList.txt' not found.")
+            print(f"Error: File '{path}' not found.")
         except Exception as e:
             print("Error occurred while reading file:", e)
+        with pausedGarbageCollection():
+            self.rankIndex.rebuild(self.studentList)
+            if self.scoreMatrix is not None:
+                self.scoreMatrix.rebuild(self.studentList)
+        self.version += 1
+        seconds = time.perf_counter() - start
+        self.loadStats = {'path': path, 'rows': rows, 'errors': errors, 'seconds': seconds,
+                          'rowsPerSecond': rows / seconds if seconds > 0 else 0.0}
+        return self.loadStats
+
+    def _appendStudents(self, students, order=None, distribution=None):
+        # Adds already graded students in bulk; order is their rank order as positions in the new studentList,
+        # distribution their letter grade counts, each computed here when not given
+        with pausedGarbageCollection():
+            newIndex = dict(zip(map(attrgetter('sID'), students), students))
+            if len(newIndex) != len(students) or not self.studentIndex.keys().isdisjoint(newIndex):
+                seen = set(self.studentIndex)
+                for student in students:
+                    if student.sID in seen:
+                        raise AssertionError("Student with ID '{}' already exists.".format(student.sID))
+                    seen.add(student.sID)
+            self.studentIndex.update(newIndex)
+            self.studentList.extend(students)
+            if distribution is None:
+                distribution = Counter(map(attrgetter('letterGrade'), students))
+            for letter, count in distribution.items():
+                self.gradeDistribution[letter] += count
+            self.rankIndex.rebuild(self.studentList, order)
+            if self.scoreMatrix is not None:
+                self.scoreMatrix.rebuild(self.studentList)
+        self.version += 1
 
     def recalculateDistribution(self):
         """
@@ -54,33 +293,84 @@ class GradeSystem:
         for student in self.studentList:
             self.gradeDistribution[student.letterGrade] += 1
 
+    def checkDistribution(self):
+        """
+        Checks that the incrementally maintained distribution matches a full recount of the letter grades.
+
+        :return: True if every count in gradeDistribution matches the recount.
+        :rtype: bool
+
+        Running Example:
+            assert grade_system.checkDistribution()
+        """
+        self.settle()
+        expected = dict.fromkeys(self.gradeDistribution, 0)
+        for student in self.studentList:
+            expected[student.letterGrade] += 1
+        return expected == self.gradeDistribution
+
+    def recalculateColumnar(self):
+        """
+        Recalculates every average score, letter grade, the grade distribution and the rank index
+        from the score matrix.
+
+        Running Example:
+            grade_system.recalculateColumnar()
+        """
+        averages = self.scoreMatrix.averages(self.weightList)
+        letters = self.gradingScale.letters
+        codes = self.gradingScale.codes(averages)
+        for student, average, code in zip(self.studentList, averages.tolist(), codes.tolist()):
+            student.averageScore = average
+            student.letterGrade = letters[code]
+        self._countCodes(codes)
+        self.rankIndex.rebuild(self.studentList, np.argsort(-averages, kind='stable').tolist())
+
+    def _countCodes(self, codes):
+        # Sets the distribution from an array of letter grade codes
+        counts = np.bincount(codes, minlength=len(self.gradingScale.letters)).tolist()
+        for letter in self.gradeDistribution:
+            self.gradeDistribution[letter] = 0
+        for code, letter in enumerate(self.gradingScale.letters):
+            self.gradeDistribution[letter] += counts[code]
+
     def addStudent(self, info):
         """
         Adding a new student to the list, as well as all his/her grades.
 
         :param info: A string containing information about the new student in the format (sID name lab1 lab2 lab3 mid final).
         :type info: str
+        :return: True if the student was added.
+        :rtype: bool
 
         Running Example:
             grade_system.addStudent('123 John 90 85 75 85 90')
         """
         try:
             newInfo = info.split()
-            for student in self.studentList:
-                if student.sID == newInfo[0]:
-                    raise AssertionError("Student with ID '{}' already exists.".format(student.sID))
+            if newInfo and newInfo[0] in self.studentIndex:
+                raise AssertionError("Student with ID '{}' already exists.".format(newInfo[0]))
             if len(newInfo) != 7:
                 raise ValueError("Invalid data format: Expected 7 elements")
 
             tmpStudent = Student(newInfo[0], newInfo[1], newInfo[2], newInfo[3], newInfo[4], newInfo[5], newInfo[6],
-                                     self.weightList)
+                                     self.weightList, self.gradingScale)
             self.studentList.append(tmpStudent)
+            self.studentIndex[tmpStudent.sID] = tmpStudent
+            self.rankIndex.insert(tmpStudent)
+            if self.scoreMatrix is not None:
+                self.scoreMatrix.append(tmpStudent)
             self.gradeDistribution[tmpStudent.letterGrade] += 1
+            self.version += 1
+            if self.journal is not None:
+                self.journal.append('add', info)
             print('Student added successfully.')
+            return True
         except ValueError as ve:
             print("Error adding student:", ve)
         except Exception as e:
             print("Error adding student:", e)
+        return False
 
 
     def updateScore(self, info):
@@ -89,71 +379,673 @@ class GradeSystem:
 
         :param info: A string containing the updated scores and the score names for a student in the format 'sID score_name new_score ...'.
         :type info: str
+        :return: True if the scores were updated.
+        :rtype: bool
 
         Running Example:
             grade_system.updateScore('123 lab1 88 lab3 89')
         """
         try:
             newInfo = info.split()
-            tmpStudentCopy = None
-            for student in self.studentList:
-                if student.sID == newInfo[0]:
-                    tmpStudentCopy = copy.deepcopy(student)
-                    break
-
-            for i, j in enumerate(newInfo[1::2], start=1):  # Increment by 2
-                if j == 'final':
-                    tmpStudentCopy.scores[4] = float(newInfo[i * 2])
-                elif j == 'midterm':
-                    tmpStudentCopy.scores[3] = float(newInfo[i * 2])
-                elif j == 'lab1' or j == 'lab2' or j == 'lab3':
-                    tmpStudentCopy.scores[int(j[-1]) - 1] = float(newInfo[i * 2])
-                else:
-                    raise AssertionError(f"Invalid score format: {j}")
-
-            for student in self.studentList:
-                if student.sID == tmpStudentCopy.sID:
-                    student.scores = tmpStudentCopy.scores
-                    student.recalculate(self.weightList)
-                    break
-            self.recalculateDistribution()
+            student = self.studentIndex.get(newInfo[0])
+            if student is None:
+                raise AssertionError(f"Student with ID {newInfo[0]} not found.")
+            # Every field is parsed and validated before the student is changed
+            changes = self._stageChanges(newInfo[1:], 'score')
+
+            oldAverage = student.averageScore
+            oldLetterGrade = student.letterGrade
+            scores = student._scores
+            for column, score in changes:
+                scores[column] = score
+            student.recalculate(self.weightList, self.gradingScale)
+            self.lazyGrades.pop(student.sID, None)
+            self.rankIndex.update(student, oldAverage)
+            if self.scoreMatrix is not None:
+                self.scoreMatrix.update(student)
+            self.gradeDistribution[oldLetterGrade] -= 1
+            self.gradeDistribution[student.letterGrade] += 1
+            self.version += 1
+            if self.journal is not None:
+                self.journal.append('score', info)
+            return True
         except Exception as e:
             print("Error updating score:", e)
+        return False
+
+    def updateScores(self, updates):
+        """
+        Updating the scores of many students at once, all or nothing.
+
+        Every line is validated before anything is changed; if any line is invalid, the errors are reported
+        with their line numbers and no score is updated. Several lines for the same student are applied in order.
+        Only the students touched are recalculated, and the distribution and rank index are updated once.
+
+        :param updates: An iterable of strings in the format 'sID score_name new_score ...',
+                        or the path of a file with one such update per line.
+        :type updates: iterable or str
+        :return: The number of students updated.
+        :rtype: int
+
+        Running Example:
+            grade_system.updateScores(['123 lab1 88 lab3 89', '124 final 70'])
+            grade_system.updateScores('final_exam.txt')
+        """
+        try:
+            if isinstance(updates, str):
+                with open(updates, 'r', encoding='utf-8') as fh:
+                    staged, errors, lines = self._stageScores(fh)
+            else:
+                staged, errors, lines = self._stageScores(updates)
+        except Exception as e:
+            print("Error updating scores:", e)
+            return 0
+        if errors:
+            for lineNumber, e in errors:
+                print(f"Error updating scores on line {lineNumber}:", e)
+            print("No scores were updated.")
+            return 0
+        if not staged:
+            # Nothing to update: the roster version stays and nothing is journaled
+            return 0
+
+        oldAverages = []
+        for student, tmpScores in staged.values():
+            oldAverages.append(student.averageScore)
+            self.gradeDistribution[student.letterGrade] -= 1
+            student.scores = tmpScores
+            student.recalculate(self.weightList, self.gradingScale)
+            self.lazyGrades.pop(student.sID, None)
+            self.gradeDistribution[student.letterGrade] += 1
+            if self.scoreMatrix is not None:
+                self.scoreMatrix.update(student)
+        if len(staged) > len(self.studentList) // 16:
+            self.rankIndex.rebuild(self.studentList)
+        else:
+            for (student, _), oldAverage in zip(staged.values(), oldAverages):
+                self.rankIndex.update(student, oldAverage)
+        self.version += 1
+        if self.journal is not None:
+            self.journal.append('scores', *lines)
+        return len(staged)
+
+    def _stageScores(self, lines):
+        # Collects the new scores of every student in lines without changing any student
+        staged = {}
+        errors = []
+        accepted = []
+        for lineNumber, info in enumerate(lines, start=1):
+            newInfo = info.split()
+            if not newInfo:
+                continue
+            accepted.append(info)
+            try:
+                student = self.studentIndex.get(newInfo[0])
+                if student is None:
+                    raise AssertionError(f"Student with ID {newInfo[0]} not found.")
+                changes = self._stageChanges(newInfo[1:], 'score')
+                tmpScores = staged[student.sID][1] if student.sID in staged else student.scores
+                for column, score in changes:
+                    tmpScores[column] = score
+                staged[student.sID] = (student, tmpScores)
+            except Exception as e:
+                errors.append((lineNumber, e))
+        return staged, errors, accepted
 
                     
     def updateWeight(self, info):
         """
         Updates the weights of lab assignments, midterm, and final exam.
 
+        In lazy mode only the weights are changed; the students are regraded when next queried.
+
         :param info: A string containing the new weights for lab assignments, midterm, and final exam in the format 'weight_name new_weight ...'.
         :type info: str
+        :return: True if the weights were updated.
+        :rtype: bool
 
         Running Example:
             grade_system.updateWeight('lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.3 final 0.4')
         """
         try:
-            newInfo = info.split()
-            tmpWeightList = copy.deepcopy(self.weightList)
-            for i, j in enumerate(newInfo[::2], start=0):  # Increment by 2
-                assert float(newInfo[i*2+1]), f"Invalid weight format: {newInfo[i*2+1]}"
-                if j == 'final':
-                    tmpWeightList[4] = float(newInfo[i * 2 + 1])
-                elif j == 'midterm':
-                    tmpWeightList[3] = float(newInfo[i * 2 + 1])
-                elif j == 'lab1' or j == 'lab2' or j == 'lab3':
-                    tmpWeightList[int(j[-1]) - 1] = float(newInfo[i * 2 + 1])
-                else:
-                    raise AssertionError(f"Invalid weight format: {j}")
-            if sum(tmpWeightList)>1.0:
-                raise AssertionError(f"Invalid weight sum: {sum(tmpWeightList):.2f}")
-            else:
-                self.weightList = tmpWeightList
-            for student in self.studentList:
-                student.recalculate(self.weightList)
-            self.recalculateDistribution()
+            self._applyWeights(self._stageWeights(info))
+            if self.journal is not None:
+                self.journal.append('weight', info)
+            return True
         except Exception as e:
             print("Error updating weight:", e)
-        
+        return False
+
+    @staticmethod
+    def _stageChanges(fields, kind):
+        # Parses 'name value ...' fields into (column, value) pairs, raising on the first invalid one
+        if len(fields) % 2:
+            raise ValueError(f"Missing {kind} for {fields[-1]}")
+        changes = []
+        for name, value in zip(fields[0::2], fields[1::2]):
+            if name not in SCORE_COLUMNS:
+                raise AssertionError(f"Invalid {kind} format: {name}")
+            value = float(value)
+            if not math.isfinite(value):
+                raise ValueError(f"Invalid {kind}: {value}")
+            changes.append((SCORE_COLUMNS[name], value))
+        return changes
+
+    def _stageWeights(self, info):
+        # Returns the weight list updated by info, raising if info is invalid; self.weightList is unchanged
+        tmpWeightList = list(self.weightList)
+        for column, weight in self._stageChanges(info.split(), 'weight'):
+            tmpWeightList[column] = self._checkWeight(weight)
+        if sum(tmpWeightList)>1.0:
+            raise AssertionError(f"Invalid weight sum: {sum(tmpWeightList):.2f}")
+        return tmpWeightList
+
+    @staticmethod
+    def _checkWeight(weight):
+        # A zero weight has always been rejected by updateWeight; a nan or infinite one would grade nobody
+        if not weight or not math.isfinite(weight):
+            raise AssertionError(f"Invalid weight format: {weight:g}")
+        return weight
+
+    def _applyWeights(self, weightList):
+        # Switches to already validated weights and regrades every student, now or in lazy mode when needed
+        self.weightList = weightList
+        if self.lazy:
+            self.stale = True
+            self.lazyGrades = {}
+        else:
+            self._regrade()
+        self.version += 1
+
+    def _regrade(self):
+        # Recalculates every average and letter grade, the distribution and the rank index
+        if self.scoreMatrix is not None:
+            self.recalculateColumnar()
+        else:
+            self._recalculateStudents()
+            self.recalculateDistribution()
+            self.rankIndex.rebuild(self.studentList)
+
+    def settle(self):
+        """
+        Brings the averages, letter grades, distribution and rank index up to date after lazy weight updates.
+
+        Does nothing when they are already up to date.
+
+        Running Example:
+            grade_system.settle()
+        """
+        if self.stale:
+            self._regrade()
+            self.stale = False
+            self.lazyGrades = {}
+
+    def _grade(self, student):
+        # The average and letter grade of a student under the current weights, computed on demand while stale
+        if not self.stale:
+            return student.averageScore, student.letterGrade
+        grade = self.lazyGrades.get(student.sID)
+        if grade is None:
+            average = student.average(self.weightList)
+            grade = self.lazyGrades[student.sID] = (average, self.gradingScale.letter(average))
+        return grade
+
+    def _recalculateStudents(self):
+        # Recalculates the average score and letter grade of every student, one at a time
+        for student in self.studentList:
+            student.recalculate(self.weightList, self.gradingScale)
+
+    def updateGradingScale(self, scale):
+        """
+        Switches to another grading scale and regrades the letter grade of every student.
+
+        :param scale: The new scale, either a GradingScale or a string in the format 'letter cutoff letter ... letter [maximum]'.
+        :type scale: GradingScale or str
+        :return: True if the scale was updated.
+        :rtype: bool
+
+        Running Example:
+            grade_system.updateGradingScale('F 60 D 70 C 80 B 90 A')
+        """
+        try:
+            gradingScale = GradingScale.parse(scale) if isinstance(scale, str) else scale
+            self.settle()
+            self.gradingScale = gradingScale
+            self.gradeDistribution = gradingScale.emptyDistribution()
+            if self.scoreMatrix is not None and self.studentList:
+                averages = np.fromiter(map(attrgetter('averageScore'), self.studentList), dtype=float,
+                                       count=len(self.studentList))
+                codes = gradingScale.codes(averages)
+                letters = gradingScale.letters
+                for student, code in zip(self.studentList, codes.tolist()):
+                    student.letterGrade = letters[code]
+                self._countCodes(codes)
+            else:
+                letter = gradingScale.letter
+                for student in self.studentList:
+                    student.letterGrade = letter(student.averageScore)
+                self.recalculateDistribution()
+            self.version += 1
+            if self.journal is not None:
+                self.journal.append('scale', str(gradingScale))
+            return True
+        except Exception as e:
+            print("Error updating grading scale:", e)
+        return False
+
+    def clone(self):
+        """
+        Creates an independent copy of the grade system, without its journal.
+
+        :return: The copy.
+        :rtype: GradeSystem
+
+        Running Example:
+            trial = grade_system.clone()
+        """
+        self.settle()
+        other = GradeSystem(None, lazy=self.lazy, threadSafe=self.lock is not None)
+        other.weightList = list(self.weightList)
+        other.gradingScale = self.gradingScale
+        other.gradeDistribution = dict.fromkeys(self.gradeDistribution, 0)
+        fromValues = Student.fromValues
+        with pausedGarbageCollection():
+            students = [fromValues(student.sID, student.name, student._scores[:], student.averageScore,
+                                   student.letterGrade) for student in self.studentList]
+            sequenceOf = self.rankIndex.sequenceOf
+            other._appendStudents(students, [sequenceOf[student.sID] for student in self.rankIndex])
+        return other
+
+    def simulateWeights(self, candidates, sIDs=()):
+        """
+        Evaluates candidate weights without changing the roster, so many trials can be compared before updateWeight.
+
+        All the candidates are graded together: with numpy, the scores are multiplied by a block of candidate
+        weights at once, summing the weighted columns in the same order as Student.average, so every average
+        is exactly what updateWeight would give.
+
+        :param candidates: The candidate weights, each either a string in the updateWeight format
+                           'weight_name new_weight ...' (changing the current weights) or a list of five weights.
+        :type candidates: list
+        :param sIDs: The IDs of the students whose rank changes are wanted.
+        :type sIDs: list
+        :return: For each candidate, its weights, the letter grade distribution and the rank change of each
+                 requested student (positive when the student moves up); an empty list if any input is invalid.
+        :rtype: list
+
+        Running Example:
+            trials = grade_system.simulateWeights(['lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2',
+                                                   [0.05, 0.05, 0.1, 0.3, 0.5]], ['123'])
+        """
+        self.settle()
+        try:
+            weightLists = [self._stageWeights(candidate) if isinstance(candidate, str)
+                           else self._checkWeights(candidate) for candidate in candidates]
+            rows = []
+            for sID in sIDs:
+                if sID not in self.rankIndex.sequenceOf:
+                    raise AssertionError(f"Student with ID {sID} not found.")
+                rows.append(self.rankIndex.sequenceOf[sID])
+        except Exception as e:
+            print("Error simulating weights:", e)
+            return []
+        if self.scoreMatrix is not None:
+            outcomes = self._simulateColumnar(weightLists, rows)
+        else:
+            outcomes = self._simulateLoop(weightLists, rows)
+        currentRanks = [self.getRank(sID) for sID in sIDs]
+        results = []
+        for weightList, (counts, ranks) in zip(weightLists, outcomes):
+            distribution = self.gradingScale.emptyDistribution()
+            for code, letter in enumerate(self.gradingScale.letters):
+                distribution[letter] += counts[code]
+            results.append({'weights': weightList, 'distribution': distribution,
+                            'rankChanges': {sID: current - rank for sID, current, rank in zip(sIDs, currentRanks, ranks)}})
+        return results
+
+    def _checkWeights(self, weights):
+        # Validates a complete list of candidate weights, each like the weights given to updateWeight
+        weightList = [self._checkWeight(float(weight)) for weight in weights]
+        if len(weightList) != 5:
+            raise AssertionError(f"Expected 5 weights, got {len(weightList)}")
+        if sum(weightList) > 1.0:
+            raise AssertionError(f"Invalid weight sum: {sum(weightList):.2f}")
+        return weightList
+
+    def _simulateColumnar(self, weightLists, rows, blockSize=1 << 22):
+        # Yields the letter grade counts and the ranks of the given rows for each weight list,
+        # grading as many candidates at a time as fit in a block of about blockSize averages
+        scores = self.scoreMatrix.scores[:self.scoreMatrix.size]
+        size = len(scores)
+        step = max(1, blockSize // max(size, 1))
+        rows = np.asarray(rows, dtype=np.intp)
+        for first in range(0, len(weightLists), step):
+            weights = np.asarray(weightLists[first:first + step], dtype=float)
+            totals = scores[:, :1] * weights[:, 0]
+            for column in range(1, 5):
+                totals += scores[:, column:column + 1] * weights[:, column]
+            codes = self.gradingScale.codes(totals)
+            letterCount = len(self.gradingScale.letters)
+            offsets = np.arange(len(weights)) * letterCount
+            counts = np.bincount((codes + offsets).ravel(), minlength=len(weights) * letterCount)
+            counts = counts.reshape(len(weights), letterCount).tolist()
+            for c in range(len(weights)):
+                if not len(rows):
+                    yield counts[c], []
+                    continue
+                averages = totals[:, c]
+                ordered = np.sort(averages)
+                selected = averages[rows]
+                right = np.searchsorted(ordered, selected, side='right')
+                ranks = (size - right + 1).tolist()
+                tied = np.flatnonzero(right - np.searchsorted(ordered, selected, side='left') > 1)
+                if len(tied):
+                    # Students with the same average rank in the order they were added: count the earlier rows
+                    # holding each tied average, with the rows sorted by (average, row)
+                    tiedRows = np.flatnonzero(np.isin(averages, selected[tied]))
+                    tiedRows = tiedRows[np.argsort(averages[tiedRows], kind='stable')]
+                    tiedAverages = averages[tiedRows]
+                    for i in tied.tolist():
+                        low = np.searchsorted(tiedAverages, selected[i], side='left')
+                        high = np.searchsorted(tiedAverages, selected[i], side='right')
+                        ranks[i] += int(np.searchsorted(tiedRows[low:high], rows[i]))
+                yield counts[c], ranks
+
+    def _simulateLoop(self, weightLists, rows):
+        # Yields the letter grade counts and the ranks of the given rows for each weight list, one student at a time
+        scoreLists = [student._scores for student in self.studentList]
+        size = len(scoreLists)
+        for weightList in weightLists:
+            w0, w1, w2, w3, w4 = weightList
+            # Added left to right like Student.average; sum() may round differently
+            averages = [scores[0] * w0 + scores[1] * w1 + scores[2] * w2 + scores[3] * w3 + scores[4] * w4
+                        for scores in scoreLists]
+            code = self.gradingScale.code
+            counts = [0] * len(self.gradingScale.letters)
+            for average in averages:
+                counts[code(average)] += 1
+            ordered = sorted(averages) if rows else []
+            ranks = []
+            for row in rows:
+                average = averages[row]
+                rank = size - bisect.bisect_right(ordered, average) + 1
+                if bisect.bisect_right(ordered, average) - bisect.bisect_left(ordered, average) > 1:
+                    rank += averages[:row].count(average)
+                ranks.append(rank)
+            yield counts, ranks
+
+    def internStrings(self, intern):
+        """
+        Replaces the ID and name of every student with the copy returned by intern, so that rosters sharing
+        students can share these strings.
+
+        :param intern: A function returning the shared copy of a string.
+        :type intern: callable
+
+        Running Example:
+            grade_system.internStrings(sys.intern)
+        """
+        self.settle()
+        for student in self.studentList:
+            student.sID = intern(student.sID)
+            student.name = intern(student.name)
+        # The dictionaries keyed by student ID are rebuilt so they hold the shared IDs too
+        self.studentIndex = {student.sID: student for student in self.studentList}
+        sequenceOf = self.rankIndex.sequenceOf
+        self.rankIndex.sequenceOf = {student.sID: sequenceOf[student.sID] for student in self.studentList}
+        if self.scoreMatrix is not None:
+            rows = self.scoreMatrix.rows
+            self.scoreMatrix.rows = {student.sID: rows[student.sID] for student in self.studentList}
+
+    def getScore(self, sID):
+        """
+        Gets the scores of a student, using his/her student id.
+
+        :param sID: The ID of the student.
+        :type sID: str
+        :return: The scores (lab1, lab2, lab3, midterm, final), or None if the student is not found.
+        :rtype: list
+
+        Running Example:
+            scores = grade_system.getScore('123')
+        """
+        student = self.studentIndex.get(sID)
+        return student.scores if student is not None else None
+
+    def getLetterGrade(self, sID):
+        """
+        Gets the letter grade of a student by his/her student id.
+
+        :param sID: The ID of the student.
+        :type sID: str
+        :return: The letter grade, or None if the student is not found.
+        :rtype: str
+
+        Running Example:
+            letter_grade = grade_system.getLetterGrade('123')
+        """
+        student = self.studentIndex.get(sID)
+        return self._grade(student)[1] if student is not None else None
+
+    def getAverage(self, sID):
+        """
+        Gets the average score of a student by his/her student id.
+
+        :param sID: The ID of the student.
+        :type sID: str
+        :return: The average score, or None if the student is not found.
+        :rtype: float
+
+        Running Example:
+            average_score = grade_system.getAverage('123')
+        """
+        student = self.studentIndex.get(sID)
+        return self._grade(student)[0] if student is not None else None
+
+    def getRank(self, sID):
+        """
+        Gets the rank of a student identified by his/her student id.
+
+        :param sID: The ID of the student.
+        :type sID: str
+        :return: The rank, starting from 1 for the highest average score, or None if the student is not found.
+        :rtype: int
+
+        Running Example:
+            rank = grade_system.getRank('123')
+        """
+        student = self.studentIndex.get(sID)
+        if student is None:
+            return None
+        self.settle()
+        return self.queryCache.get(self.version, ('rank', sID), lambda: self.rankIndex.rank(student))
+
+    def getGradeDistribution(self):
+        """
+        Gets the distribution of letter grades from all students.
+
+        :return: A copy of the number of students with each letter grade.
+        :rtype: dict
+
+        Running Example:
+            distribution = grade_system.getGradeDistribution()
+        """
+        self.settle()
+        return dict(self.gradeDistribution)
+
+    def getFilter(self, Thres):
+        """
+        Iterates over all the students which the score is above the threshold, best first, with their rank.
+
+        :param Thres: The threshold score.
+        :type Thres: float
+        :return: An iterator of (rank, Student) pairs.
+        :rtype: iterator
+
+        Running Example:
+            for rank, student in grade_system.getFilter(85):
+                print(rank, student.name)
+        """
+        self.settle()
+        students = self.queryCache.get(self.version, ('filter', float(Thres)),
+                                       lambda: tuple(self.rankIndex.above(Thres)))
+        return enumerate(students, start=1)
+
+    def topK(self, k):
+        """
+        Gets the k students with the highest average scores, best first.
+
+        Students with the same average keep the order of their ranks, so the result is the first k rows of showFilter(0)
+        for a roster where everyone is above 0.
+
+        :param k: The number of students wanted.
+        :type k: int
+        :return: The students, at most k of them.
+        :rtype: list
+
+        Running Example:
+            best = grade_system.topK(50)
+        """
+        self.settle()
+        # The cached tuple is shared by every caller, so each gets its own list
+        return list(self.queryCache.get(self.version, ('top', k),
+                                        lambda: tuple(itertools.islice(self.rankIndex, max(k, 0)))))
+
+    def percentile(self, p):
+        """
+        Gets the p-th percentile of the average scores, interpolating linearly between the two nearest students.
+
+        :param p: The percentile, between 0 and 100; 50 gives the median.
+        :type p: float
+        :return: The percentile, or None if there are no students.
+        :rtype: float
+
+        Running Example:
+            median = grade_system.percentile(50)
+        """
+        if not 0 <= p <= 100:
+            raise ValueError(f"Percentile must be between 0 and 100: {p}")
+        self.settle()
+        count = len(self.rankIndex)
+        if count == 0:
+            return None
+        # The rank index is best first, so the ascending position i is the rank position count - 1 - i
+        position = (count - 1) * p / 100
+        below = int(position)
+        low = self.rankIndex.at(count - 1 - below).averageScore
+        if position == below:
+            return low
+        high = self.rankIndex.at(count - 2 - below).averageScore
+        return low + (high - low) * (position - below)
+
+    def histogram(self, bins=10, scoreRange=None):
+        """
+        Counts the average scores falling in each bin, like numpy.histogram.
+
+        Every bin includes its lower edge and excludes its upper edge, except the last one which includes both.
+        Averages outside the edges are not counted.
+
+        :param bins: The number of bins of equal width, or the ascending edges of the bins.
+        :type bins: int or list
+        :param scoreRange: The lowest and highest edges when bins is a number, the lowest and highest average by default.
+        :type scoreRange: tuple
+        :return: The count in each bin and the bin edges.
+        :rtype: tuple
+
+        Running Example:
+            counts, edges = grade_system.histogram(10, (0, 100))
+        """
+        self.settle()
+        if isinstance(bins, int):
+            if bins < 1:
+                raise ValueError(f"Number of bins must be positive: {bins}")
+            if scoreRange is not None:
+                low, high = scoreRange
+            elif len(self.rankIndex):
+                low, high = self.rankIndex.at(len(self.rankIndex) - 1).averageScore, self.rankIndex.at(0).averageScore
+            else:
+                low, high = 0.0, 1.0
+            if low > high:
+                raise ValueError(f"Invalid range: {scoreRange}")
+            if low == high:
+                low, high = low - 0.5, high + 0.5
+            edges = [low + (high - low) * i / bins for i in range(bins)] + [high]
+        else:
+            edges = [float(edge) for edge in bins]
+            if len(edges) < 2 or any(a > b for a, b in zip(edges, edges[1:])):
+                raise ValueError("Bin edges must increase monotonically")
+        counts, edges = self.queryCache.get(self.version, ('histogram', tuple(edges)),
+                                            lambda: (tuple(self._countBins(edges)), tuple(edges)))
+        return list(counts), list(edges)
+
+    def _countBins(self, edges):
+        counts = [0] * (len(edges) - 1)
+        low, high, last = edges[0], edges[-1], len(counts) - 1
+        bisectRight = bisect.bisect_right
+        for student in self.studentList:
+            average = student.averageScore
+            if low <= average <= high:
+                counts[min(bisectRight(edges, average) - 1, last)] += 1
+        return counts
+
+    def stats(self):
+        """
+        Gets the call count, total and longest latency of every instrumented operation called so far.
+
+        :return: A dictionary mapping each operation to its 'calls', 'totalNs', 'maxNs' and 'meanNs',
+                 empty when the grade system is not instrumented.
+        :rtype: dict
+
+        Running Example:
+            grade_system = GradeSystem(instrument=True)
+            grade_system.updateWeight('lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2')
+            print(grade_system.stats()['updateWeight']['totalNs'])
+        """
+        return self.instrumentation.stats() if self.instrumentation is not None else {}
+
+    def showStats(self):
+        """
+        Shows the latencies of the instrumented operations, the slowest in total first.
+
+        Running Example:
+            grade_system.showStats()
+        """
+        stats = sorted(self.stats().items(), key=lambda item: -item[1]['totalNs'])
+        writeLines([f"{'operation':<24}{'calls':>10}{'total ms':>12}{'mean us':>12}{'max us':>12}"] +
+                   [f"{name:<24}{record['calls']:>10}{record['totalNs'] / 1e6:>12.3f}"
+                    f"{record['meanNs'] / 1e3:>12.3f}{record['maxNs'] / 1e3:>12.3f}" for name, record in stats])
+
+    def profile(self, operation, *args, limit=20):
+        """
+        Runs one operation under cProfile and shows its most expensive functions.
+
+        :param operation: The name of the GradeSystem method to run.
+        :type operation: str
+        :param args: The arguments of the method.
+        :param limit: The number of functions shown.
+        :type limit: int
+        :return: The result of the operation.
+
+        Running Example:
+            grade_system.profile('updateWeight', 'lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2')
+        """
+        profiler = cProfile.Profile()
+        result = profiler.runcall(getattr(self, operation), *args)
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(limit)
+        return result
+
+    def cacheStats(self):
+        """
+        Gets the hit and miss counters of the query cache, for monitoring.
+
+        :return: The number of hits, misses and cached results, and the roster version they belong to.
+        :rtype: dict
+
+        Running Example:
+            stats = grade_system.cacheStats()
+        """
+        return self.queryCache.stats()
+
     def showScore(self, sID):
         """
         Shows the score of a student, using his/her student id.
@@ -164,16 +1056,12 @@ class GradeSystem:
         Running Example:
             grade_system.showScore('123')
         """
-        found = False
-        for student in self.studentList:
-            if student.sID == sID:
-                print("\nLab Scores:", student.scores[:3])
-                print("Midterm Score:", student.scores[3])
-                print("Final Score:", student.scores[4],'\n')
-                found = True
-                break
-        
-        if not found:
+        scores = self.getScore(sID)
+        if scores is not None:
+            print("\nLab Scores:", scores[:3])
+            print("Midterm Score:", scores[3])
+            print("Final Score:", scores[4],'\n')
+        else:
             print(f"Student with ID {sID} not found.")
             
     def showLetterGrade(self, sID):
@@ -186,13 +1074,10 @@ class GradeSystem:
         Running Example:
             grade_system.showLetterGrade('123')
         """
-        found = False
-        for student in self.studentList:
-            if student.sID == sID:
-                print("\nLetter Grade:", student.letterGrade,'\n')
-                found = True
-                break
-        if not found:
+        letterGrade = self.getLetterGrade(sID)
+        if letterGrade is not None:
+            print("\nLetter Grade:", letterGrade,'\n')
+        else:
             print(f"Student with ID {sID} not found.")
             
     def showAverage(self, sID):
@@ -205,13 +1090,10 @@ class GradeSystem:
         Running Example:
             grade_system.showAverage('123')
         """
-        found = False
-        for student in self.studentList:
-            if student.sID == sID:
-                print("\nAverage Score: {:.2f}\n".format(student.averageScore))
-                found = True
-                break
-        if not found:
+        averageScore = self.getAverage(sID)
+        if averageScore is not None:
+            print("\nAverage Score: {:.2f}\n".format(averageScore))
+        else:
             print(f"Student with ID {sID} not found.")
     
     def showRank(self, sID):
@@ -224,13 +1106,9 @@ class GradeSystem:
         Running Example:
             grade_system.showRank('123')
         """
-        # Sort studentList based on average score in descending order
-        sorted_students = sorted(self.studentList, key=lambda x: x.averageScore, reverse=True)
-        # Find the position of the student with the given ID in the sorted list
-        for i, student in enumerate(sorted_students, start=1):
-            if student.sID == sID:
-                print(f"\nRanking: {i}\n")
-                break
+        rank = self.getRank(sID)
+        if rank is not None:
+            print(f"\nRanking: {rank}\n")
         else:
             print(f"Student with ID {sID} not found.")
     
@@ -241,9 +1119,8 @@ class GradeSystem:
         Running Example:
             grade_system.showGradeDistribution()
         """
-        print("Grade Distribution:")
-        for grade, count in self.gradeDistribution.items():
-            print(f"{grade}: {count}")
+        writeLines(["Grade Distribution:"] +
+                   [f"{grade}: {count}" for grade, count in self.getGradeDistribution().items()])
 
     def showFilter(self, Thres):
         """
@@ -255,20 +1132,780 @@ class GradeSystem:
         Running Example:
             grade_system.showFilter(85)
         """
-        sorted_students = sorted(self.studentList, key=lambda x: x.averageScore, reverse=True)
         print('\n')
-        for i, student in enumerate(sorted_students, start=1):
-            if student.averageScore > Thres:
-                print(f"{i} {student.name} {student.sID} {student.letterGrade} {student.averageScore:.2f}")
+        writeLines(f"{i} {student.name} {student.sID} {student.letterGrade} {student.averageScore:.2f}"
+                   for i, student in self.getFilter(Thres))
+
+def writeLines(lines, blockSize=8192):
+    """
+    Writes lines to the standard output in blocks, one write per block instead of one print per line.
+
+    :param lines: The lines to write, without line endings.
+    :type lines: iterable
+    :param blockSize: The number of lines written at once.
+    :type blockSize: int
+
+    Running Example:
+        writeLines(['A+: 27', 'A: 33'])
+    """
+    out = sys.stdout
+    block = []
+    for line in lines:
+        block.append(line)
+        if len(block) >= blockSize:
+            out.write('\n'.join(block) + '\n')
+            block = []
+    if block:
+        out.write('\n'.join(block) + '\n')
+
+class ScoreMatrix:
+    """
+    A class storing the scores of all students column-wise in a numpy array.
+
+    Row i holds the five scores (lab1, lab2, lab3, midterm, final) of the i-th student added, so a weight
+    change can be applied to the whole roster with a handful of array operations.
+
+    Attributes:
+        scores (numpy.ndarray): The N x 5 score array; only the first size rows are in use.
+        size (int): The number of students stored.
+        rows (dict): A dictionary mapping each student id to its row.
+
+    """
+    def __init__(self, capacity=1024):
+        """
+        Initializes an empty ScoreMatrix object.
+
+        :param capacity: The number of rows allocated up front.
+        :type capacity: int
+
+        Running Example:
+            score_matrix = ScoreMatrix()
+        """
+        self.scores = np.empty((capacity, 5))
+        self.size = 0
+        self.rows = {}
+
+    def rebuild(self, studentList):
+        """
+        Rebuilds the matrix from a list of students.
+
+        :param studentList: The students, in the order they were added.
+        :type studentList: list
+
+        Running Example:
+            score_matrix.rebuild(grade_system.studentList)
+        """
+        self.scores = np.array([student.scores for student in studentList], dtype=float).reshape(-1, 5)
+        self.size = len(studentList)
+        self.rows = {student.sID: i for i, student in enumerate(studentList)}
+
+    def append(self, student):
+        """
+        Appends the scores of a newly added student, growing the array geometrically when it is full.
+
+        :param student: The student to append.
+        :type student: Student
+
+        Running Example:
+            score_matrix.append(student)
+        """
+        if self.size == len(self.scores):
+            grown = np.empty((max(2 * self.size, 1024), 5))
+            grown[:self.size] = self.scores[:self.size]
+            self.scores = grown
+        self.scores[self.size] = student.scores
+        self.rows[student.sID] = self.size
+        self.size += 1
+
+    def update(self, student):
+        """
+        Copies the current scores of a student into his/her row.
+
+        :param student: The student whose scores changed.
+        :type student: Student
+
+        Running Example:
+            score_matrix.update(student)
+        """
+        self.scores[self.rows[student.sID]] = student.scores
+
+    def averages(self, weightList):
+        """
+        Calculates the weighted average score of every student.
+
+        The weighted columns are accumulated left to right, the same order Student.average sums in,
+        so the results are identical to the per-student calculation.
+
+        :param weightList: A list of weights for lab assignments, midterm, and final exam.
+        :type weightList: list
+        :return: The average score of each student, in row order.
+        :rtype: numpy.ndarray
+
+        Running Example:
+            averages = score_matrix.averages([0.1, 0.1, 0.1, 0.3, 0.4])
+        """
+        scores = self.scores[:self.size]
+        total = scores[:, 0] * float(weightList[0])
+        for column in range(1, 5):
+            total += scores[:, column] * float(weightList[column])
+        return total
+
+class RankIndex:
+    """
+    A class keeping students sorted by average score.
+
+    Students are ordered by descending average score; students with the same average keep
+    the order in which they were added, matching a stable sort of the student list.
+    The sorted keys are split into buckets of bounded size so an insertion only shifts one bucket,
+    and a Fenwick tree over the bucket sizes turns a position inside a bucket into a rank.
+
+    Attributes:
+        keys (list): The buckets of sorted (-averageScore, sequence) keys of the indexed students.
+        students (list): The buckets of Student objects, in the same order as keys.
+        maxes (list): The largest key of each bucket.
+        sequenceOf (dict): A dictionary mapping each student id to the order in which he/she was added.
+
+    """
+    bucketSize = 1000
+
+    def __init__(self):
+        """
+        Initializes an empty RankIndex object.
+
+        Running Example:
+            rank_index = RankIndex()
+        """
+        self.keys = []
+        self.students = []
+        self.maxes = []
+        self.sequenceOf = {}
+        self.tree = [0]
+
+    def __len__(self):
+        return len(self.sequenceOf)
+
+    def __iter__(self):
+        for bucket in self.students:
+            yield from bucket
+
+    def rebuild(self, studentList, order=None):
+        """
+        Rebuilds the whole index from a list of students in one sort.
+
+        :param studentList: The students to index, in the order they were added.
+        :type studentList: list
+        :param order: The positions in studentList sorted by rank, if already known.
+        :type order: list
+
+        Running Example:
+            rank_index.rebuild(grade_system.studentList)
+        """
+        negatives = [-student.averageScore for student in studentList]
+        if order is None:
+            # A stable sort on the average alone keeps students with equal averages in insertion order
+            order = sorted(range(len(studentList)), key=negatives.__getitem__)
+        keys = list(zip(map(negatives.__getitem__, order), order))
+        students = list(map(studentList.__getitem__, order))
+        size = self.bucketSize
+        self.keys = [keys[i:i + size] for i in range(0, len(keys), size)]
+        self.students = [students[i:i + size] for i in range(0, len(students), size)]
+        self.maxes = [bucket[-1] for bucket in self.keys]
+        if len(self.sequenceOf) != len(studentList):
+            self.sequenceOf = dict(zip(map(attrgetter('sID'), studentList), range(len(studentList))))
+        self._buildTree()
+
+    def insert(self, student):
+        """
+        Inserts a newly added student into the index.
+
+        :param student: The student to insert.
+        :type student: Student
+
+        Running Example:
+            rank_index.insert(student)
+        """
+        sequence = len(self.sequenceOf)
+        self.sequenceOf[student.sID] = sequence
+        self._place((-student.averageScore, sequence), student)
+
+    def update(self, student, oldAverage):
+        """
+        Moves a student whose average score changed to his/her new position.
+
+        :param student: The student to move.
+        :type student: Student
+        :param oldAverage: The average score the student was indexed with.
+        :type oldAverage: float
+
+        Running Example:
+            rank_index.update(student, 95.1)
+        """
+        sequence = self.sequenceOf[student.sID]
+        b, position = self._locate((-oldAverage, sequence))
+        if position == len(self.students[b]) or self.students[b][position] is not student:
+            raise LookupError(f"Student with ID {student.sID} is not indexed with average score {oldAverage}")
+        del self.keys[b][position]
+        del self.students[b][position]
+        if self.keys[b]:
+            self.maxes[b] = self.keys[b][-1]
+            self._addTree(b, -1)
+        else:
+            del self.keys[b], self.students[b], self.maxes[b]
+            self._buildTree()
+        self._place((-student.averageScore, sequence), student)
+
+    def _locate(self, key):
+        b = bisect.bisect_left(self.maxes, key)
+        if b == len(self.maxes):
+            b -= 1
+        return b, bisect.bisect_left(self.keys[b], key)
+
+    def _place(self, key, student):
+        if not self.keys:
+            self.keys.append([key])
+            self.students.append([student])
+            self.maxes.append(key)
+            self._buildTree()
+            return
+        b, position = self._locate(key)
+        keys, students = self.keys[b], self.students[b]
+        keys.insert(position, key)
+        students.insert(position, student)
+        self.maxes[b] = keys[-1]
+        if len(keys) > 2 * self.bucketSize:
+            # Split the full bucket in two halves
+            self.keys[b:b + 1] = [keys[:self.bucketSize], keys[self.bucketSize:]]
+            self.students[b:b + 1] = [students[:self.bucketSize], students[self.bucketSize:]]
+            self.maxes[b:b + 1] = [keys[self.bucketSize - 1], keys[-1]]
+            self._buildTree()
+        else:
+            self._addTree(b, 1)
+
+    def _buildTree(self):
+        tree = [0] + [len(bucket) for bucket in self.keys]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def _addTree(self, b, delta):
+        i = b + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _countBefore(self, b):
+        total = 0
+        while b > 0:
+            total += self.tree[b]
+            b -= b & -b
+        return total
+
+    def at(self, position):
+        """
+        Finds the student at a position of the index, 0 being the highest average score.
+
+        :param position: The position, between 0 and the number of indexed students - 1.
+        :type position: int
+        :return: The student at that position.
+        :rtype: Student
+
+        Running Example:
+            best = rank_index.at(0)
+        """
+        if not 0 <= position < len(self):
+            raise IndexError(f"Rank position out of range: {position}")
+        # Descends the Fenwick tree to the last bucket whose students all come before the position
+        b = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if b + step < len(self.tree) and self.tree[b + step] <= position:
+                b += step
+                position -= self.tree[b]
+            step >>= 1
+        return self.students[b][position]
+
+    def rank(self, student):
+        """
+        Finds the rank of an indexed student, starting from 1 for the highest average score.
+
+        :param student: The student to rank.
+        :type student: Student
+        :return: The rank of the student.
+        :rtype: int
+
+        Running Example:
+            rank = rank_index.rank(student)
+        """
+        b, position = self._locate((-student.averageScore, self.sequenceOf[student.sID]))
+        return self._countBefore(b) + position + 1
+
+    def above(self, Thres):
+        """
+        Yields the students whose average score is above the threshold, best first.
+
+        :param Thres: The threshold score.
+        :type Thres: float
+        :return: A generator of the students above the threshold.
+        :rtype: generator
+
+        Running Example:
+            students = list(rank_index.above(85))
+        """
+        bound = (-Thres,)
+        b = bisect.bisect_left(self.maxes, bound)
+        for bucket in self.students[:b]:
+            yield from bucket
+        if b < len(self.keys):
+            yield from self.students[b][:bisect.bisect_left(self.keys[b], bound)]
+
+class Instrumentation:
+    """
+    A class timing method calls of chosen objects.
+
+    Methods are timed by replacing them with a timing wrapper on the object itself, so objects that are not
+    instrumented run the original methods without any overhead.
+
+    Attributes:
+        records (dict): A dictionary mapping each operation name to its [calls, total ns, max ns].
+
+    """
+    def __init__(self):
+        """
+        Initializes an Instrumentation object with no records.
+
+        Running Example:
+            instrumentation = Instrumentation()
+        """
+        self.records = {}
+
+    def wrap(self, owner, names, prefix=''):
+        """
+        Times the given methods of an object from now on.
+
+        :param owner: The object whose methods are timed.
+        :type owner: object
+        :param names: The names of the methods.
+        :type names: tuple
+        :param prefix: The text put before each method name in the records.
+        :type prefix: str
+
+        Running Example:
+            instrumentation.wrap(grade_system.rankIndex, ('rebuild', 'rank'), 'RankIndex.')
+        """
+        for name in names:
+            setattr(owner, name, self._timed(getattr(owner, name), prefix + name))
+
+    def _timed(self, method, label):
+        record = self.records.setdefault(label, [0, 0, 0])
+        clock = time.perf_counter_ns
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                record[0] += 1
+                record[1] += elapsed
+                if elapsed > record[2]:
+                    record[2] = elapsed
+        return timed
+
+    def stats(self):
+        """
+        Gets the records of the operations called at least once.
+
+        :return: A dictionary mapping each operation to its 'calls', 'totalNs', 'maxNs' and 'meanNs'.
+        :rtype: dict
+
+        Running Example:
+            stats = instrumentation.stats()
+        """
+        return {label: {'calls': calls, 'totalNs': total, 'maxNs': longest, 'meanNs': total / calls}
+                for label, (calls, total, longest) in self.records.items() if calls}
+
+    def reset(self):
+        """
+        Sets every record back to zero.
+
+        Running Example:
+            instrumentation.reset()
+        """
+        for record in self.records.values():
+            record[:] = [0, 0, 0]
+
+class QueryCache:
+    """
+    A class keeping query results for one version of a roster.
+
+    A result is computed on the first request for its key and returned again until the roster version
+    changes, at which point every result is dropped. Once maxEntries results are kept, the oldest is dropped.
+
+    Attributes:
+        version (int): The roster version the kept results belong to.
+        entries (dict): A dictionary mapping each query key to its result.
+        maxEntries (int): The number of results kept at most.
+        hits (int): The number of requests answered from a kept result.
+        misses (int): The number of requests that had to be computed.
+        lock (threading.Lock): The lock guarding the entries when the cache is shared by threads.
+
+    """
+    def __init__(self, maxEntries=4096):
+        """
+        Initializes an empty QueryCache object.
+
+        :param maxEntries: The number of results kept at most.
+        :type maxEntries: int
+
+        Running Example:
+            query_cache = QueryCache()
+        """
+        self.version = None
+        self.entries = {}
+        self.maxEntries = maxEntries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, version, key, compute):
+        """
+        Gets the result of a query, computing it only if it is not kept for this version.
+
+        :param version: The current roster version.
+        :type version: int
+        :param key: The query key, for example ('rank', sID).
+        :type key: tuple
+        :param compute: A function without arguments computing the result.
+        :type compute: callable
+        :return: The result of the query.
+
+        Running Example:
+            rank = query_cache.get(grade_system.version, ('rank', '123'), lambda: rank_index.rank(student))
+        """
+        # The lock only guards the entries; the result is computed without it, so concurrent queries
+        # may compute the same result at once
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+            value = self.entries.get(key, self)
+            if value is not self:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = compute()
+        with self.lock:
+            if version == self.version:
+                if len(self.entries) >= self.maxEntries:
+                    del self.entries[next(iter(self.entries))]
+                self.entries[key] = value
+        return value
+
+    def stats(self):
+        """
+        Gets the counters of the cache.
+
+        :return: The number of hits, misses and kept results, and the version they belong to.
+        :rtype: dict
+
+        Running Example:
+            stats = query_cache.stats()
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries), 'version': self.version}
+
+class ReadWriteLock:
+    """
+    A class letting many threads read at once while a writing thread runs alone.
+
+    Both locks are reentrant: a thread may take the read lock again while holding it, and the thread holding the
+    write lock may take either lock again. A thread holding only the read lock cannot take the write lock.
+    Waiting writers go first: new readers wait until they are done, so a steady stream of queries cannot
+    keep a change waiting forever.
+
+    Attributes:
+        mutex (threading.Lock): The lock guarding the other attributes.
+        condition (threading.Condition): The condition on mutex the waiting threads wait on.
+        readers (dict): A dictionary mapping each thread holding the read lock to how many times it holds it.
+        writer (int): The thread holding the write lock, None if there is none.
+        writerDepth (int): How many times the writer holds the write lock.
+        waitingWriters (int): The number of threads waiting for the write lock.
+        beforeRelease (callable): Called by the writer, still holding the write lock, before it gives the write
+                                  lock back for the last time; None to call nothing.
+
+    """
+    def __init__(self):
+        """
+        Initializes a ReadWriteLock object held by no thread.
+
+        Running Example:
+            lock = ReadWriteLock()
+        """
+        self.mutex = threading.Lock()
+        self.condition = threading.Condition(self.mutex)
+        self.readers = {}
+        self.writer = None
+        self.writerDepth = 0
+        self.waitingWriters = 0
+        self.beforeRelease = None
+
+    def acquireRead(self):
+        """
+        Takes the read lock, waiting while another thread writes or waits to write.
+
+        Running Example:
+            lock.acquireRead()
+        """
+        me = threading.get_ident()
+        with self.mutex:
+            if me not in self.readers and self.writer != me:
+                while self.writer is not None or self.waitingWriters:
+                    self.condition.wait()
+            self.readers[me] = self.readers.get(me, 0) + 1
+
+    def releaseRead(self):
+        """
+        Gives back the read lock once.
+
+        Running Example:
+            lock.releaseRead()
+        """
+        me = threading.get_ident()
+        with self.mutex:
+            depth = self.readers[me] - 1
+            if depth:
+                self.readers[me] = depth
+            else:
+                del self.readers[me]
+                if not self.readers:
+                    self.condition.notify_all()
+
+    def acquireWrite(self):
+        """
+        Takes the write lock, waiting until no other thread reads or writes.
+
+        Running Example:
+            lock.acquireWrite()
+        """
+        me = threading.get_ident()
+        with self.mutex:
+            if self.writer == me:
+                self.writerDepth += 1
+                return
+            if me in self.readers:
+                raise RuntimeError("Cannot take the write lock while holding the read lock")
+            self.waitingWriters += 1
+            try:
+                while self.writer is not None or self.readers:
+                    self.condition.wait()
+            finally:
+                self.waitingWriters -= 1
+            self.writer = me
+            self.writerDepth = 1
+
+    def releaseWrite(self):
+        """
+        Gives back the write lock once, calling beforeRelease first when it is the last time.
+
+        Running Example:
+            lock.releaseWrite()
+        """
+        try:
+            if self.writerDepth == 1 and self.beforeRelease is not None:
+                # Only the writer changes writerDepth, so it can be read without the mutex
+                self.beforeRelease()
+        finally:
+            self._releaseWrite()
+
+    def _releaseWrite(self):
+        with self.mutex:
+            self.writerDepth -= 1
+            if not self.writerDepth:
+                self.writer = None
+                self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def reading(self):
+        """
+        Holds the read lock for the duration of a with block.
+
+        Running Example:
+            with grade_system.lock.reading():
+                total = sum(student.averageScore for student in grade_system.studentList)
+        """
+        self.acquireRead()
+        try:
+            yield
+        finally:
+            self.releaseRead()
+
+    @contextlib.contextmanager
+    def writing(self):
+        """
+        Holds the write lock for the duration of a with block.
+
+        Running Example:
+            with grade_system.lock.writing():
+                grade_system.updateScore('123 lab1 88')
+                grade_system.updateScore('124 lab1 90')
+        """
+        self.acquireWrite()
+        try:
+            yield
+        finally:
+            self.releaseWrite()
+
+class GradingScale:
+    """
+    A class representing the cut-offs converting average scores to letter grades.
+
+    An average gets the letter of the highest cut-off it reaches, or the lowest letter below the first cut-off.
+    Averages above the maximum get the lowest letter as well.
+
+    Attributes:
+        cutoffs (tuple): The lower bound of every letter but the lowest, ascending.
+        letters (tuple): The letters from the lowest to the highest, one more than the cut-offs.
+        maximum (float): The highest average that can get a letter above the lowest one.
+
+    """
+    def __init__(self, cutoffs=GRADE_CUTOFFS, letters=GRADE_LETTERS, maximum=100):
+        """
+        Initializes the GradingScale object.
+
+        :param cutoffs: The lower bound of every letter but the lowest, ascending.
+        :type cutoffs: list
+        :param letters: The letters from the lowest to the highest, one more than the cut-offs.
+        :type letters: list
+        :param maximum: The highest average that can get a letter above the lowest one.
+        :type maximum: float
+
+        Running Example:
+            scale = GradingScale([60, 70, 80, 90], ['F', 'D', 'C', 'B', 'A'])
+        """
+        self.cutoffs = tuple(float(cutoff) for cutoff in cutoffs)
+        self.letters = tuple(letters)
+        self.maximum = float(maximum)
+        if len(self.letters) != len(self.cutoffs) + 1:
+            raise ValueError(f"Expected {len(self.cutoffs) + 1} letters for {len(self.cutoffs)} cut-offs")
+        if any(low >= high for low, high in zip(self.cutoffs, self.cutoffs[1:])):
+            raise ValueError("Cut-offs must be strictly ascending")
+        self._cutoffArray = None
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Creates a grading scale from its text form, the letters from the lowest up separated by their cut-offs,
+        optionally followed by the maximum.
+
+        :param text: The scale in the format 'letter cutoff letter ... letter [maximum]'.
+        :type text: str
+        :return: The grading scale.
+        :rtype: GradingScale
+
+        Running Example:
+            scale = GradingScale.parse('F 60 D 70 C 80 B 90 A 100')
+        """
+        fields = text.split()
+        maximum = 100
+        if len(fields) % 2 == 0:
+            maximum = float(fields.pop())
+        if not fields:
+            raise ValueError("Empty grading scale")
+        return cls([float(cutoff) for cutoff in fields[1::2]], fields[::2], maximum)
+
+    def __str__(self):
+        fields = [self.letters[0]]
+        for cutoff, letter in zip(self.cutoffs, self.letters[1:]):
+            fields += [f"{cutoff:g}", letter]
+        return ' '.join(fields + [f"{self.maximum:g}"])
+
+    def __eq__(self, other):
+        return isinstance(other, GradingScale) and (self.cutoffs, self.letters, self.maximum) == \
+            (other.cutoffs, other.letters, other.maximum)
+
+    def __hash__(self):
+        return hash((self.cutoffs, self.letters, self.maximum))
+
+    def __getstate__(self):
+        return {'cutoffs': self.cutoffs, 'letters': self.letters, 'maximum': self.maximum}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, _cutoffArray=None)
+
+    def code(self, average):
+        """
+        Finds the index into letters of the letter grade of one average score.
+
+        :param average: The average score.
+        :type average: float
+        :return: The index of the letter grade.
+        :rtype: int
+
+        Running Example:
+            code = scale.code(95.1)
+        """
+        # NaN fails the comparison and gets the lowest letter too
+        return bisect.bisect_right(self.cutoffs, average) if average <= self.maximum else 0
+
+    def letter(self, average):
+        """
+        Converts one average score to its letter grade.
+
+        :param average: The average score.
+        :type average: float
+        :return: The letter grade.
+        :rtype: str
+
+        Running Example:
+            letter_grade = scale.letter(95.1)
+        """
+        return self.letters[bisect.bisect_right(self.cutoffs, average) if average <= self.maximum else 0]
+
+    def codes(self, averages):
+        """
+        Converts an array of average scores to indices into letters, the same way as code.
+
+        :param averages: The average scores.
+        :type averages: numpy.ndarray
+        :return: The index of the letter grade of each average score.
+        :rtype: numpy.ndarray
+
+        Running Example:
+            letters = [scale.letters[code] for code in scale.codes(numpy.array([95.1, 42.0]))]
+        """
+        if self._cutoffArray is None:
+            self._cutoffArray = np.asarray(self.cutoffs, dtype=float)
+        codes = np.searchsorted(self._cutoffArray, averages, side='right')
+        return np.where(averages <= self.maximum, codes, 0)
+
+    def emptyDistribution(self):
+        """
+        Creates a distribution with a zero count for every letter, from the highest letter down.
+
+        :return: The empty distribution.
+        :rtype: dict
+
+        Running Example:
+            distribution = scale.emptyDistribution()
+        """
+        return dict.fromkeys(reversed(self.letters), 0)
+
+DEFAULT_SCALE = GradingScale()
 
 class Student:
     """
     A class representing a student.
 
     This class stores information about a student including their ID, name, scores, average score, and letter grade.
+    Students are slotted and keep their five scores in a compact array of doubles, so a large roster carries
+    no per-student __dict__ or list of float objects.
 
     """
-    def __init__(self, sID, name, lab1, lab2, lab3, mid, final, weightList):
+    __slots__ = ('sID', 'name', '_scores', 'averageScore', 'letterGrade')
+
+    def __init__(self, sID, name, lab1, lab2, lab3, mid, final, weightList, gradingScale=DEFAULT_SCALE):
         """
         Initializes a Student object.
 
@@ -288,32 +1925,89 @@ class Student:
         :type final: str
         :param weightList: A list of weights for lab assignments, midterm, and final exam.
         :type weightList: list
+        :param gradingScale: The grading scale converting the average score to a letter grade.
+        :type gradingScale: GradingScale
 
         Running Example:
-            student = Student('123', 'John', '90', '85', '75', '85', '90', ['0.1', '0.1', '0.1', '0.3', '0.4'])
+            student = Student('123', 'John', '90', '85', '75', '85', '90', [0.1, 0.1, 0.1, 0.3, 0.4])
         """
         try:
             self.sID = sID
             self.name = name
-            self.scores = [float(lab1), float(lab2), float(lab3), float(mid), float(final)]
+            scores = [float(lab1), float(lab2), float(lab3), float(mid), float(final)]
+            for score in scores:
+                if not math.isfinite(score):
+                    raise ValueError(f"Invalid score: {score}")
+            self.scores = scores
             self.averageScore = self.average(weightList)
-            self.letterGrade = self.countLetterGrade()
+            self.letterGrade = gradingScale.letter(self.averageScore)
         except Exception as e:
             print("Error constructing student:", e, "student creation cancelled")
             raise
-    def recalculate(self,weightList):
+
+    @classmethod
+    def fromValues(cls, sID, name, scores, averageScore, letterGrade):
+        """
+        Creates a Student object from already converted and graded values, without recalculating anything.
+
+        :param sID: The student's ID.
+        :type sID: str
+        :param name: The student's name.
+        :type name: str
+        :param scores: The student's five scores; an array('d') is kept as is instead of being copied.
+        :type scores: list
+        :param averageScore: The student's average score.
+        :type averageScore: float
+        :param letterGrade: The student's letter grade.
+        :type letterGrade: str
+        :return: The new student.
+        :rtype: Student
+
+        Running Example:
+            student = Student.fromValues('123', 'John', [90, 85, 75, 85, 90], 86.0, 'A')
+        """
+        student = cls.__new__(cls)
+        student.sID = sID
+        student.name = name
+        if type(scores) is array and scores.typecode == 'd':
+            student._scores = scores
+        else:
+            student.scores = scores
+        student.averageScore = averageScore
+        student.letterGrade = letterGrade
+        return student
+
+    @property
+    def scores(self):
+        """
+        The student's scores (lab1, lab2, lab3, midterm, final) as a new list.
+
+        Changing the returned list does not change the student; assign a new list to update the scores.
+
+        Running Example:
+            student.scores = [90, 85, 75, 85, 90]
+        """
+        return self._scores.tolist()
+
+    @scores.setter
+    def scores(self, scores):
+        self._scores = array('d', scores)
+
+    def recalculate(self, weightList, gradingScale=DEFAULT_SCALE):
         """
         Recalculates the student's average score and letter grade based on the weight list.
 
         :param weightList: A list of weights for lab assignments, midterm, and final exam.
         :type weightList: list
+        :param gradingScale: The grading scale converting the average score to a letter grade.
+        :type gradingScale: GradingScale
 
         Running Example:
-            student.recalculate(['0.2', '0.2', '0.2', '0.3', '0.4'])
+            student.recalculate([0.2, 0.2, 0.2, 0.3, 0.4])
         """
         self.averageScore = self.average(weightList)
-        self.letterGrade = self.countLetterGrade()
-        
+        self.letterGrade = gradingScale.letter(self.averageScore)
+
     def average(self, weightList):
         """
         Calculates the student's average score using the weight.
@@ -323,49 +2017,105 @@ class Student:
         :return: The average score of the student.
         :rtype: float
 
+        The weights must already be numbers; the weighted scores are added left to right.
+
         Running Example:
-            average_score = student.average(['0.2', '0.2', '0.2', '0.3', '0.4'])
+            average_score = student.average([0.2, 0.2, 0.2, 0.3, 0.4])
         """
-        total_score = sum(float(score) * float(weight) for score, weight in zip(self.scores, weightList))
-        return total_score
+        scores = self._scores
+        return (scores[0] * weightList[0] + scores[1] * weightList[1] + scores[2] * weightList[2]
+                + scores[3] * weightList[3] + scores[4] * weightList[4])
     
-    def countLetterGrade(self):
+    def countLetterGrade(self, gradingScale=DEFAULT_SCALE):
         """
         Converts the letter grade of the student using average score.
 
+        :param gradingScale: The grading scale converting the average score to a letter grade.
+        :type gradingScale: GradingScale
         :return: The letter grade of the student.
         :rtype: str
 
         Running Example:
             letter_grade = student.countLetterGrade()
         """
-        if 90 <= self.averageScore <= 100:
-            return 'A+'
-        elif 85 <= self.averageScore < 90:
-            return 'A'
-        elif 80 <= self.averageScore < 85:
-            return 'A-'
-        elif 77 <= self.averageScore < 80:
-            return 'B+'
-        elif 73 <= self.averageScore < 77:
-            return 'B'
-        elif 70 <= self.averageScore < 73:
-            return 'B-'
-        elif 67 <= self.averageScore < 70:
-            return 'C+'
-        elif 63 <= self.averageScore < 67:
-            return 'C'
-        elif 60 <= self.averageScore < 63:
-            return 'C-'
-        elif 50 <= self.averageScore < 60:
-            return 'D'
+        return gradingScale.letter(self.averageScore)
+
+
+def parseRoster(lines, weightList, gradingScale=DEFAULT_SCALE, firstLine=1):
+    """
+    Parses and grades a block of roster lines (sID name lab1 lab2 lab3 mid final) in one pass.
+
+    The scores of the whole block are converted to one array of doubles at once and graded column by column,
+    with the same results as creating a Student for each line. When a line is malformed, the block is parsed
+    again line by line to report every bad line with its line number; the other lines are still parsed.
+
+    :param lines: The lines to parse; blank lines are skipped.
+    :type lines: list
+    :param weightList: A list of weights for lab assignments, midterm, and final exam, as numbers.
+    :type weightList: list
+    :param gradingScale: The grading scale converting average scores to letter grades.
+    :type gradingScale: GradingScale
+    :param firstLine: The line number of the first line.
+    :type firstLine: int
+    :return: The ids, names, scores (five per student, in one array), averages, letter grades and line numbers of
+             the students, the errors as (line number, message) pairs and the letter grade counts.
+    :rtype: dict
+
+    Running Example:
+        result = parseRoster(['110006213 Bill 90 85 95 88 92'], [0.1, 0.1, 0.1, 0.3, 0.4])
+    """
+    rows = list(map(str.split, lines))
+    lengths = set(map(len, rows))
+    errors = []
+    scores = None
+    if lengths <= {0, 7}:
+        tokens = list(itertools.chain.from_iterable(rows))
+        ids, names = tokens[0::7], tokens[1::7]
+        del tokens[0::7]
+        del tokens[0::6]
+        try:
+            scores = array('d', map(float, tokens))
+        except ValueError:
+            pass
         else:
-            return 'E'
+            # A nan or infinite score makes the sum non-finite; the line by line pass below reports it
+            if not math.isfinite(sum(scores)):
+                scores = None
+        if scores is not None:
+            if 0 in lengths:
+                lineNumbers = array('L', [lineNumber for lineNumber, row in enumerate(rows, start=firstLine) if row])
+            else:
+                lineNumbers = array('L', range(firstLine, firstLine + len(rows)))
+    if scores is None:
+        ids, names, scores, lineNumbers = [], [], array('d'), array('L')
+        for lineNumber, tmp in enumerate(rows, start=firstLine):
+            if not tmp:
+                continue
+            try:
+                assert len(tmp) == 7, "Invalid data format in input file"
+                values = array('d', map(float, tmp[2:]))
+                for value in values:
+                    if not math.isfinite(value):
+                        raise ValueError(f"Invalid score: {value}")
+            except Exception as e:
+                errors.append((lineNumber, str(e)))
+                continue
+            ids.append(tmp[0])
+            names.append(tmp[1])
+            scores.extend(values)
+            lineNumbers.append(lineNumber)
+    w0, w1, w2, w3, w4 = weightList
+    # Added left to right like Student.average, so the averages are identical
+    averages = array('d', [lab1 * w0 + lab2 * w1 + lab3 * w2 + mid * w3 + final * w4 for lab1, lab2, lab3, mid, final
+                           in zip(scores[0::5], scores[1::5], scores[2::5], scores[3::5], scores[4::5])])
+    letters = list(map(gradingScale.letter, averages))
+    return {'ids': ids, 'names': names, 'scores': scores, 'averages': averages, 'letters': letters,
+            'lineNumbers': lineNumbers, 'errors': errors, 'distribution': Counter(letters)}
 
 
 if __name__ == "__main__":
-    # Create GradeSystem object
-    grade_system = GradeSystem()
+    # Create GradeSystem object, optionally from the roster file given on the command line
+    grade_system = GradeSystem(sys.argv[1] if len(sys.argv) > 1 else 'input.txt')
     print("Welcome to Grade System.")
     # Main loop
     while True:
@@ -0,0 +1,893 @@
+import argparse
+import asyncio
+import contextlib
+import copy
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from GradeSystem import LOAD_CHUNK_BYTES, SCORE_COLUMNS, GradeSystem, Student, np, parseRoster, pausedGarbageCollection
+from GradeSnapshot import saveSnapshot, loadSnapshot
+from GradeLoader import parallelLoad
+from GradeServer import GradeServer
+from GradeSQLite import SQLiteGradeSystem
+from GradeExport import exportCSV, importCSV, exportColumnar, importColumnar
+
+
+@contextlib.contextmanager
+def silenced():
+    """
+    Discards everything printed inside the with block.
+
+    Running Example:
+        with silenced():
+            grade_system.addStudent('123 John 90 85 75 85 90')
+    """
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+NAMES = ['Ann', 'Bill', 'Cody', 'Dana', 'Eve', 'Finn', 'Gina', 'Hugo', 'Iris', 'Jack', 'Kim', 'Leo']
+
+
+def generateRoster(size, seed=0):
+    """
+    Generates the lines of a synthetic roster in the input.txt format, the same lines for the same seed.
+
+    Student i has the ID 'B' followed by i on nine digits. Each score is drawn around the student's own level,
+    so averages spread over every letter grade with a realistic amount of ties.
+
+    :param size: The number of students.
+    :type size: int
+    :param seed: The seed of the random generator.
+    :type seed: int
+    :return: A generator of roster lines, without line endings.
+    :rtype: generator
+
+    Running Example:
+        lines = list(generateRoster(1000, seed=42))
+    """
+    rng = random.Random(seed)
+    for i in range(size):
+        level = rng.gauss(75, 12)
+        scores = [min(100, max(0, round(rng.gauss(level, 8)))) for _ in range(5)]
+        yield "B{:09d} {} {} {} {} {} {}".format(i, rng.choice(NAMES), *scores)
+
+
+def buildRoster(size, seed=0):
+    """
+    Builds a GradeSystem holding the given number of synthetic students.
+
+    :param size: The number of students to add.
+    :type size: int
+    :param seed: The seed of the roster generator.
+    :type seed: int
+    :return: The populated grade system.
+    :rtype: GradeSystem
+
+    Running Example:
+        grade_system = buildRoster(10000)
+    """
+    grade_system = GradeSystem(None)
+    with silenced():
+        for line in generateRoster(size, seed):
+            grade_system.addStudent(line)
+    return grade_system
+
+
+def benchUpdateWeight(size):
+    """
+    Measures updateWeight with the columnar score matrix and with the per-student loop.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :return: The measured durations in seconds; 'columnar' is None when numpy is not installed.
+    :rtype: dict
+
+    Running Example:
+        result = benchUpdateWeight(100000)
+    """
+    grade_system = buildRoster(size)
+    result = {'size': size, 'columnar': None}
+    with silenced():
+        if grade_system.scoreMatrix is not None:
+            start = time.perf_counter()
+            grade_system.updateWeight('lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2')
+            result['columnar'] = time.perf_counter() - start
+        grade_system.scoreMatrix = None
+        start = time.perf_counter()
+        grade_system.updateWeight('lab1 0.1 lab2 0.1 lab3 0.1 midterm 0.3 final 0.4')
+        result['loop'] = time.perf_counter() - start
+    return result
+
+
+def deepcopyStageWeights(gradeSystem, info):
+    """
+    Stages a weight update the way GradeSystem did before its staging record, on a deep copy, kept for comparison.
+    """
+    newInfo = info.split()
+    tmpWeightList = copy.deepcopy(gradeSystem.weightList)
+    for i, j in enumerate(newInfo[::2]):
+        assert float(newInfo[i * 2 + 1]), f"Invalid weight format: {newInfo[i * 2 + 1]}"
+        if j not in SCORE_COLUMNS:
+            raise AssertionError(f"Invalid weight format: {j}")
+        tmpWeightList[SCORE_COLUMNS[j]] = float(newInfo[i * 2 + 1])
+    if sum(tmpWeightList) > 1.0:
+        raise AssertionError(f"Invalid weight sum: {sum(tmpWeightList):.2f}")
+    return tmpWeightList
+
+
+def deepcopyUpdateScore(gradeSystem, info):
+    """
+    Updates scores the way GradeSystem did before its staging record, staging them on a deep copy of the student,
+    kept for comparison.
+    """
+    newInfo = info.split()
+    student = gradeSystem.studentIndex[newInfo[0]]
+    tmpStudent = copy.deepcopy(student)
+    tmpScores = tmpStudent.scores
+    for name, value in zip(newInfo[1::2], newInfo[2::2]):
+        if name not in SCORE_COLUMNS:
+            raise AssertionError(f"Invalid score format: {name}")
+        tmpScores[SCORE_COLUMNS[name]] = float(value)
+    oldAverage, oldLetterGrade = student.averageScore, student.letterGrade
+    student.scores = tmpScores
+    student.recalculate(gradeSystem.weightList, gradeSystem.gradingScale)
+    gradeSystem.rankIndex.update(student, oldAverage)
+    if gradeSystem.scoreMatrix is not None:
+        gradeSystem.scoreMatrix.update(student)
+    gradeSystem.gradeDistribution[oldLetterGrade] -= 1
+    gradeSystem.gradeDistribution[student.letterGrade] += 1
+    gradeSystem.version += 1
+    return True
+
+
+def benchStaging(size, seed=0, updates=20000):
+    """
+    Measures the latency of one score update and of staging one weight update, with the staging record and
+    with the previous staging on deep copies.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :param seed: The seed of the roster generator and of the updates.
+    :type seed: int
+    :param updates: The number of updates measured for each variant.
+    :type updates: int
+    :return: The mean latency in microseconds of 'updateScore' and 'stageWeights' for 'record' and 'deepcopy'.
+    :rtype: dict
+
+    Running Example:
+        result = benchStaging(100000)
+    """
+    rng = random.Random(seed)
+    grade_system = buildRoster(size, seed)
+    scoreUpdates = ["B{:09d} {} {} final {}".format(rng.randrange(size), rng.choice(('lab1', 'lab2', 'lab3', 'midterm')),
+                                                     rng.randint(0, 100), rng.randint(0, 100)) for _ in range(updates)]
+    weightUpdate = 'lab1 0.05 lab2 0.05 lab3 0.1 midterm 0.3 final 0.5'
+    result = {'size': size}
+    for label, updateScore, stageWeights in (('record', GradeSystem.updateScore, GradeSystem._stageWeights),
+                                             ('deepcopy', deepcopyUpdateScore, deepcopyStageWeights)):
+        start = time.perf_counter()
+        for info in scoreUpdates:
+            updateScore(grade_system, info)
+        scoreSeconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(updates):
+            stageWeights(grade_system, weightUpdate)
+        weightSeconds = time.perf_counter() - start
+        result[label] = {'updateScore': scoreSeconds / updates * 1e6, 'stageWeights': weightSeconds / updates * 1e6}
+    return result
+
+
+def writeRoster(path, size, seed=0):
+    """
+    Writes a roster file of synthetic students in the input.txt format.
+
+    :param path: The file to write.
+    :type path: str
+    :param size: The number of students to write.
+    :type size: int
+    :param seed: The seed of the roster generator.
+    :type seed: int
+
+    Running Example:
+        writeRoster('bench_roster.txt', 100000)
+    """
+    with open(path, 'w', encoding='utf-8') as fh:
+        lines = generateRoster(size, seed)
+        while True:
+            block = [line for _, line in zip(range(65536), lines)]
+            if not block:
+                break
+            fh.write('\n'.join(block) + '\n')
+
+
+def benchLoad(size):
+    """
+    Measures loading a roster file of the given size.
+
+    :param size: The number of students in the file.
+    :type size: int
+    :return: The load duration in seconds and the rows loaded per second.
+    :rtype: dict
+
+    Running Example:
+        result = benchLoad(100000)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'roster.txt')
+        writeRoster(path, size)
+        stats = GradeSystem(path).loadStats
+    return {'size': size, 'seconds': stats['seconds'], 'rowsPerSecond': stats['rowsPerSecond']}
+
+
+class ConvertingStudent(Student):
+    """
+    Student with the previous Student.average, converting every score and weight with float() again, kept for comparison.
+    """
+    __slots__ = ()
+
+    def average(self, weightList):
+        return sum(float(score) * float(weight) for score, weight in zip(self._scores, weightList))
+
+
+def lineByLineLoad(path, cls=ConvertingStudent):
+    """
+    Loads a roster file the way GradeSystem.load did before parseRoster, one Student per line, kept for comparison.
+
+    :param path: The roster file to load.
+    :type path: str
+    :param cls: The student class created for each line.
+    :type cls: type
+    :return: The loaded grade system.
+    :rtype: GradeSystem
+
+    Running Example:
+        grade_system = lineByLineLoad('input.txt')
+    """
+    gradeSystem = GradeSystem(None)
+    with open(path, 'r', encoding='utf-8') as fh, pausedGarbageCollection():
+        for lineNumber, line in enumerate(fh, start=1):
+            tmp = line.split()
+            if not tmp:
+                continue
+            try:
+                assert len(tmp) == 7, "Invalid data format in input file"
+                assert tmp[0] not in gradeSystem.studentIndex, "Student with ID '{}' already exists.".format(tmp[0])
+                student = cls(tmp[0], tmp[1], tmp[2], tmp[3], tmp[4], tmp[5], tmp[6], gradeSystem.weightList,
+                              gradeSystem.gradingScale)
+            except Exception as e:
+                print(f"Error occurred while reading line {lineNumber}:", e)
+                continue
+            gradeSystem.studentList.append(student)
+            gradeSystem.studentIndex[student.sID] = student
+            gradeSystem.gradeDistribution[student.letterGrade] += 1
+    gradeSystem.rankIndex.rebuild(gradeSystem.studentList)
+    if gradeSystem.scoreMatrix is not None:
+        gradeSystem.scoreMatrix.rebuild(gradeSystem.studentList)
+    return gradeSystem
+
+
+def timeLoad(loader, path):
+    """
+    Measures one load of a roster file.
+
+    :param loader: The function loading the file, such as GradeSystem or lineByLineLoad.
+    :type loader: callable
+    :param path: The roster file to load.
+    :type path: str
+    :return: The load duration in seconds.
+    :rtype: float
+
+    Running Example:
+        seconds = timeLoad(GradeSystem, 'input.txt')
+    """
+    start = time.perf_counter()
+    loader(path)
+    return time.perf_counter() - start
+
+
+def benchParse(size, recalculations=5):
+    """
+    Measures GradeSystem.load, which parses blocks of lines with parseRoster, against the previous line by line
+    load, and recalculating every average with and without converting the scores and weights again.
+
+    Each load runs in a new process, so neither one pays for growing the heap the other then reuses.
+
+    :param size: The number of students in the roster file.
+    :type size: int
+    :param recalculations: The number of times every average is recalculated.
+    :type recalculations: int
+    :return: The seconds taken by each load and by parseRoster alone, and the seconds per recalculation of
+             the whole roster by Student.average and by the previous average.
+    :rtype: dict
+
+    Running Example:
+        result = benchParse(1000000)
+    """
+    weightList = [0.1, 0.1, 0.1, 0.3, 0.4]
+    result = {'size': size}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'roster.txt')
+        writeRoster(path, size)
+        context = multiprocessing.get_context('spawn')
+        for label, loader in (('load', GradeSystem), ('lineByLine', lineByLineLoad)):
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                result[label] = pool.submit(timeLoad, loader, path).result()
+        start = time.perf_counter()
+        with open(path, 'r', encoding='utf-8') as fh, pausedGarbageCollection():
+            while True:
+                lines = fh.readlines(LOAD_CHUNK_BYTES)
+                if not lines:
+                    break
+                parseRoster(lines, weightList)
+        result['parseRoster'] = time.perf_counter() - start
+        students = GradeSystem(path).studentList
+    for label, average in (('average', Student.average), ('convertingAverage', ConvertingStudent.average)):
+        start = time.perf_counter()
+        for _ in range(recalculations):
+            for student in students:
+                average(student, weightList)
+        result[label] = (time.perf_counter() - start) / recalculations
+    return result
+
+
+def benchThreads(size, threadCounts=(1, 2, 4, 8), queries=40000, seed=0):
+    """
+    Measures the query throughput of a thread-safe GradeSystem shared by query threads while another thread
+    updates a score about every millisecond, and the cost of the locks for a single thread without updates.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :param threadCounts: The numbers of query threads measured.
+    :type threadCounts: tuple
+    :param queries: The number of students queried with getRank and getAverage for each measurement.
+    :type queries: int
+    :param seed: The seed of the roster generator and of the queried students.
+    :type seed: int
+    :return: The queries per second of a single thread without updates, for a plain ('plainPerSecond') and a
+             thread-safe ('lockedPerSecond') GradeSystem, and for each number of query threads, the queries
+             ('queriesPerSecond') and score updates ('updatesPerSecond') per second.
+    :rtype: dict
+
+    Running Example:
+        result = benchThreads(100000)
+    """
+    rng = random.Random(seed)
+    sIDs = ["B{:09d}".format(rng.randrange(size)) for _ in range(queries)]
+    updates = ["B{:09d} final {}".format(rng.randrange(size), rng.randint(0, 100)) for _ in range(queries)]
+
+    def query(grade_system, part):
+        for sID in part:
+            grade_system.getRank(sID)
+            grade_system.getAverage(sID)
+
+    result = {'size': size}
+    grade_system = buildRoster(size, seed)
+    for label in ('plain', 'locked'):
+        if label == 'locked':
+            grade_system._makeThreadSafe()
+        query(grade_system, sIDs)
+        start = time.perf_counter()
+        query(grade_system, sIDs)
+        result[label + 'PerSecond'] = 2 * queries / (time.perf_counter() - start)
+    for threadCount in threadCounts:
+        done = threading.Event()
+        updated = [0]
+
+        def update():
+            while not done.wait(0.001):
+                grade_system.updateScore(updates[updated[0] % len(updates)])
+                updated[0] += 1
+
+        threads = [threading.Thread(target=query, args=(grade_system, sIDs[i::threadCount]))
+                   for i in range(threadCount)]
+        writer = threading.Thread(target=update)
+        start = time.perf_counter()
+        writer.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - start
+        done.set()
+        writer.join()
+        result[threadCount] = {'queriesPerSecond': 2 * queries / seconds, 'updatesPerSecond': updated[0] / seconds}
+    return result
+
+
+def benchParallelLoad(size, workerCounts):
+    """
+    Measures loading a roster file with parallelLoad for each number of worker processes.
+
+    :param size: The number of students in the file.
+    :type size: int
+    :param workerCounts: The numbers of worker processes to measure.
+    :type workerCounts: list
+    :return: The load duration in seconds for each number of workers.
+    :rtype: dict
+
+    Running Example:
+        result = benchParallelLoad(1000000, [1, 2, 4])
+    """
+    result = {'size': size}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'roster.txt')
+        writeRoster(path, size)
+        for workers in workerCounts:
+            start = time.perf_counter()
+            parallelLoad(path, workers=workers)
+            result[workers] = time.perf_counter() - start
+    return result
+
+
+def benchServer(size, clients=50, requests=200):
+    """
+    Measures GradeServer query latency with many concurrent clients, while one weight update is applied.
+
+    Each client sends its requests one after another, cycling through SCORE, AVERAGE, RANK and FILTER;
+    the clients run in the same process as the server.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :param clients: The number of concurrent clients.
+    :type clients: int
+    :param requests: The number of requests sent by each client.
+    :type requests: int
+    :return: The 50th and 99th percentile latencies in seconds and the requests per second.
+    :rtype: dict
+
+    Running Example:
+        result = benchServer(100000)
+    """
+    grade_system = buildRoster(size)
+
+    async def client(port, number, latencies):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for i in range(requests):
+            sID = "B{:09d}".format((number * requests + i) % size)
+            command = ['SCORE ' + sID, 'AVERAGE ' + sID, 'RANK ' + sID, 'FILTER 99.5'][i % 4]
+            start = time.perf_counter()
+            writer.write((command + '\n').encode('utf-8'))
+            status = await reader.readline()
+            if status.startswith(b'OK'):
+                for _ in range(int(status.split()[1])):
+                    await reader.readline()
+            latencies.append(time.perf_counter() - start)
+        writer.write(b'QUIT\n')
+        await reader.read()
+        writer.close()
+
+    async def main():
+        server = await GradeServer(grade_system).start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        latencies = []
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            start = time.perf_counter()
+            writer.write(b'WEIGHT lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2\n')
+            await asyncio.gather(*[client(port, number, latencies) for number in range(clients)])
+            seconds = time.perf_counter() - start
+            await reader.readline()
+            writer.write(b'QUIT\n')
+            await reader.read()
+            writer.close()
+        latencies.sort()
+        return {'size': size, 'p50': latencies[len(latencies) // 2],
+                'p99': latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)],
+                'requestsPerSecond': len(latencies) / seconds}
+
+    return asyncio.run(main())
+
+
+def benchSnapshot(size):
+    """
+    Measures saving and loading a binary snapshot, compared with loading the same roster as text.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :return: The measured durations in seconds.
+    :rtype: dict
+
+    Running Example:
+        result = benchSnapshot(100000)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'roster.txt')
+        writeRoster(path, size)
+        start = time.perf_counter()
+        grade_system = GradeSystem(path)
+        textSeconds = time.perf_counter() - start
+        snapshot = os.path.join(directory, 'roster.snap')
+        start = time.perf_counter()
+        saveSnapshot(grade_system, snapshot)
+        saveSeconds = time.perf_counter() - start
+        del grade_system
+        start = time.perf_counter()
+        loadSnapshot(snapshot)
+        loadSeconds = time.perf_counter() - start
+    return {'size': size, 'text': textSeconds, 'save': saveSeconds, 'load': loadSeconds}
+
+
+class DictStudent:
+    """
+    The Student layout before it was slotted (instance __dict__ and a list of scores), kept for comparison.
+    """
+    def __init__(self, sID, name, lab1, lab2, lab3, mid, final, weightList):
+        self.sID = sID
+        self.name = name
+        self.scores = [float(lab1), float(lab2), float(lab3), float(mid), float(final)]
+        self.averageScore = sum(score * weight for score, weight in zip(self.scores, weightList))
+        self.letterGrade = 'A'
+
+
+def benchMemory(size):
+    """
+    Measures the memory held per student by Student and by the previous dict-based layout.
+
+    :param size: The number of students to create.
+    :type size: int
+    :return: The traced bytes per student for each layout.
+    :rtype: dict
+
+    Running Example:
+        result = benchMemory(100000)
+    """
+    rows = [("B{:09d}".format(i), "Bench", str(60 + i % 40), str(55 + i % 45), str(70 + i % 30),
+             str(50 + i % 50), str(65 + i % 35)) for i in range(size)]
+    weightList = [0.1, 0.1, 0.1, 0.3, 0.4]
+    result = {'size': size}
+    for label, cls in (('Student', Student), ('DictStudent', DictStudent)):
+        tracemalloc.start()
+        students = [cls(*row, weightList) for row in rows]
+        result[label] = tracemalloc.get_traced_memory()[0] / size
+        tracemalloc.stop()
+        del students
+    return result
+
+
+def benchOperations(size, seed=0, operations=10000):
+    """
+    Measures the main GradeSystem operations on a synthetic roster of the given size.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :param seed: The seed of the roster generator and of the operations.
+    :type seed: int
+    :param operations: The number of updateScore and showRank calls measured.
+    :type operations: int
+    :return: The addStudent, updateScore and showRank rates in operations per second ('addStudentPerSecond', ...),
+             and the updateWeight and showFilter (top 10% of the roster) durations in seconds.
+    :rtype: dict
+
+    Running Example:
+        result = benchOperations(100000)
+    """
+    lines = list(generateRoster(size, seed))
+    rng = random.Random(seed + 1)
+    updates = ["B{:09d} {} {}".format(rng.randrange(size), rng.choice(['lab1', 'lab2', 'lab3', 'midterm', 'final']),
+                                      rng.randint(0, 100)) for _ in range(operations)]
+    ranked = ["B{:09d}".format(i) for i in rng.sample(range(size), min(size, operations))]
+    grade_system = GradeSystem(None)
+    result = {'size': size}
+    with silenced():
+        start = time.perf_counter()
+        for line in lines:
+            grade_system.addStudent(line)
+        result['addStudentPerSecond'] = size / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for update in updates:
+            grade_system.updateScore(update)
+        result['updateScorePerSecond'] = len(updates) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        grade_system.updateWeight('lab1 0.05 lab2 0.05 lab3 0.1 midterm 0.3 final 0.5')
+        result['updateWeight'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for sID in ranked:
+            grade_system.showRank(sID)
+        result['showRankPerSecond'] = len(ranked) / (time.perf_counter() - start)
+
+        threshold = grade_system.percentile(90)
+        start = time.perf_counter()
+        grade_system.showFilter(threshold)
+        result['showFilter'] = time.perf_counter() - start
+    return result
+
+
+def benchAddAndShow(size):
+    """
+    Measures addStudent and showScore throughput on a roster of the given size.
+
+    :param size: The number of students to add.
+    :type size: int
+    :return: The addStudent and showScore rates in operations per second.
+    :rtype: dict
+
+    Running Example:
+        result = benchAddAndShow(10000)
+    """
+    infos = ["B{:09d} Bench {} {} {} {} {}".format(i, 60 + i % 40, 55 + i % 45, 70 + i % 30, 50 + i % 50, 65 + i % 35)
+             for i in range(size)]
+    grade_system = GradeSystem(None)
+    with silenced():
+        start = time.perf_counter()
+        for info in infos:
+            grade_system.addStudent(info)
+        addSeconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(size):
+            grade_system.showScore("B{:09d}".format(i))
+        showSeconds = time.perf_counter() - start
+    return {'size': size,
+            'addStudentPerSecond': size / addSeconds,
+            'showScorePerSecond': size / showSeconds}
+
+
+def benchSimulateWeights(size, candidates=200):
+    """
+    Measures simulateWeights on many candidate weights, compared with copying the roster and calling updateWeight.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :param candidates: The number of candidate weights.
+    :type candidates: int
+    :return: The seconds per candidate for each approach.
+    :rtype: dict
+
+    Running Example:
+        result = benchSimulateWeights(100000)
+    """
+    grade_system = buildRoster(size)
+    weightLists = [[0.1, 0.1, 0.1, 0.3 - i * 0.001 / candidates, 0.4] for i in range(candidates)]
+    sIDs = ["B{:09d}".format(i) for i in range(0, size, max(1, size // 100))]
+    start = time.perf_counter()
+    grade_system.simulateWeights(weightLists, sIDs)
+    simulateSeconds = time.perf_counter() - start
+    trials = min(candidates, 5)
+    start = time.perf_counter()
+    with silenced():
+        for weightList in weightLists[:trials]:
+            grade_system.clone().updateWeight(
+                ' '.join(f"{name} {weight}" for name, weight in zip(('lab1', 'lab2', 'lab3', 'midterm', 'final'), weightList)))
+    copySeconds = time.perf_counter() - start
+    return {'size': size, 'simulate': simulateSeconds / candidates, 'copy': copySeconds / trials}
+
+
+def benchSQLite(size, seed=0, queries=1000):
+    """
+    Measures the SQLite storage backend against the in-memory GradeSystem on the same roster file.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :param seed: The seed of the roster generator and of the queried students.
+    :type seed: int
+    :param queries: The number of getRank calls measured.
+    :type queries: int
+    :return: For 'memory' and 'sqlite': the load, updateWeight and showFilter (top 10%) durations in seconds,
+             and the getRank and updateScore rates in operations per second ('getRankPerSecond', ...).
+    :rtype: dict
+
+    Running Example:
+        result = benchSQLite(100000)
+    """
+    rng = random.Random(seed)
+    ranked = ["B{:09d}".format(rng.randrange(size)) for _ in range(queries)]
+    updates = ["B{:09d} final {}".format(rng.randrange(size), rng.randint(0, 100)) for _ in range(queries)]
+    result = {'size': size}
+    with tempfile.TemporaryDirectory() as directory, silenced():
+        path = os.path.join(directory, 'roster.txt')
+        writeRoster(path, size, seed)
+        for label, create in (('memory', lambda: GradeSystem(path)),
+                              ('sqlite', lambda: SQLiteGradeSystem(path, os.path.join(directory, 'roster.db')))):
+            measured = {}
+            start = time.perf_counter()
+            grade_system = create()
+            measured['load'] = time.perf_counter() - start
+            start = time.perf_counter()
+            for sID in ranked:
+                grade_system.getRank(sID)
+            measured['getRankPerSecond'] = queries / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for update in updates:
+                grade_system.updateScore(update)
+            measured['updateScorePerSecond'] = queries / (time.perf_counter() - start)
+            start = time.perf_counter()
+            grade_system.updateWeight('lab1 0.05 lab2 0.05 lab3 0.1 midterm 0.3 final 0.5')
+            measured['updateWeight'] = time.perf_counter() - start
+            threshold = sorted(student.averageScore for student in grade_system.topK(max(1, size // 10)))[0]
+            start = time.perf_counter()
+            grade_system.showFilter(threshold)
+            measured['showFilter'] = time.perf_counter() - start
+            result[label] = measured
+            if label == 'sqlite':
+                grade_system.close()
+    return result
+
+
+def benchExport(size, seed=0):
+    """
+    Measures exporting a roster with its computed grades and importing it back, as CSV and in the columnar format.
+
+    :param size: The number of students in the roster.
+    :type size: int
+    :param seed: The seed of the roster generator.
+    :type seed: int
+    :return: For 'csv' and 'columnar': the export and import durations in seconds and the file size in bytes.
+    :rtype: dict
+
+    Running Example:
+        result = benchExport(100000)
+    """
+    formats = (('csv', exportCSV, importCSV), ('columnar', exportColumnar, importColumnar))
+    grade_system = buildRoster(size, seed)
+    result = {'size': size}
+    with tempfile.TemporaryDirectory() as directory:
+        for label, export, _ in formats:
+            path = os.path.join(directory, 'roster.' + label)
+            start = time.perf_counter()
+            export(grade_system, path)
+            result[label] = {'export': time.perf_counter() - start, 'bytes': os.path.getsize(path)}
+        # Only the imported roster is held while importing, as in a fresh process
+        del grade_system
+        for label, _, load in formats:
+            start = time.perf_counter()
+            load(os.path.join(directory, 'roster.' + label))
+            result[label]['import'] = time.perf_counter() - start
+    return result
+
+
+# Each benchmark: the function called with the size and the parsed arguments, and the summary line of its result
+BENCHMARKS = {
+    'load': (lambda size, args: benchLoad(size),
+             lambda r: f"load {r['seconds'] * 1000:.1f} ms ({r['rowsPerSecond']:,.0f} rows/s)"),
+    'parse': (lambda size, args: benchParse(size),
+              lambda r: f"load {r['load'] * 1000:.1f} ms (parseRoster {r['parseRoster'] * 1000:.1f} ms)  "
+                        f"line by line {r['lineByLine'] * 1000:.1f} ms  recalculate {r['average'] * 1000:.1f} ms  "
+                        f"converting again {r['convertingAverage'] * 1000:.1f} ms"),
+    'staging': (lambda size, args: benchStaging(size, args.seed),
+                lambda r: "  ".join(f"{label} updateScore {m['updateScore']:.2f} us, stageWeights {m['stageWeights']:.2f} us;"
+                                    for label, m in r.items() if label != 'size')),
+    'threads': (lambda size, args: benchThreads(size, seed=args.seed),
+                lambda r: f"1 thread plain {r['plainPerSecond']:,.0f} queries/s, "
+                          f"locked {r['lockedPerSecond']:,.0f} queries/s;  " +
+                          "  ".join(f"{threads} threads {m['queriesPerSecond']:,.0f} queries/s "
+                                    f"({m['updatesPerSecond']:,.0f} updates/s)"
+                                    for threads, m in r.items() if isinstance(threads, int))),
+    'operations': (lambda size, args: benchOperations(size, args.seed),
+                   lambda r: f"addStudent {r['addStudentPerSecond']:,.0f}/s  updateScore {r['updateScorePerSecond']:,.0f}/s  "
+                             f"updateWeight {r['updateWeight'] * 1000:.1f} ms  showRank {r['showRankPerSecond']:,.0f}/s  "
+                             f"showFilter {r['showFilter'] * 1000:.1f} ms"),
+    'parallelLoad': (lambda size, args: benchParallelLoad(size, args.workers),
+                     lambda r: "parallel load " + "  ".join(f"{workers} workers {seconds * 1000:.1f} ms"
+                                                            for workers, seconds in r.items() if workers != 'size')),
+    'server': (lambda size, args: benchServer(size),
+               lambda r: f"server p50 {r['p50'] * 1000:.2f} ms  p99 {r['p99'] * 1000:.2f} ms  "
+                         f"({r['requestsPerSecond']:,.0f} requests/s)"),
+    'snapshot': (lambda size, args: benchSnapshot(size),
+                 lambda r: f"snapshot save {r['save'] * 1000:.1f} ms  load {r['load'] * 1000:.1f} ms  "
+                           f"(text load {r['text'] * 1000:.1f} ms)"),
+    'memory': (lambda size, args: benchMemory(size),
+               lambda r: f"memory Student {r['Student']:.0f} B/student  dict layout {r['DictStudent']:.0f} B/student"),
+    'addAndShow': (lambda size, args: benchAddAndShow(size),
+                   lambda r: f"addStudent {r['addStudentPerSecond']:,.0f}/s  showScore {r['showScorePerSecond']:,.0f}/s"),
+    'updateWeight': (lambda size, args: benchUpdateWeight(size),
+                     lambda r: "updateWeight columnar " +
+                               ('n/a' if r['columnar'] is None else f"{r['columnar'] * 1000:.1f} ms") +
+                               f"  loop {r['loop'] * 1000:.1f} ms"),
+    'sqlite': (lambda size, args: benchSQLite(size, args.seed),
+               lambda r: "  ".join(f"{label} load {m['load'] * 1000:.1f} ms, getRank {m['getRankPerSecond']:,.0f}/s, "
+                                   f"updateScore {m['updateScorePerSecond']:,.0f}/s, updateWeight {m['updateWeight'] * 1000:.1f} ms, "
+                                   f"showFilter {m['showFilter'] * 1000:.1f} ms;"
+                                   for label, m in r.items() if label != 'size')),
+    'export': (lambda size, args: benchExport(size, args.seed),
+               lambda r: "  ".join(f"{label} export {m['export'] * 1000:.1f} ms, import {m['import'] * 1000:.1f} ms, "
+                                   f"{m['bytes'] / 1e6:.1f} MB;" for label, m in r.items() if label != 'size')),
+    # The pure Python fallback grades one candidate at a time, so fewer candidates are measured without numpy
+    'simulateWeights': (lambda size, args: benchSimulateWeights(size, 200 if np is not None else 10),
+                        lambda r: f"simulateWeights {r['simulate'] * 1000:.2f} ms/candidate  "
+                                  f"copy and updateWeight {r['copy'] * 1000:.1f} ms/candidate"),
+}
+
+
+def environment():
+    """
+    Describes the code and machine the benchmarks ran on, stored with the JSON results.
+
+    :return: The git commit, Python and numpy versions, platform and CPU count.
+    :rtype: dict
+
+    Running Example:
+        info = environment()
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(),
+            'numpy': np.__version__ if np is not None else None,
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def _metrics(result, prefix=''):
+    # Yields (name, value) for every measurement of a result, nested results with dotted names
+    for key, value in result.items():
+        if key == 'size':
+            continue
+        if isinstance(value, dict):
+            yield from _metrics(value, f"{prefix}{key}.")
+        else:
+            yield prefix + str(key), value
+
+
+def compareResults(baseline, results, tolerance=0.8):
+    """
+    Prints the ratio of every measurement to the same measurement in a baseline run.
+
+    Metrics whose name ends with 'PerSecond' are rates, better when higher; every other metric is a cost
+    (seconds, microseconds or bytes), better when lower. A ratio above 1 is always an improvement. Nested results
+    are compared metric by metric, named with dots like 'sqlite.memory.load'. A measurement missing from the
+    baseline is reported instead of being skipped silently.
+
+    :param baseline: The results of an earlier run, as written to the JSON file.
+    :type baseline: list
+    :param results: The results of this run.
+    :type results: list
+    :param tolerance: The ratio below which a measurement is flagged as a regression.
+    :type tolerance: float
+
+    Running Example:
+        compareResults(json.load(open('before.json'))['results'], results)
+    """
+    earlier = {(entry['benchmark'], entry['size']): dict(_metrics(entry['result'])) for entry in baseline}
+    for entry in results:
+        before = earlier.get((entry['benchmark'], entry['size']))
+        if before is None:
+            print(f"{entry['size']:>8} students: {entry['benchmark']} not in the baseline")
+            continue
+        for metric, value in _metrics(entry['result']):
+            old = before.get(metric)
+            label = f"{entry['size']:>8} students: {entry['benchmark']}.{metric}"
+            if value is None and old is None:
+                continue
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not value or not old:
+                print(f"{label} not comparable ({old!r} before, {value!r} now)")
+                continue
+            ratio = value / old if metric.endswith('PerSecond') else old / value
+            print(f"{label} {ratio:.2f}x" + ("" if ratio >= tolerance else "  REGRESSION"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GradeSystem benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="compare the results with an earlier JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.8, help="flag ratios below this as regressions")
+    args = parser.parse_args()
+    results = []
+    for size in args.sizes:
+        for name in args.benchmarks:
+            run, summary = BENCHMARKS[name]
+            result = run(size, args)
+            print(f"{size:>8} students: {summary(result)}")
+            results.append({'benchmark': name, 'size': size, 'result': result})
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump({'environment': environment(), 'seed': args.seed, 'results': results}, fh, indent=2)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as fh:
+            # Round trip through JSON so the keys compare the same way as in the baseline
+            compareResults(json.load(fh)['results'], json.loads(json.dumps(results)), args.tolerance)
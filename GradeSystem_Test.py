@@ -1,5 +1,5 @@
 import pytest
-from GradeSystem import GradeSystem
+from GradeSystem import GradeSystem, GradingScale, ReadWriteLock, Student, parseRoster
 
 @pytest.fixture
 def grade_system():
@@ -321,3 +321,603 @@ def test_scenario_two(grade_system,capsys):
     grade_system.updateWeight("lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.9")
     assert grade_system.weightList == [0.1, 0.1, 0.1, 0.3, 0.4]
 
+def test_student_index(grade_system):
+    """
+    Test Function: GradeSystem.studentIndex
+    Test Description:
+        -Step 1: Comparing grade_system.studentIndex with grade_system.studentList
+            Expected result : every student is indexed by his/her sID
+        -Step 2: Add valid student and update his/her score
+            Expected result : the index points to the same Student object which holds the new scores
+    """
+    assert len(grade_system.studentIndex) == len(grade_system.studentList)
+    for student in grade_system.studentList:
+        assert grade_system.studentIndex[student.sID] is student
+    grade_system.addStudent("110006213 Bill 90 85 95 88 92")
+    grade_system.updateScore("110006213 final 60")
+    assert grade_system.studentIndex["110006213"] is grade_system.studentList[-1]
+    assert grade_system.studentIndex["110006213"].scores == [90, 85, 95, 88, 60]
+
+def test_rank_index(grade_system):
+    """
+    Test Function: GradeSystem.rankIndex
+    Test Description:
+        -Step 1: Add valid students and update scores/weights
+        -Step 2: Comparing every rank in grade_system.rankIndex with a full stable sort of grade_system.studentList
+            Expected result : ranks match after each change
+    """
+    def expected_ranks():
+        sorted_students = sorted(grade_system.studentList, key=lambda x: x.averageScore, reverse=True)
+        return {student.sID: i for i, student in enumerate(sorted_students, start=1)}
+
+    grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+    grade_system.addStudent("110006214 Anna 60 60 60 60 60")
+    grade_system.updateScore("110006214 lab1 100 lab2 100 lab3 100 midterm 95 final 95")
+    grade_system.updateScore("985002509 final 10")
+    for sID, rank in expected_ranks().items():
+        assert grade_system.rankIndex.rank(grade_system.studentIndex[sID]) == rank
+    grade_system.updateWeight("lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8")
+    for sID, rank in expected_ranks().items():
+        assert grade_system.rankIndex.rank(grade_system.studentIndex[sID]) == rank
+
+def test_non_finite_scores(grade_system, capsys):
+    """
+    Test Function: GradeSystem.addStudent(info), GradeSystem.updateScore(info), parseRoster(lines, weightList), RankIndex.update(student, oldAverage)
+    Test Description:
+        -Step 1: Add students with nan and inf scores, update scores and weights to nan
+            Expected result : nothing is changed
+        -Step 2: Update the scores of several students
+            Expected result : every student is indexed once with his/her rank
+        -Step 3: Parse roster lines with nan and -inf scores
+            Expected result : both lines are reported, the valid line is parsed
+        -Step 4: Update the rank index with a wrong old average
+            Expected result : LookupError is raised and the index is unchanged
+    """
+    grade_system = GradeSystem(None)
+    for i in range(6):
+        grade_system.addStudent(f"{i} S{i} {50 + i} 60 70 80 90")
+    assert not grade_system.addStudent("x X nan 1 1 1 1")
+    assert not grade_system.addStudent("y Y inf 1 1 1 1")
+    assert not grade_system.updateScore("2 lab1 nan")
+    assert not grade_system.updateWeight("lab1 nan")
+    assert grade_system.getScore('2') == [52, 60, 70, 80, 90]
+    for sID in ('2', '3', '0', '5'):
+        assert grade_system.updateScore(f"{sID} lab1 {int(sID) * 3}")
+    assert sorted(student.sID for student in grade_system.rankIndex) == [str(i) for i in range(6)]
+    sorted_students = sorted(grade_system.studentList, key=lambda x: x.averageScore, reverse=True)
+    for rank, student in enumerate(sorted_students, start=1):
+        assert grade_system.getRank(student.sID) == rank
+
+    parsed = parseRoster(["1 A 90 85 95 88 92", "2 B nan 1 1 1 1", "3 C 1 1 1 1 -inf"], [0.1, 0.1, 0.1, 0.3, 0.4])
+    assert parsed['ids'] == ['1']
+    assert [line for line, _ in parsed['errors']] == [2, 3]
+
+    with pytest.raises(LookupError):
+        grade_system.rankIndex.update(grade_system.studentIndex['1'], 12.0)
+    assert len(list(grade_system.rankIndex)) == 6
+
+def test_columnar_recalculation(grade_system):
+    """
+    Test Function: GradeSystem.recalculateColumnar()
+    Test Description:
+        -Step 1: Add valid students on the grade boundaries and update grade_system's weight
+        -Step 2: Comparing every averageScore and letterGrade with Student.average and Student.countLetterGrade
+            Expected result : the columnar results are identical to the per-student results
+        -Step 3: Checking grade_system.gradeDistribution against a full recount
+            Expected result : Distribution matches
+    """
+    if grade_system.scoreMatrix is None:
+        pytest.skip("numpy is not installed")
+    grade_system.addStudent("110006213 Bill 10 10 10 10 90")
+    grade_system.addStudent("110006214 Anna 100 100 100 100 100")
+    grade_system.addStudent("110006215 Cody 120 120 120 120 120")
+    grade_system.updateWeight("lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8")
+    for student in grade_system.studentList:
+        assert student.averageScore == student.average(grade_system.weightList)
+        assert student.letterGrade == student.countLetterGrade()
+    assert grade_system.checkDistribution()
+
+def test_load(tmp_path, capsys):
+    """
+    Test Function: GradeSystem.load(path)
+    Test Description:
+        -Step 1: Writing a roster file with a missing score, an invalid score, a blank line and a repeated student
+        -Step 2: Creating a GradeSystem from the roster file
+            Expected result : the valid students are loaded, the bad lines are reported with their line numbers
+        -Step 3: Creating a GradeSystem from a missing file
+            Expected result : no students are loaded
+    """
+    roster = tmp_path / "roster.txt"
+    roster.write_text("110006213 Bill 90 85 95 88 92\n"
+                      "110006214 Anna 90 85 95 88\n"
+                      "\n"
+                      "110006215 Cody 90 85 95 88 b1\n"
+                      "110006213 Bill 90 85 95 88 92\n"
+                      "110006216 Dana 60 60 60 60 60\n", encoding='utf-8')
+    grade_system = GradeSystem(str(roster))
+    assert [student.sID for student in grade_system.studentList] == ["110006213", "110006216"]
+    assert [line for line, _ in grade_system.loadStats['errors']] == [2, 4, 5]
+    assert grade_system.loadStats['rows'] == 2
+    assert "line 4" in capsys.readouterr().out
+    assert len(GradeSystem(str(tmp_path / "missing.txt")).studentList) == 0
+
+def test_student_layout(grade_system):
+    """
+    Test Function: Student.scores
+    Test Description:
+        -Step 1: Add valid student to GradeSystem
+            Expected result : the student has no instance __dict__
+        -Step 2: Changing the list returned by student.scores
+            Expected result : the student's scores are not changed
+        -Step 3: Assigning a new list to student.scores
+            Expected result : the student's scores are replaced
+    """
+    grade_system.addStudent("110006213 Bill 90 85 95 88 92")
+    student = grade_system.studentIndex["110006213"]
+    assert not hasattr(student, '__dict__')
+    student.scores[0] = 0
+    assert student.scores == [90, 85, 95, 88, 92]
+    student.scores = [0, 0, 0, 50, 50]
+    assert student.scores == [0, 0, 0, 50, 50]
+
+def test_check_distribution(grade_system):
+    """
+    Test Function: GradeSystem.checkDistribution()
+    Test Description:
+        -Step 1: Add valid student and update his/her scores across several letter grades
+            Expected result : the incremental distribution matches a full recount after each update
+        -Step 2: Changing a letter grade without updating the distribution
+            Expected result : the mismatch is detected
+    """
+    grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+    for info in ["110006213 final 10", "110006213 midterm 10", "110006213 lab1 70 final 90", "985002509 final 0"]:
+        grade_system.updateScore(info)
+        assert grade_system.checkDistribution()
+    assert grade_system.studentIndex["110006213"].letterGrade == 'C'
+    grade_system.studentIndex["110006213"].letterGrade = 'E'
+    assert not grade_system.checkDistribution()
+
+def test_update_scores(grade_system, tmp_path):
+    """
+    Test Function: GradeSystem.updateScores(updates)
+    Test Description:
+        -Step 1: Add valid students to GradeSystem
+        -Step 2: Updating a batch with one line in wrong format
+            Expected result : no student's scores are updated
+        -Step 3: Updating a valid batch, with two lines for the same student
+            Expected result : all scores are updated, the distribution and ranks are consistent
+        -Step 4: Updating a valid batch from a file
+            Expected result : all scores are updated
+        -Step 5: Updating an empty batch and a batch of blank lines
+            Expected result : nothing is updated and the roster version is unchanged
+    """
+    grade_system.addStudent("110006213 Bill 90 85 95 88 92")
+    grade_system.addStudent("110006214 Anna 60 60 60 60 60")
+    assert grade_system.updateScores(["110006213 lab1 10", "110006214 lab5 10"]) == 0
+    assert grade_system.studentIndex["110006213"].scores == [90, 85, 95, 88, 92]
+
+    assert grade_system.updateScores(["110006213 lab1 10 final 20", "110006214 midterm 100", "110006213 lab2 30"]) == 2
+    assert grade_system.studentIndex["110006213"].scores == [10, 30, 95, 88, 20]
+    assert grade_system.studentIndex["110006214"].scores == [60, 60, 60, 100, 60]
+    assert grade_system.checkDistribution()
+    sorted_students = sorted(grade_system.studentList, key=lambda x: x.averageScore, reverse=True)
+    for i, student in enumerate(sorted_students, start=1):
+        assert grade_system.rankIndex.rank(student) == i
+
+    updates = tmp_path / "updates.txt"
+    updates.write_text("110006213 final 90\n\n110006214 final 90\n", encoding='utf-8')
+    assert grade_system.updateScores(str(updates)) == 2
+    assert grade_system.studentIndex["110006213"].scores[4] == 90
+    assert grade_system.studentIndex["110006214"].scores[4] == 90
+
+    version = grade_system.version
+    assert grade_system.updateScores([]) == 0
+    assert grade_system.updateScores(["", "   "]) == 0
+    assert grade_system.version == version
+
+def test_get_queries(grade_system):
+    """
+    Test Function: GradeSystem.getScore(sID), getLetterGrade(sID), getAverage(sID), getRank(sID),
+                   getGradeDistribution(), getFilter(Thres)
+    Test Description:
+        -Step 1: Adding student "110006213"
+        -Step 2: Getting the scores, letterGrade, averageScore and ranking of student "110006213"
+            Expected result : the values match
+        -Step 3: Getting the values for student "110006221"
+            Expected result : None is returned
+        -Step 4: Getting the distribution and the students above 93
+            Expected result : the values match the default data and the added student
+    """
+    grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+    assert grade_system.getScore("110006213") == [99, 95, 95, 98, 92]
+    assert grade_system.getLetterGrade("110006213") == 'A+'
+    assert grade_system.getAverage("110006213") == 95.1
+    assert grade_system.getRank("110006213") == 2
+    for getter in (grade_system.getScore, grade_system.getLetterGrade, grade_system.getAverage, grade_system.getRank):
+        assert getter("110006221") is None
+    distribution = grade_system.getGradeDistribution()
+    assert distribution['A+'] == 28 and distribution['A'] == 33
+    filtered = [(rank, student.sID) for rank, student in grade_system.getFilter(93)]
+    assert filtered[:3] == [(1, "985002509"), (2, "110006213"), (3, "985002515")]
+    assert len(filtered) == 9
+
+def test_query_cache(grade_system):
+    """
+    Test Function: GradeSystem.getRank(sID), GradeSystem.getFilter(Thres), GradeSystem.cacheStats()
+    Test Description:
+        -Step 1: Getting the ranking of student "985002509" twice
+            Expected result : the second query is a cache hit
+        -Step 2: Adding student "110006213" and getting the ranking of student "985002509" again
+            Expected result : the version increased, the query is a miss and the rank is updated
+        -Step 3: Getting the students above 93 twice, then updating the score of student "110006213"
+            Expected result : the second filter is a hit, and the filter after the update sees the new score
+    """
+    assert grade_system.getRank("985002509") == 1
+    assert grade_system.getRank("985002509") == 1
+    stats = grade_system.cacheStats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    version = grade_system.version
+    grade_system.addStudent("110006213 Bill 100 100 100 100 100")
+    assert grade_system.version == version + 1
+    assert grade_system.getRank("985002509") == 2
+    assert grade_system.cacheStats()['misses'] == 2
+    assert len(list(grade_system.getFilter(93))) == 9
+    assert len(list(grade_system.getFilter(93))) == 9
+    assert grade_system.cacheStats()['hits'] == 2
+    grade_system.updateScore("110006213 final 0")
+    assert grade_system.version == version + 2
+    assert len(list(grade_system.getFilter(93))) == 8
+
+def test_top_k_percentile_histogram(grade_system):
+    """
+    Test Function: GradeSystem.topK(k), GradeSystem.percentile(p), GradeSystem.histogram(bins, scoreRange)
+    Test Description:
+        -Step 1: Getting the top 3 students
+            Expected result : the first three students of the ranking
+        -Step 2: Getting the 0th, 50th and 100th percentiles
+            Expected result : the lowest average, the median and the highest average
+        -Step 3: Counting the averages in bins
+            Expected result : the counts add up to the number of students and match the letter grade bands
+        -Step 4: Changing the results returned, then asking again
+            Expected result : the cached answers are unchanged
+    """
+    top = grade_system.topK(3)
+    assert [student.sID for student in top] == ["985002509", "985002515", "975002070"]
+    assert [grade_system.getRank(student.sID) for student in top] == [1, 2, 3]
+    assert grade_system.topK(0) == []
+    assert len(grade_system.topK(1000)) == 63
+    averages = sorted(student.averageScore for student in grade_system.studentList)
+    assert grade_system.percentile(0) == averages[0]
+    assert grade_system.percentile(100) == averages[-1]
+    assert grade_system.percentile(50) == averages[31]
+    assert averages[15] <= grade_system.percentile(25) <= averages[16]
+    counts, edges = grade_system.histogram(4)
+    assert sum(counts) == 63 and edges[0] == averages[0] and edges[-1] == averages[-1]
+    counts, edges = grade_system.histogram([85, 90, 101])
+    assert counts == [grade_system.gradeDistribution['A'], grade_system.gradeDistribution['A+']]
+    assert GradeSystem(None).percentile(50) is None
+    grade_system.topK(5).clear()
+    assert len(grade_system.topK(5)) == 5
+    counts, edges = grade_system.histogram(4)
+    expected = (list(counts), list(edges))
+    counts[0] = 999
+    edges.append(1000)
+    assert grade_system.histogram(4) == expected
+
+def test_simulate_weights(grade_system):
+    """
+    Test Function: GradeSystem.simulateWeights(candidates, sIDs)
+    Test Description:
+        -Step 1: Simulating two candidate weights for students "985002509" and "985002515"
+            Expected result : the distribution and rank changes match updateWeight on a copy,
+                              and the roster is unchanged
+        -Step 2: Simulating invalid candidates, including a zero weight given as a string and as a list
+            Expected result : an empty list is returned
+        -Step 3: Simulating random weights one student at a time on a roster of random scores with many ties
+            Expected result : the distribution and ranks match updateWeight on a copy exactly
+    """
+    candidates = ['lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2', [0.05, 0.05, 0.1, 0.3, 0.5]]
+    sIDs = ["985002509", "985002515"]
+    distribution = grade_system.getGradeDistribution()
+    version = grade_system.version
+    results = grade_system.simulateWeights(candidates, sIDs)
+    assert grade_system.getGradeDistribution() == distribution and grade_system.version == version
+    assert grade_system.weightList == [0.1, 0.1, 0.1, 0.3, 0.4]
+    for info, result in zip(['lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2',
+                             'lab1 0.05 lab2 0.05 lab3 0.1 midterm 0.3 final 0.5'], results):
+        trial = grade_system.clone()
+        trial.updateWeight(info)
+        assert result['distribution'] == trial.getGradeDistribution()
+        assert result['rankChanges'] == {sID: grade_system.getRank(sID) - trial.getRank(sID) for sID in sIDs}
+    assert grade_system.simulateWeights(['lab1 0.9 final 0.9']) == []
+    assert grade_system.simulateWeights(['lab1 0 lab2 0 lab3 0 midterm 0.5 final 0.5']) == []
+    assert grade_system.simulateWeights([[0, 0, 0, 0.5, 0.5]]) == []
+    assert grade_system.simulateWeights([[0.1, 0.1, 0.1, 0.3, float('nan')]]) == []
+
+    import random
+    rng = random.Random(0)
+    roster = GradeSystem(None)
+    for i in range(300):
+        roster.addStudent(f"{i} S{i} " + ' '.join(str(rng.randint(40, 100)) for _ in range(5)))
+    # Weights like these make many averages tie, so a different rounding changes the ranks
+    weightLists = [[0.1, 0.1, 0.1, 0.3, 0.4], [0.2, 0.2, 0.2, 0.2, 0.2], [0.05, 0.05, 0.1, 0.3, 0.5]]
+    rows = list(range(0, 300, 7))
+    for weightList, (counts, ranks) in zip(weightLists, roster._simulateLoop(weightLists, rows)):
+        trial = roster.clone()
+        trial._applyWeights(weightList)
+        assert counts == [trial.gradeDistribution[letter] for letter in trial.gradingScale.letters]
+        assert ranks == [trial.getRank(str(row)) for row in rows]
+
+def test_grading_scale(grade_system):
+    """
+    Test Function: GradingScale.letter(average), GradingScale.parse(text), GradeSystem.updateGradingScale(scale)
+    Test Description:
+        -Step 1: Converting averages on and around the default cut-offs
+            Expected result : the letters of the default scale, with averages above 100 getting 'E'
+        -Step 2: Switching grade_system to a scale with five letters
+            Expected result : every student is regraded and the distribution only has the new letters
+        -Step 3: Switching to an invalid scale
+            Expected result : the scale is unchanged
+    """
+    scale = GradingScale()
+    assert [scale.letter(average) for average in (100.5, 100, 90, 89.99, 85, 80, 77, 73, 70, 67, 63, 60, 50, 49.99, -1)] == \
+           ['E', 'A+', 'A+', 'A', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D', 'E', 'E']
+    assert GradingScale.parse(str(scale)) == scale
+    assert grade_system.updateGradingScale("F 60 D 70 C 80 B 90 A")
+    assert list(grade_system.gradeDistribution) == ['A', 'B', 'C', 'D', 'F']
+    assert grade_system.gradeDistribution['A'] == 27
+    for student in grade_system.studentList:
+        assert student.letterGrade == student.countLetterGrade(grade_system.gradingScale)
+    assert grade_system.checkDistribution()
+    grade_system.addStudent("110006213 Bill 75 75 75 75 75")
+    assert grade_system.getLetterGrade("110006213") == 'C'
+    grade_system.updateWeight("lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2")
+    assert grade_system.checkDistribution()
+    assert not grade_system.updateGradingScale("F 70 D 60 C")
+    assert str(grade_system.gradingScale) == "F 60 D 70 C 80 B 90 A 100"
+    assert Student('1', 'Ann', '95', '95', '95', '95', '95', [0.1, 0.1, 0.1, 0.3, 0.4],
+                   GradingScale([50], ['Fail', 'Pass'])).letterGrade == 'Pass'
+
+def test_instrumentation(monkeypatch, capsys):
+    """
+    Test Function: GradeSystem(instrument), GradeSystem.stats(), GradeSystem.profile(operation, *args)
+    Test Description:
+        -Step 1: Creating an instrumented GradeSystem and updating its weights
+            Expected result : the load, the weight update and its phases are recorded
+        -Step 2: Creating a GradeSystem with and without the environment variable set
+            Expected result : only the one created with the variable is instrumented, the other has no wrapped method
+        -Step 3: Profiling a weight update
+            Expected result : the profile is shown and the weights are updated
+    """
+    grade_system = GradeSystem(instrument=True)
+    grade_system.updateWeight("lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2")
+    stats = grade_system.stats()
+    assert stats['load']['calls'] == 1 and stats['updateWeight']['calls'] == 1
+    assert 'RankIndex.rebuild' in stats
+    assert 0 < stats['updateWeight']['maxNs'] <= stats['updateWeight']['totalNs']
+    monkeypatch.setenv('GRADESYSTEM_INSTRUMENT', '1')
+    assert GradeSystem().stats()['load']['calls'] == 1
+    monkeypatch.setenv('GRADESYSTEM_INSTRUMENT', '0')
+    plain = GradeSystem()
+    assert plain.instrumentation is None and plain.stats() == {}
+    assert 'updateWeight' not in vars(plain) and 'rebuild' not in vars(plain.rankIndex)
+    capsys.readouterr()
+    assert plain.profile('updateWeight', "lab1 0.1 lab2 0.1 lab3 0.1 midterm 0.3 final 0.4")
+    assert 'function calls' in capsys.readouterr().out
+
+def test_lazy_weights():
+    """
+    Test Function: GradeSystem(lazy=True), GradeSystem.updateWeight(info), GradeSystem.settle()
+    Test Description:
+        -Step 1: Updating the weights of a lazy GradeSystem several times
+            Expected result : no student is regraded, but getAverage and getLetterGrade already use the new weights
+        -Step 2: Adding a student, updating a score and getting the ranking
+            Expected result : the roster is regraded once, and every result matches an eager GradeSystem
+    """
+    lazy = GradeSystem(lazy=True)
+    eager = GradeSystem()
+    student = lazy.studentIndex["985002509"]
+    average = student.averageScore
+    for info in ("lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2", "final 0.1",
+                 "lab1 0.05 lab2 0.05 lab3 0.05 midterm 0.05 final 0.8"):
+        assert lazy.updateWeight(info) and eager.updateWeight(info)
+    assert lazy.stale and student.averageScore == average
+    assert lazy.getAverage("985002509") == eager.getAverage("985002509")
+    assert lazy.getLetterGrade("985002509") == eager.getLetterGrade("985002509")
+    for grade_system in (lazy, eager):
+        grade_system.addStudent("110006213 Bill 99 95 95 98 92")
+        grade_system.updateScore("985002509 final 10")
+    assert lazy.getAverage("985002509") == eager.getAverage("985002509")
+    assert lazy.getRank("110006213") == eager.getRank("110006213")
+    assert not lazy.stale
+    assert lazy.getGradeDistribution() == eager.getGradeDistribution()
+    for mine, theirs in zip(lazy.rankIndex, eager.rankIndex):
+        assert (mine.sID, mine.averageScore, mine.letterGrade) == (theirs.sID, theirs.averageScore, theirs.letterGrade)
+    assert lazy.checkDistribution()
+
+
+def test_parse_roster():
+    """
+    Test Function: parseRoster(lines, weightList, gradingScale, firstLine)
+    Test Description:
+        -Step 1: Parsing the lines of input.txt, with a blank line, in one block
+            Expected result : every student has the scores, average and letter grade a Student made from the line has,
+                              and the line numbers skip the blank line
+        -Step 2: Parsing a block with a missing score and an invalid score, starting at line 10
+            Expected result : both bad lines are reported with their line numbers, the other lines are parsed
+        -Step 3: Calculating averages of random scores and weights
+            Expected result : they are identical to adding the converted weighted scores left to right
+    """
+    import random
+    weightList = [0.1, 0.1, 0.1, 0.3, 0.4]
+    lines = open('input.txt', encoding='utf-8').read().splitlines()
+    lines.insert(3, "")
+    parsed = parseRoster(lines, weightList)
+    assert len(parsed['ids']) == len(lines) - 1 and not parsed['errors']
+    assert list(parsed['lineNumbers'][2:5]) == [3, 5, 6]
+    for i, line in enumerate(line for line in lines if line):
+        student = Student(*line.split(), weightList)
+        assert (parsed['ids'][i], parsed['names'][i], list(parsed['scores'][i * 5:i * 5 + 5])) == \
+               (student.sID, student.name, student.scores)
+        assert (parsed['averages'][i], parsed['letters'][i]) == (student.averageScore, student.letterGrade)
+    assert sum(parsed['distribution'].values()) == len(parsed['ids'])
+
+    parsed = parseRoster(["110006213 Bill 90 85 95 88 92", "110006214 Anna 90 85 95 88",
+                          "110006215 Cody 90 85 95 88 b1", "110006216 Dana 60 60 60 60 60"], weightList, firstLine=10)
+    assert parsed['ids'] == ["110006213", "110006216"]
+    assert list(parsed['lineNumbers']) == [10, 13]
+    assert [line for line, _ in parsed['errors']] == [11, 12]
+
+    rng = random.Random(0)
+    for _ in range(1000):
+        scores = [str(rng.uniform(0, 100)) for _ in range(5)]
+        weights = [rng.random() / 5 for _ in range(5)]
+        total = 0.0
+        for score, weight in zip(scores, weights):
+            total += float(score) * weight
+        assert Student('1', 'A', *scores, weights).averageScore == total
+
+def test_update_all_or_nothing(grade_system, capsys):
+    """
+    Test Function: GradeSystem.updateScore(info), GradeSystem.updateWeight(info)
+    Test Description:
+        -Step 1: Updating a valid score followed by an invalid score, then a score without a value
+            Expected result : the student's scores, average, rank and the distribution are not changed
+        -Step 2: Updating a valid weight followed by an invalid weight, then a zero weight
+            Expected result : the weights and the averages are not changed
+    """
+    student = grade_system.studentIndex["985002509"]
+    before = (student.scores, student.averageScore, grade_system.getRank("985002509"), dict(grade_system.gradeDistribution))
+    assert not grade_system.updateScore("985002509 lab1 10 lab2 x")
+    assert not grade_system.updateScore("985002509 lab1 10 final")
+    assert (student.scores, student.averageScore, grade_system.getRank("985002509"),
+            dict(grade_system.gradeDistribution)) == before
+    assert "Missing score for final" in capsys.readouterr().out
+
+    assert not grade_system.updateWeight("lab1 0.2 lab2 abc")
+    assert not grade_system.updateWeight("lab1 0.2 final 0")
+    assert grade_system.weightList == [0.1, 0.1, 0.1, 0.3, 0.4]
+    assert student.averageScore == before[1]
+    assert "Invalid weight format: 0" in capsys.readouterr().out
+
+def test_read_write_lock():
+    """
+    Test Function: ReadWriteLock.acquireRead(), releaseRead(), acquireWrite(), releaseWrite()
+    Test Description:
+        -Step 1: Taking the read lock twice in one thread while another thread also reads
+            Expected result : both threads read at once, and taking the write lock while reading raises RuntimeError
+        -Step 2: A writer waits for the readers, and a new reader arrives meanwhile
+            Expected result : the writer writes once the readers are done, before the new reader reads
+        -Step 3: Taking both locks again while holding the write lock
+            Expected result : the thread does not block itself
+    """
+    import threading
+    lock = ReadWriteLock()
+    events = []
+    lock.acquireRead()
+    lock.acquireRead()
+    other = threading.Thread(target=lambda: (lock.acquireRead(), events.append('other read'), lock.releaseRead()))
+    other.start()
+    other.join(5)
+    assert events == ['other read']
+    with pytest.raises(RuntimeError):
+        lock.acquireWrite()
+
+    writer = threading.Thread(target=lambda: (lock.acquireWrite(), events.append('write'), lock.releaseWrite()))
+    writer.start()
+    while not lock.waitingWriters:
+        pass
+    reader = threading.Thread(target=lambda: (lock.acquireRead(), events.append('late read'), lock.releaseRead()))
+    reader.start()
+    lock.releaseRead()
+    assert events == ['other read']
+    lock.releaseRead()
+    writer.join(5)
+    reader.join(5)
+    assert events == ['other read', 'write', 'late read']
+
+    with lock.writing():
+        with lock.writing(), lock.reading():
+            assert lock.writerDepth == 2
+    assert lock.writer is None and not lock.readers
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_thread_safe_stress(lazy):
+    """
+    Test Function: GradeSystem(threadSafe=True), GradeSystem(lazy=True, threadSafe=True)
+    Test Description:
+        -Step 1: In lazy mode, update the weights, alone and inside a with lock.writing() block, then query
+            Expected result : the roster is up to date once the write lock is given back and the queries are answered
+        -Step 2: Running 8 query threads while 3 threads add students, update scores and switch weights,
+                 some of them together under the write lock
+            Expected result : no thread fails, and every query sees a roster where each average matches the scores
+                              and weights, the distribution counts every student and the ranks follow the averages
+        -Step 3: Checking the roster once every thread is done
+            Expected result : every student added is there and the distribution matches a recount
+    """
+    import random
+    import threading
+    grade_system = GradeSystem(lazy=lazy, threadSafe=True)
+    sIDs = [student.sID for student in grade_system.studentList]
+    weightLists = ["lab1 0.1 lab2 0.1 lab3 0.1 midterm 0.3 final 0.4", "lab1 0.2 lab2 0.2 lab3 0.2 midterm 0.2 final 0.2"]
+    if lazy:
+        assert grade_system.updateWeight(weightLists[1])
+        with grade_system.lock.reading():
+            assert not grade_system.stale
+            assert len(grade_system.topK(3)) == 3
+        with grade_system.lock.writing():
+            assert grade_system.updateWeight(weightLists[0])
+            assert grade_system.stale
+        assert not grade_system.stale
+        assert grade_system.getRank('985002509') == 1
+    failures = []
+    done = threading.Event()
+
+    def query(seed):
+        rng = random.Random(seed)
+        try:
+            while not done.is_set():
+                with grade_system.lock.reading():
+                    weightList = grade_system.weightList
+                    assert sum(grade_system.gradeDistribution.values()) == len(grade_system.studentList)
+                    for student in rng.sample(grade_system.studentList, 5):
+                        assert student.averageScore == student.average(weightList)
+                    ranked = [student.averageScore for student in grade_system.topK(20)]
+                    assert ranked == sorted(ranked, reverse=True)
+                assert grade_system.getRank(rng.choice(sIDs)) is not None
+                assert grade_system.getAverage(rng.choice(sIDs)) is not None
+                assert grade_system.checkDistribution()
+        except Exception as e:
+            failures.append(e)
+
+    def change(seed):
+        rng = random.Random(seed)
+        try:
+            for i in range(200):
+                sID = rng.choice(sIDs)
+                assert grade_system.updateScore(f"{sID} {rng.choice(['lab1', 'midterm', 'final'])} {rng.randint(0, 100)}")
+                if i % 20 == 0:
+                    assert grade_system.updateWeight(rng.choice(weightLists))
+                if i % 25 == 0:
+                    with grade_system.lock.writing():
+                        assert grade_system.updateWeight(rng.choice(weightLists))
+                        assert grade_system.updateScore(f"{rng.choice(sIDs)} lab2 {rng.randint(0, 100)}")
+                if i % 10 == 0:
+                    assert grade_system.addStudent(f"9{seed}{i:05d} Added 90 80 70 60 50")
+        except Exception as e:
+            failures.append(e)
+
+    queries = [threading.Thread(target=query, args=(seed,)) for seed in range(8)]
+    changes = [threading.Thread(target=change, args=(seed,)) for seed in range(3)]
+    for thread in queries + changes:
+        thread.start()
+    for thread in changes:
+        thread.join(60)
+    done.set()
+    for thread in queries:
+        thread.join(60)
+    assert not failures
+    assert len(grade_system.studentList) == len(sIDs) + 60
+    assert grade_system.checkDistribution()
+    averages = [student.averageScore for student in grade_system.rankIndex]
+    assert averages == sorted(averages, reverse=True)